@@ -0,0 +1,169 @@
+"""
+Benchmark Suite
+Times the booking hot paths on seeded data and writes a JSON report.
+
+    python benchmark.py --profile quick --output reports/latest.json
+    python benchmark.py --baseline reports/main.json --threshold 0.10
+    python benchmark.py --profile full --workers 4 --isolate
+    python benchmark.py --engines all --cases find_available_rooms,create_booking
+    python benchmark.py --memory --output reports/latest.json
+
+Exits with status 1 when any case's median is slower than the baseline
+by more than the threshold. With --engines the cases run once per
+availability engine (after each passes check_conformance) and the
+fastest engine per case and size is listed. --memory adds tracemalloc
+peak and retained bytes for loading and a steady-state workload, which
+are compared against the baseline like the timings.
+"""
+
+import argparse
+import sys
+from services.benchmark_suite import (BenchmarkSuite, PROFILES, CASES, engine_winners,
+                                      save_report, load_report, compare_reports)
+from services.benchmark_runner import ParallelBenchmarkRunner
+from data_structures.availability_engine import ENGINES, ConformanceError, check_conformance
+
+def format_ns(ns):
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('µs', 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f}{unit}"
+    return f"{ns}ns"
+
+def print_result(result):
+    print(f"  {result['id']:<55} median {format_ns(result['median_ns']):>9}  "
+          f"p95 {format_ns(result['p95_ns']):>9}  p99 {format_ns(result['p99_ns']):>9}  "
+          f"(n={result['samples']})", flush=True)
+
+def format_bytes(size):
+    for unit, scale in (('GiB', 2**30), ('MiB', 2**20), ('KiB', 2**10)):
+        if abs(size) >= scale:
+            return f"{size / scale:.2f}{unit}"
+    return f"{size}B"
+
+def print_memory(result):
+    subsystems = ", ".join(f"{name} {format_bytes(size)}" for name, size in result['subsystems'].items()
+                           if size >= 2**10)
+    print(f"  {result['id']:<55} peak {format_bytes(result['peak_bytes']):>9}  "
+          f"retained {format_bytes(result['retained_bytes']):>9}  ({subsystems})", flush=True)
+
+def print_progress(event):
+    print(f"[{event['completed']}/{event['total']}] cpu {event['cpu']} "
+          f"finished in {event['elapsed']:.1f}s", flush=True)
+    for result in event['results']:
+        print_result(result)
+
+def parse_sizes(text):
+    """'1000x10,10000x100' -> [(1000, 10), (10000, 100)]"""
+    sizes = []
+    for item in text.split(','):
+        bookings, rooms = item.lower().split('x')
+        sizes.append((int(bookings), int(rooms)))
+    return sizes
+
+def print_winners(rows):
+    print("\nFastest engine (median):")
+    for row in rows:
+        medians = "  ".join(f"{engine} {format_ns(ns)}" for engine, ns in sorted(row['medians'].items()))
+        label = f"{row['case']}[{row['bookings']}x{row['rooms']}]"
+        print(f"  {label:<45} {row['winner']:<14} {medians}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hotel management benchmark suite")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--sizes', type=parse_sizes,
+                        help="explicit BOOKINGSxROOMS list, e.g. 1000x10,100000x1000")
+    parser.add_argument('--cases', help="comma-separated subset of: " + ", ".join(CASES))
+    parser.add_argument('--engine', choices=sorted(ENGINES),
+                        help="availability engine (default: $AVAILABILITY_ENGINE or interval_tree)")
+    parser.add_argument('--engines',
+                        help="comma-separated engines to compare, or 'all': " + ", ".join(ENGINES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--time-budget', type=float, default=2.0,
+                        help="seconds per case before repetitions are cut short")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="run sizes in parallel worker processes")
+    parser.add_argument('--isolate', action='store_true',
+                        help="run every case in a fresh process (implies a process pool)")
+    parser.add_argument('--no-pin', action='store_true',
+                        help="don't pin worker processes to CPUs")
+    parser.add_argument('--memory', action='store_true',
+                        help="also profile memory of loading and a steady-state workload (slow)")
+    parser.add_argument('--output', default='benchmark_report.json')
+    parser.add_argument('--baseline', help="earlier report to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed slowdown of the median, 0.10 = 10%%")
+    args = parser.parse_args(argv)
+    
+    cases = args.cases.split(',') if args.cases else None
+    if cases:
+        unknown = set(cases) - set(CASES)
+        if unknown:
+            parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    
+    engines = [args.engine]
+    if args.engines:
+        engines = list(ENGINES) if args.engines == 'all' else args.engines.split(',')
+        unknown = set(engines) - set(ENGINES)
+        if unknown:
+            parser.error(f"unknown engines: {', '.join(sorted(unknown))}")
+        # A fast engine that gives wrong answers doesn't get timed
+        for engine in engines:
+            try:
+                check_conformance(engine, seed=args.seed)
+            except ConformanceError as e:
+                print(f"Engine {engine} failed the conformance check at {e}")
+                return 1
+        print(f"Conformance check passed: {', '.join(engines)}")
+    
+    profile = args.profile if args.sizes is None else None
+    results = {}
+    memory = {}
+    for engine in engines:
+        suite_options = {'seed': args.seed, 'warmup': args.warmup, 'repeat': args.repeat,
+                         'time_budget': args.time_budget, 'engine': engine}
+        print(f"Running {profile or 'custom'} benchmarks" + (f" on {engine}..." if engine else "..."))
+        if args.workers > 1 or args.isolate:
+            runner = ParallelBenchmarkRunner(workers=args.workers, isolate=args.isolate,
+                                             pin=not args.no_pin, **suite_options)
+            report = runner.run(sizes=args.sizes, cases=cases, progress=print_progress, profile=profile)
+            print(f"Finished in {report['meta']['wall_time']:.1f}s on {runner.workers} worker(s)")
+        else:
+            suite = BenchmarkSuite(**suite_options)
+            report = suite.run(sizes=args.sizes, cases=cases, progress=print_result, profile=profile)
+        results.update(report['results'])
+        
+        if args.memory:
+            print("Profiling memory...")
+            suite = BenchmarkSuite(**suite_options)
+            for num_bookings, num_rooms in args.sizes or PROFILES[profile]:
+                for result in suite.run_memory(num_bookings, num_rooms).values():
+                    memory[result['id']] = result
+                    print_memory(result)
+    
+    report['results'] = results
+    if memory:
+        report['memory'] = memory
+    if args.engines:
+        report['meta']['engine'] = engines
+        print_winners(engine_winners(results))
+    save_report(report, args.output)
+    print(f"Report written to {args.output}")
+    
+    if args.baseline:
+        regressions, rows = compare_reports(load_report(args.baseline), report, args.threshold)
+        print(f"\nCompared with {args.baseline}:")
+        for row in rows:
+            flag = "  REGRESSION" if row in regressions else ""
+            fmt = format_bytes if row['unit'] == 'bytes' else format_ns
+            print(f"  {row['id']:<55} {fmt(row['baseline']):>9} -> "
+                  f"{fmt(row['current']):>9}  {row['change']:+.1%}{flag}")
+        if regressions:
+            print(f"\n{len(regressions)} case(s) worse than baseline by more than {args.threshold:.0%}")
+            return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
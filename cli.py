@@ -0,0 +1,143 @@
+"""
+Headless command line for the hotel data directory (no Qt needed)
+
+    python cli.py rooms --check-in 2025-06-01 --check-out 2025-06-04 --type Deluxe
+    python cli.py book G0001 R104 2025-06-01 2025-06-04
+    python cli.py cancel B000012
+    python cli.py report --start 2025-06-01 --end 2025-07-01
+    python cli.py import events.jsonl
+    python cli.py benchmark --profile quick
+
+Every command works on --data-dir (default data/) and saves its changes
+there, the same files the desktop app reads.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from models.room import RoomType
+from services.hotel_core import HotelCore
+
+def parse_date(text):
+    return datetime.fromisoformat(text)
+
+def cmd_rooms(core, args):
+    rooms = core.available_rooms(args.check_in, args.check_out, args.type, args.min_price, args.max_price)
+    for room in rooms:
+        price, _ = core.quote(room, args.check_in, args.check_out, args.guest)
+        print(f"{room.room_id:<8} {room.room_type.value:<10} floor {room.floor:<3} ${price:>9.2f}")
+    print(f"{len(rooms)} room(s) available")
+
+def cmd_book(core, args):
+    booking, points = core.book(args.guest, args.room, args.check_in, args.check_out)
+    print(f"Booking {booking.booking_id} confirmed: ${booking.total_price:.2f}, {points} points earned")
+
+def cmd_cancel(core, args):
+    cancelled, promoted = core.cancel(args.booking)
+    print(f"Booking {cancelled.booking_id} cancelled")
+    for request, booking in promoted:
+        print(f"Waitlist request {request['request_id']} promoted to booking {booking.booking_id}")
+
+def cmd_report(core, args):
+    end = args.end or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = args.start or end - timedelta(days=30)
+    analytics = core.analytics_service
+    report = {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'occupancy_rate': analytics.get_occupancy_rate(start, end),
+        'revenue': analytics.get_revenue(start, end),
+        'room_type_distribution': analytics.get_room_type_distribution(),
+        'booking_stats': analytics.get_booking_stats()
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{start.date()} to {end.date()}")
+    print(f"  Occupancy: {report['occupancy_rate']:.1f}%")
+    print(f"  Revenue:   ${report['revenue']:.2f}")
+    for room_type, count in report['room_type_distribution'].items():
+        print(f"  {room_type:<10} {count} active booking(s)")
+    for key, value in report['booking_stats'].items():
+        print(f"  {key}: {value}")
+
+def cmd_import(core, args):
+    if args.file.endswith('.jsonl'):
+        # Deferred: only imports need the workload generator
+        from services.workload_generator import WorkloadGenerator
+        counts = core.import_events(WorkloadGenerator.read_jsonl(args.file))
+        print("Imported " + ", ".join(f"{count} {kind}(s)" for kind, count in counts.items()))
+    else:
+        with open(args.file, 'r') as f:
+            added = core.import_bookings(json.load(f))
+        print(f"Imported {added} booking(s)")
+
+def cmd_loyalty(core, args):
+    result = core.run_loyalty_job()
+    print(f"{len(result['changed'])} guest(s) updated, {len(result['tier_changes'])} tier change(s)")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Hotel management (headless)")
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--engine', help="availability engine (see benchmark.py --engines)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    rooms = commands.add_parser('rooms', help="list available rooms for dates")
+    rooms.add_argument('--check-in', type=parse_date, required=True)
+    rooms.add_argument('--check-out', type=parse_date, required=True)
+    rooms.add_argument('--type', type=RoomType)
+    rooms.add_argument('--min-price', type=float)
+    rooms.add_argument('--max-price', type=float)
+    rooms.add_argument('--guest', help="quote with this guest's loyalty discount")
+    rooms.set_defaults(handler=cmd_rooms)
+    
+    book = commands.add_parser('book', help="book a room for a guest")
+    book.add_argument('guest')
+    book.add_argument('room')
+    book.add_argument('check_in', type=parse_date)
+    book.add_argument('check_out', type=parse_date)
+    book.set_defaults(handler=cmd_book)
+    
+    cancel = commands.add_parser('cancel', help="cancel a booking")
+    cancel.add_argument('booking')
+    cancel.set_defaults(handler=cmd_cancel)
+    
+    report = commands.add_parser('report', help="occupancy, revenue and booking statistics")
+    report.add_argument('--start', type=parse_date)
+    report.add_argument('--end', type=parse_date)
+    report.add_argument('--json', action='store_true')
+    report.set_defaults(handler=cmd_report)
+    
+    imports = commands.add_parser('import', help="import a bookings.json file or workload .jsonl events")
+    imports.add_argument('file')
+    imports.set_defaults(handler=cmd_import)
+    
+    loyalty = commands.add_parser('loyalty', help="recompute loyalty points and tiers")
+    loyalty.set_defaults(handler=cmd_loyalty)
+    
+    commands.add_parser('benchmark', add_help=False, help="run benchmark.py with the remaining arguments")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    
+    # Whatever follows 'benchmark' belongs to benchmark.py's own parser;
+    # importing it here keeps the other commands' startup short
+    if args.command == 'benchmark':
+        import benchmark
+        return benchmark.main(rest)
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    
+    core = HotelCore(data_dir=args.data_dir, engine=args.engine)
+    try:
+        args.handler(core, args)
+    except (ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
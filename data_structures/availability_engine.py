@@ -0,0 +1,407 @@
+import os
+import random
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from data_structures.interval_tree import IntervalTree, Interval
+
+class AvailabilityEngine(ABC):
+    """Per-room booked intervals, addressed by integer room key
+    
+    Intervals are Interval(start, end, booking_key, room_key) and
+    half-open, so a check-out and a check-in on the same day don't
+    clash. Engines only hold active bookings; BookingService removes a
+    booking's interval when it is cancelled.
+    """
+    
+    name = None
+    
+    @abstractmethod
+    def insert(self, room_key, interval):
+        pass
+    
+    @abstractmethod
+    def remove(self, room_key, interval):
+        """Remove the interval with this start and booking key"""
+    
+    def any_overlap(self, room_key, start, end):
+        return bool(self.overlaps(room_key, start, end))
+    
+    @abstractmethod
+    def overlaps(self, room_key, start, end):
+        """Intervals of the room overlapping [start, end), in any order"""
+    
+    @abstractmethod
+    def intervals(self, room_key):
+        """All intervals of the room ordered by start"""
+    
+    @abstractmethod
+    def count(self, room_key):
+        pass
+    
+    @abstractmethod
+    def room_keys(self):
+        """Keys of rooms that have (or had) intervals"""
+    
+    def free_rooms(self, room_keys, start, end):
+        """The subset of room_keys with nothing overlapping [start, end)"""
+        return {room_key for room_key in room_keys if not self.any_overlap(room_key, start, end)}
+    
+    def replace(self, room_key, intervals):
+        """Swap in a new interval set for a room"""
+        self.clear(room_key)
+        self.bulk_load(room_key, intervals)
+    
+    @abstractmethod
+    def clear(self, room_key):
+        pass
+    
+    def bulk_load(self, room_key, intervals):
+        for interval in intervals:
+            self.insert(room_key, interval)
+
+
+class IntervalTreeEngine(AvailabilityEngine):
+    """One AVL interval tree per room (the original representation)"""
+    
+    name = 'interval_tree'
+    
+    def __init__(self):
+        self.trees = []
+    
+    def tree(self, room_key, create=False):
+        if room_key >= len(self.trees):
+            if not create:
+                return None
+            self.trees.extend([None] * (room_key + 1 - len(self.trees)))
+        tree = self.trees[room_key]
+        if tree is None and create:
+            tree = self.trees[room_key] = IntervalTree()
+        return tree
+    
+    def insert(self, room_key, interval):
+        self.tree(room_key, True).insert(interval)
+    
+    def remove(self, room_key, interval):
+        tree = self.tree(room_key)
+        if tree is not None:
+            tree.delete(interval)
+    
+    def any_overlap(self, room_key, start, end):
+        tree = self.tree(room_key)
+        return tree is not None and bool(tree.search_overlaps(Interval(start, end, None, None)))
+    
+    def overlaps(self, room_key, start, end):
+        tree = self.tree(room_key)
+        return [] if tree is None else tree.search_overlaps(Interval(start, end, None, None))
+    
+    def intervals(self, room_key):
+        tree = self.tree(room_key)
+        return [] if tree is None else tree.intervals()
+    
+    def count(self, room_key):
+        tree = self.tree(room_key)
+        return 0 if tree is None else tree.size
+    
+    def room_keys(self):
+        return [room_key for room_key, tree in enumerate(self.trees) if tree is not None]
+    
+    def free_rooms(self, room_keys, start, end):
+        query = Interval(start, end, None, None)
+        trees = self.trees
+        size = len(trees)
+        free = set()
+        for room_key in room_keys:
+            tree = trees[room_key] if room_key < size else None
+            if tree is None or tree.root is None or not tree.search_overlaps(query):
+                free.add(room_key)
+        return free
+    
+    # A rebuilt tree carries over the room's work counters
+    def clear(self, room_key):
+        tree = self.tree(room_key)
+        if tree is not None:
+            self.trees[room_key] = IntervalTree(tree.work)
+    
+    def bulk_load(self, room_key, intervals):
+        tree = self.tree(room_key, True)
+        if tree.root is None:
+            self.trees[room_key] = IntervalTree.from_intervals(intervals, tree.work)
+        else:
+            for interval in intervals:
+                tree.insert(interval)
+
+
+class SortedListEngine(AvailabilityEngine):
+    """Per room, intervals in a list sorted by start, searched with bisect
+    
+    Only intervals starting after start - (longest stay seen) can reach
+    into a query, so a lookup is two bisects and a short scan.
+    """
+    
+    name = 'sorted_list'
+    
+    def __init__(self):
+        self.rooms = {}
+    
+    def _room(self, room_key):
+        room = self.rooms.get(room_key)
+        if room is None:
+            # [starts, intervals, longest interval]
+            room = self.rooms[room_key] = [[], [], timedelta(0)]
+        return room
+    
+    def insert(self, room_key, interval):
+        starts, intervals, longest = self._room(room_key)
+        i = bisect_right(starts, interval.start)
+        starts.insert(i, interval.start)
+        intervals.insert(i, interval)
+        if interval.end - interval.start > longest:
+            self.rooms[room_key][2] = interval.end - interval.start
+    
+    def remove(self, room_key, interval):
+        room = self.rooms.get(room_key)
+        if room is None:
+            return
+        starts, intervals, _ = room
+        i = bisect_left(starts, interval.start)
+        while i < len(starts) and starts[i] == interval.start:
+            if intervals[i].booking_id == interval.booking_id:
+                del starts[i]
+                del intervals[i]
+                return
+            i += 1
+    
+    def _candidates(self, room_key, start, end):
+        room = self.rooms.get(room_key)
+        if room is None:
+            return ()
+        starts, intervals, longest = room
+        lo = bisect_right(starts, start - longest)
+        hi = bisect_left(starts, end)
+        return intervals[lo:hi]
+    
+    def any_overlap(self, room_key, start, end):
+        for interval in self._candidates(room_key, start, end):
+            if interval.end > start:
+                return True
+        return False
+    
+    def overlaps(self, room_key, start, end):
+        return [iv for iv in self._candidates(room_key, start, end) if iv.end > start]
+    
+    def intervals(self, room_key):
+        room = self.rooms.get(room_key)
+        return [] if room is None else list(room[1])
+    
+    def count(self, room_key):
+        room = self.rooms.get(room_key)
+        return 0 if room is None else len(room[1])
+    
+    def room_keys(self):
+        return list(self.rooms)
+    
+    def clear(self, room_key):
+        self.rooms.pop(room_key, None)
+    
+    def bulk_load(self, room_key, intervals):
+        for interval in sorted(intervals, key=lambda iv: iv.start):
+            self.insert(room_key, interval)
+
+
+class BitmapEngine(AvailabilityEngine):
+    """Per room, an int with one bit per booked night
+    
+    Bookings are day-granular: a stay occupies the nights from its
+    check-in date up to, not including, its check-out date. any_overlap
+    is a mask test; the intervals themselves are kept per room for
+    overlaps() and intervals().
+    """
+    
+    name = 'bitmap'
+    
+    def __init__(self):
+        # room_key -> [first day ordinal, bits, {booking_key: interval}]
+        self.rooms = {}
+    
+    @staticmethod
+    def _nights(start, end):
+        first = start.toordinal()
+        return first, max(end.toordinal() - first, 1 if end > start else 0)
+    
+    def _mask(self, room, first, nights):
+        offset = first - room[0]
+        if offset < 0:
+            return ((1 << nights) - 1) >> -offset
+        return ((1 << nights) - 1) << offset
+    
+    def insert(self, room_key, interval):
+        first, nights = self._nights(interval.start, interval.end)
+        room = self.rooms.get(room_key)
+        if room is None:
+            room = self.rooms[room_key] = [first, 0, {}]
+        elif first < room[0]:
+            # Rebase so the new stay starts at bit 0
+            room[1] <<= room[0] - first
+            room[0] = first
+        room[1] |= self._mask(room, first, nights)
+        room[2][interval.booking_id] = interval
+    
+    def remove(self, room_key, interval):
+        room = self.rooms.get(room_key)
+        if room is None or room[2].pop(interval.booking_id, None) is None:
+            return
+        first, nights = self._nights(interval.start, interval.end)
+        room[1] &= ~self._mask(room, first, nights)
+        # Restore nights still covered by other stays
+        for other in self.overlaps(room_key, interval.start, interval.end):
+            room[1] |= self._mask(room, *self._nights(other.start, other.end))
+    
+    def any_overlap(self, room_key, start, end):
+        room = self.rooms.get(room_key)
+        if room is None:
+            return False
+        first, nights = self._nights(start, end)
+        return bool(room[1] & self._mask(room, first, nights))
+    
+    def overlaps(self, room_key, start, end):
+        room = self.rooms.get(room_key)
+        if room is None:
+            return []
+        return [iv for iv in room[2].values() if iv.start < end and start < iv.end]
+    
+    def intervals(self, room_key):
+        room = self.rooms.get(room_key)
+        return [] if room is None else sorted(room[2].values(), key=lambda iv: iv.start)
+    
+    def count(self, room_key):
+        room = self.rooms.get(room_key)
+        return 0 if room is None else len(room[2])
+    
+    def room_keys(self):
+        return list(self.rooms)
+    
+    def clear(self, room_key):
+        self.rooms.pop(room_key, None)
+
+
+class NaiveEngine(AvailabilityEngine):
+    """Unsorted list per room, scanned in full; the reference implementation"""
+    
+    name = 'naive'
+    
+    def __init__(self):
+        self.rooms = {}
+    
+    def insert(self, room_key, interval):
+        self.rooms.setdefault(room_key, []).append(interval)
+    
+    def remove(self, room_key, interval):
+        intervals = self.rooms.get(room_key, [])
+        for i, other in enumerate(intervals):
+            if other.start == interval.start and other.booking_id == interval.booking_id:
+                del intervals[i]
+                return
+    
+    def any_overlap(self, room_key, start, end):
+        for interval in self.rooms.get(room_key, ()):
+            if interval.start < end and start < interval.end:
+                return True
+        return False
+    
+    def overlaps(self, room_key, start, end):
+        return [iv for iv in self.rooms.get(room_key, ()) if iv.start < end and start < iv.end]
+    
+    def intervals(self, room_key):
+        return sorted(self.rooms.get(room_key, ()), key=lambda iv: iv.start)
+    
+    def count(self, room_key):
+        return len(self.rooms.get(room_key, ()))
+    
+    def room_keys(self):
+        return list(self.rooms)
+    
+    def clear(self, room_key):
+        self.rooms.pop(room_key, None)
+
+
+ENGINES = {engine.name: engine for engine in
+           (IntervalTreeEngine, SortedListEngine, BitmapEngine, NaiveEngine)}
+
+DEFAULT_ENGINE = 'interval_tree'
+
+
+def create_engine(name=None):
+    """Engine by name; defaults to $AVAILABILITY_ENGINE, then the interval tree"""
+    name = name or os.environ.get('AVAILABILITY_ENGINE') or DEFAULT_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown availability engine: {name} (choose from {', '.join(ENGINES)})")
+    return ENGINES[name]()
+
+
+class ConformanceError(Exception):
+    """An engine disagreed with NaiveEngine in check_conformance"""
+
+
+def check_conformance(name, operations=5000, num_rooms=8, seed=0):
+    """Replay random operations against an engine and NaiveEngine side by side
+    
+    Mirrors how BookingService drives an engine: an interval is only
+    inserted when any_overlap says its room is free. Raises
+    ConformanceError on the first disagreement; returns the number of
+    operations checked.
+    """
+    rng = random.Random(seed)
+    engine = create_engine(name)
+    reference = NaiveEngine()
+    base = datetime(2025, 1, 1)
+    live = []
+    next_key = 0
+    
+    def same(a, b):
+        return sorted((iv.start, iv.booking_id) for iv in a) == sorted((iv.start, iv.booking_id) for iv in b)
+    
+    # Not assert: the check has to run under python -O as well
+    def check(ok, *detail):
+        if not ok:
+            raise ConformanceError(detail)
+    
+    for step in range(operations):
+        room_key = rng.randrange(num_rooms)
+        start = base + timedelta(days=rng.randrange(120))
+        end = start + timedelta(days=rng.randint(1, 10))
+        action = rng.random()
+        
+        if action < 0.45:
+            busy = reference.any_overlap(room_key, start, end)
+            check(engine.any_overlap(room_key, start, end) == busy, step, 'any_overlap', room_key, start, end)
+            if not busy:
+                interval = Interval(start, end, next_key, room_key)
+                next_key += 1
+                engine.insert(room_key, interval)
+                reference.insert(room_key, interval)
+                live.append(interval)
+        elif action < 0.65 and live:
+            interval = live.pop(rng.randrange(len(live)))
+            engine.remove(interval.room_id, interval)
+            reference.remove(interval.room_id, interval)
+        elif action < 0.85:
+            check(same(engine.overlaps(room_key, start, end), reference.overlaps(room_key, start, end)),
+                  step, 'overlaps', room_key, start, end)
+        elif action < 0.95:
+            keys = range(num_rooms)
+            check(engine.free_rooms(keys, start, end) == reference.free_rooms(keys, start, end),
+                  step, 'free_rooms', start, end)
+        else:
+            replacement = [iv for iv in reference.intervals(room_key) if rng.random() < 0.7]
+            for interval in reference.intervals(room_key):
+                if interval not in replacement:
+                    live.remove(interval)
+            engine.replace(room_key, replacement)
+            reference.replace(room_key, replacement)
+        
+        check(engine.count(room_key) == reference.count(room_key), step, 'count', room_key)
+        check([iv.booking_id for iv in engine.intervals(room_key)] ==
+              [iv.booking_id for iv in reference.intervals(room_key)], step, 'intervals', room_key)
+    
+    return operations
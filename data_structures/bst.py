@@ -5,20 +5,23 @@ class BSTNode:
         self.value = value
         self.left = None
         self.right = None
+        self.height = 1
 
 
 class BST:
-    """Binary Search Tree for price-based queries"""
+    """AVL-balanced Binary Search Tree for price-based queries"""
     
     def __init__(self):
         self.root = None
+        self.size = 0
     
     def insert(self, key, value):
-        """Insert key-value pair"""
+        """Insert key-value pair (replaces the value of an existing key)"""
         self.root = self._insert_recursive(self.root, key, value)
     
     def _insert_recursive(self, node, key, value):
         if node is None:
+            self.size += 1
             return BSTNode(key, value)
         
         if key < node.key:
@@ -27,38 +30,98 @@ class BST:
             node.right = self._insert_recursive(node.right, key, value)
         else:
             node.value = value
+            return node
         
-        return node
+        return self._rebalance(node)
     
-    def search(self, key):
-        """Search for a key"""
-        return self._search_recursive(self.root, key)
+    def delete(self, key):
+        """Delete a key"""
+        self.root = self._delete_recursive(self.root, key)
     
-    def _search_recursive(self, node, key):
+    def _delete_recursive(self, node, key):
         if node is None:
             return None
-        if key == node.key:
-            return node.value
-        elif key < node.key:
-            return self._search_recursive(node.left, key)
+        
+        if key < node.key:
+            node.left = self._delete_recursive(node.left, key)
+        elif key > node.key:
+            node.right = self._delete_recursive(node.right, key)
         else:
-            return self._search_recursive(node.right, key)
+            if node.left is None or node.right is None:
+                self.size -= 1
+                return node.left or node.right
+            
+            successor = node.right
+            while successor.left:
+                successor = successor.left
+            node.key, node.value = successor.key, successor.value
+            node.right = self._delete_recursive(node.right, successor.key)
+        
+        return self._rebalance(node)
+    
+    def search(self, key):
+        """Search for a key"""
+        node = self.root
+        while node is not None:
+            if key == node.key:
+                return node.value
+            node = node.left if key < node.key else node.right
+        return None
     
     def range_query(self, min_key, max_key):
-        """Find all values in key range"""
+        """Find all values in key range, in key order"""
         results = []
-        self._range_query_recursive(self.root, min_key, max_key, results)
+        stack = []
+        node = self.root
+        
+        while stack or node:
+            # Walk left only while keys can still be in range
+            while node:
+                stack.append(node)
+                node = node.left if min_key < node.key else None
+            
+            node = stack.pop()
+            if node.key > max_key:
+                break
+            if node.key >= min_key:
+                results.append(node.value)
+            node = node.right
+        
         return results
     
-    def _range_query_recursive(self, node, min_key, max_key, results):
-        if node is None:
-            return
-        
-        if min_key < node.key:
-            self._range_query_recursive(node.left, min_key, max_key, results)
+    def _height(self, node):
+        return 0 if node is None else node.height
+    
+    def _rebalance(self, node):
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+        balance = self._height(node.left) - self._height(node.right)
         
-        if min_key <= node.key <= max_key:
-            results.append(node.value)
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
         
-        if node.key < max_key:
-            self._range_query_recursive(node.right, min_key, max_key, results)
\ No newline at end of file
+        return node
+    
+    def _rotate_left(self, z):
+        y = z.right
+        z.right = y.left
+        y.left = z
+        z.height = 1 + max(self._height(z.left), self._height(z.right))
+        y.height = 1 + max(self._height(y.left), self._height(y.right))
+        return y
+    
+    def _rotate_right(self, z):
+        y = z.left
+        z.left = y.right
+        y.right = z
+        z.height = 1 + max(self._height(z.left), self._height(z.right))
+        y.height = 1 + max(self._height(y.left), self._height(y.right))
+        return y
+    
+    def __len__(self):
+        return self.size
\ No newline at end of file
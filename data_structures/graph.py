@@ -1,8 +1,14 @@
+from array import array
+from collections import deque
+from data_structures.union_find import UnionFind
+
+
 class Graph:
     """Undirected graph for room adjacency"""
     
     def __init__(self):
         self.adjacency_list = {}
+        self.edges = set()
     
     def add_vertex(self, room_id):
         if room_id not in self.adjacency_list:
@@ -12,28 +18,148 @@ class Graph:
         """Add adjacency between rooms"""
         self.add_vertex(room1)
         self.add_vertex(room2)
-        if room2 not in self.adjacency_list[room1]:
-            self.adjacency_list[room1].append(room2)
-        if room1 not in self.adjacency_list[room2]:
-            self.adjacency_list[room2].append(room1)
+        if (room1, room2) in self.edges or room1 == room2:
+            return
+        self.edges.add((room1, room2))
+        self.edges.add((room2, room1))
+        self.adjacency_list[room1].append(room2)
+        self.adjacency_list[room2].append(room1)
     
     def get_neighbors(self, room_id):
         """Get adjacent rooms"""
         return self.adjacency_list.get(room_id, [])
     
     def find_connected_component(self, start_room, available_rooms):
-        """Find connected available rooms (DFS)"""
+        """Find connected available rooms (iterative DFS)"""
         visited = set()
         component = []
         
-        def dfs(room):
-            if room in visited or room not in available_rooms:
-                return
+        if start_room not in available_rooms:
+            return component
+        
+        stack = [start_room]
+        while stack:
+            room = stack.pop()
+            if room in visited:
+                continue
             visited.add(room)
             component.append(room)
+            for neighbor in reversed(self.get_neighbors(room)):
+                if neighbor not in visited and neighbor in available_rooms:
+                    stack.append(neighbor)
+        return component
+    
+    def connected_components(self, rooms):
+        """Connected components of the subgraph induced by rooms (union-find)"""
+        allowed = rooms if isinstance(rooms, (set, frozenset, dict)) else set(rooms)
+        components = UnionFind(rooms)
+        for room in rooms:
+            for neighbor in self.get_neighbors(room):
+                if neighbor in allowed:
+                    components.union(room, neighbor)
+        return components.groups()
+    
+    def contiguous_block(self, component, num_rooms):
+        """Take num_rooms connected rooms from a component (BFS prefix)"""
+        members = set(component)
+        # Start at the room with the fewest free neighbours (a corridor end)
+        # so the rooms left over stay in one piece
+        start = min(component, key=lambda r: sum(1 for n in self.get_neighbors(r) if n in members))
+        
+        block = [start]
+        seen = {start}
+        queue = deque([start])
+        while queue and len(block) < num_rooms:
+            room = queue.popleft()
             for neighbor in self.get_neighbors(room):
-                dfs(neighbor)
+                if neighbor in members and neighbor not in seen:
+                    seen.add(neighbor)
+                    block.append(neighbor)
+                    queue.append(neighbor)
+                    if len(block) == num_rooms:
+                        break
+        return block
+
+
+class CSRGraph(Graph):
+    """Read-only room adjacency in compressed sparse row form
+    
+    Rooms are numbered 0..n-1 by (floor, room_number). The neighbours of
+    room i are indices[indptr[i]:indptr[i + 1]], and every traversal works
+    on these integer indices.
+    """
+    
+    def __init__(self, room_ids, indptr, indices):
+        self.room_ids = room_ids
+        self.index = {room_id: i for i, room_id in enumerate(room_ids)}
+        self.indptr = indptr
+        self.indices = indices
+        self._indices_view = memoryview(indices)
+    
+    @staticmethod
+    def from_rooms(rooms, vertical=False):
+        """Build in one pass: corridor neighbours, plus stacked rooms if vertical
+        
+        Rooms are stacked when they hold the same position along the
+        corridor on consecutive floors.
+        """
+        floors = {}
+        for room in rooms:
+            floors.setdefault(room.floor, []).append(room)
+        for floor_rooms in floors.values():
+            floor_rooms.sort(key=lambda r: r.room_number)
+        
+        floor_numbers = sorted(floors)
+        offsets = {}
+        room_ids = []
+        for floor in floor_numbers:
+            offsets[floor] = len(room_ids)
+            room_ids.extend(r.room_id for r in floors[floor])
         
-        if start_room in available_rooms:
-            dfs(start_room)
-        return component
\ No newline at end of file
+        indptr = array('l', [0])
+        indices = array('l')
+        for floor in floor_numbers:
+            start = offsets[floor]
+            count = len(floors[floor])
+            below = floor - 1 if vertical and floor - 1 in floors else None
+            above = floor + 1 if vertical and floor + 1 in floors else None
+            
+            for pos in range(count):
+                if pos > 0:
+                    indices.append(start + pos - 1)
+                if pos < count - 1:
+                    indices.append(start + pos + 1)
+                if below is not None and pos < len(floors[below]):
+                    indices.append(offsets[below] + pos)
+                if above is not None and pos < len(floors[above]):
+                    indices.append(offsets[above] + pos)
+                indptr.append(len(indices))
+        
+        return CSRGraph(room_ids, indptr, indices)
+    
+    def add_vertex(self, room_id):
+        raise TypeError("CSRGraph is read-only, rebuild it with from_rooms")
+    
+    def add_edge(self, room1, room2):
+        raise TypeError("CSRGraph is read-only, rebuild it with from_rooms")
+    
+    def get_neighbors(self, index):
+        """Get adjacent room indices (zero-copy slice)"""
+        return self._indices_view[self.indptr[index]:self.indptr[index + 1]]
+    
+    def connected_components(self, rooms):
+        """Connected components as zero-copy slices of one packed array"""
+        groups = super().connected_components(rooms)
+        
+        packed = array('l')
+        bounds = []
+        for group in groups:
+            start = len(packed)
+            packed.extend(group)
+            bounds.append((start, len(packed)))
+        
+        view = memoryview(packed)
+        return [view[start:end] for start, end in bounds]
+    
+    def __len__(self):
+        return len(self.room_ids)
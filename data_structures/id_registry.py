@@ -0,0 +1,40 @@
+class IdRegistry:
+    """Maps external string ids to dense integer keys and back
+
+    Keys are handed out in order from 0, so they can index plain lists.
+    The registry holds one canonical copy of every id; records built
+    from it share that string instead of keeping their own.
+    """
+
+    def __init__(self, ids=()):
+        self.keys = {}
+        self.ids = []
+        for external in ids:
+            self.key(external)
+
+    def key(self, external):
+        """Integer key for an id, registering it if it's new"""
+        key = self.keys.get(external)
+        if key is None:
+            key = len(self.ids)
+            self.keys[external] = key
+            self.ids.append(external)
+        return key
+
+    def lookup(self, external):
+        """Integer key for an id, or None if it was never registered"""
+        return self.keys.get(external)
+
+    def external(self, key):
+        """The id registered under a key"""
+        return self.ids[key]
+
+    def intern(self, external):
+        """The canonical copy of an id"""
+        return self.ids[self.key(external)]
+
+    def __contains__(self, external):
+        return external in self.keys
+
+    def __len__(self):
+        return len(self.ids)
@@ -1,7 +1,11 @@
+import math
+import sys
 from datetime import datetime
 
 class Interval:
     """Represents a booking interval"""
+    __slots__ = ('start', 'end', 'booking_id', 'room_id')
+    
     def __init__(self, start, end, booking_id, room_id):
         self.start = start
         self.end = end
@@ -18,6 +22,8 @@ class Interval:
 
 class IntervalNode:
     """Node in interval tree"""
+    __slots__ = ('interval', 'max_end', 'left', 'right', 'height')
+    
     def __init__(self, interval):
         self.interval = interval
         self.max_end = interval.end
@@ -26,15 +32,58 @@ class IntervalNode:
         self.height = 1
 
 
+class WorkCounters:
+    """Running totals of the work done by one tree's operations
+    
+    The visited counts are nodes an operation touched; search_pruned
+    counts subtrees a search skipped thanks to max_end (left) or the
+    start order (right). A tree rebuilt from its intervals can be handed
+    the old tree's counters, so the totals survive the rebuild.
+    """
+    __slots__ = ('searches', 'search_visited', 'search_pruned', 'inserts', 'insert_visited',
+                 'deletes', 'delete_visited', 'rotations')
+    
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+    
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
 class IntervalTree:
     """AVL-based interval tree for efficient booking management"""
     
-    def __init__(self):
+    def __init__(self, work=None):
         self.root = None
         self.size = 0
+        self.work = WorkCounters() if work is None else work
+    
+    @staticmethod
+    def from_intervals(intervals, work=None):
+        """Build a balanced tree in one pass instead of inserting one by one"""
+        tree = IntervalTree(work)
+        intervals = sorted(intervals, key=lambda iv: iv.start)
+        tree.root = tree._build(intervals, 0, len(intervals))
+        tree.size = len(intervals)
+        return tree
+    
+    def _build(self, intervals, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = IntervalNode(intervals[mid])
+        node.left = self._build(intervals, lo, mid)
+        node.right = self._build(intervals, mid + 1, hi)
+        node.height = 1 + max(self._get_height(node.left), self._get_height(node.right))
+        node.max_end = max(node.interval.end,
+                          self._get_max_end(node.left),
+                          self._get_max_end(node.right))
+        return node
     
     def insert(self, interval):
         """Insert an interval"""
+        self.work.inserts += 1
         self.root = self._insert_recursive(self.root, interval)
         self.size += 1
     
@@ -42,6 +91,7 @@ class IntervalTree:
         if node is None:
             return IntervalNode(interval)
         
+        self.work.insert_visited += 1
         if interval.start < node.interval.start:
             node.left = self._insert_recursive(node.left, interval)
         else:
@@ -71,6 +121,7 @@ class IntervalTree:
     def search_overlaps(self, query_interval, room_id=None):
         """Find all overlapping intervals"""
         results = []
+        self.work.searches += 1
         self._search_recursive(self.root, query_interval, room_id, results)
         return results
     
@@ -78,26 +129,83 @@ class IntervalTree:
         if node is None:
             return
         
+        work = self.work
+        work.search_visited += 1
         if node.interval.overlaps(query):
             if room_id is None or node.interval.room_id == room_id:
                 results.append(node.interval)
         
-        if node.left and node.left.max_end > query.start:
-            self._search_recursive(node.left, query, room_id, results)
+        if node.left:
+            if node.left.max_end > query.start:
+                self._search_recursive(node.left, query, room_id, results)
+            else:
+                work.search_pruned += 1
         
-        if node.right and node.interval.start < query.end:
-            self._search_recursive(node.right, query, room_id, results)
+        if node.right:
+            if node.interval.start < query.end:
+                self._search_recursive(node.right, query, room_id, results)
+            else:
+                work.search_pruned += 1
+    
+    def intervals(self):
+        """All intervals ordered by start (in-order walk)"""
+        results = []
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            results.append(node.interval)
+            node = node.right
+        return results
+    
+    def metrics(self):
+        """Shape, footprint and work counters of the tree
+        
+        node_count and the balance factor distribution come from a full
+        walk; memory_bytes is nodes plus their Interval objects (the dates
+        and ids they point at are shared with the bookings).
+        """
+        balance = {}
+        nodes = 0
+        memory = sys.getsizeof(self)
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            nodes += 1
+            memory += sys.getsizeof(node) + sys.getsizeof(node.interval)
+            factor = self._get_balance(node)
+            balance[factor] = balance.get(factor, 0) + 1
+            if node.left:
+                stack.append(node.left)
+            if node.right:
+                stack.append(node.right)
+        
+        return {
+            'node_count': nodes,
+            'height': self._get_height(self.root),
+            # Height of a perfectly balanced tree with this many nodes
+            'min_height': math.ceil(math.log2(nodes + 1)),
+            'balance': balance,
+            'memory_bytes': memory,
+            'work': self.work.to_dict()
+        }
     
     def delete(self, interval):
         """Delete an interval"""
+        self._deleted = False
+        self.work.deletes += 1
         self.root = self._delete_recursive(self.root, interval)
-        if self.root:
+        if self._deleted:
             self.size -= 1
     
     def _delete_recursive(self, node, interval):
         if node is None:
             return node
         
+        self.work.delete_visited += 1
         if interval.start < node.interval.start:
             node.left = self._delete_recursive(node.left, interval)
         elif interval.start > node.interval.start:
@@ -105,15 +213,20 @@ class IntervalTree:
         else:
             if interval.booking_id == node.interval.booking_id:
                 if node.left is None:
+                    self._deleted = True
                     return node.right
                 elif node.right is None:
+                    self._deleted = True
                     return node.left
                 
                 temp = self._get_min_node(node.right)
                 node.interval = temp.interval
                 node.right = self._delete_recursive(node.right, temp.interval)
             else:
+                # Rotations can leave equal starts on either side
                 node.right = self._delete_recursive(node.right, interval)
+                if not self._deleted:
+                    node.left = self._delete_recursive(node.left, interval)
         
         if node is None:
             return node
@@ -148,6 +261,7 @@ class IntervalTree:
         return 0 if node is None else self._get_height(node.left) - self._get_height(node.right)
     
     def _rotate_left(self, z):
+        self.work.rotations += 1
         y = z.right
         T2 = y.left
         y.left = z
@@ -161,6 +275,7 @@ class IntervalTree:
         return y
     
     def _rotate_right(self, z):
+        self.work.rotations += 1
         y = z.left
         T3 = y.right
         y.right = z
@@ -177,4 +292,38 @@ class IntervalTree:
         current = node
         while current.left:
             current = current.left
-        return current
\ No newline at end of file
+        return current
+
+def combine_metrics(trees):
+    """IntervalTree.metrics() summed over many trees (e.g. one per room)
+    
+    Adds the worst height relative to a balanced tree, mean nodes visited
+    per search and the share of child subtrees a search pruned.
+    """
+    combined = {
+        'trees': 0, 'node_count': 0, 'max_height': 0, 'worst_height_ratio': 0.0,
+        'balance': {}, 'memory_bytes': 0, 'work': WorkCounters().to_dict()
+    }
+    heights = 0
+    for tree in trees:
+        metrics = tree.metrics()
+        combined['trees'] += 1
+        combined['node_count'] += metrics['node_count']
+        combined['memory_bytes'] += metrics['memory_bytes']
+        combined['max_height'] = max(combined['max_height'], metrics['height'])
+        heights += metrics['height']
+        if metrics['min_height']:
+            combined['worst_height_ratio'] = max(combined['worst_height_ratio'],
+                                                 metrics['height'] / metrics['min_height'])
+        for factor, count in metrics['balance'].items():
+            combined['balance'][factor] = combined['balance'].get(factor, 0) + count
+        for name, value in metrics['work'].items():
+            combined['work'][name] += value
+    
+    work = combined['work']
+    combined['mean_height'] = heights / combined['trees'] if combined['trees'] else 0.0
+    combined['visited_per_search'] = work['search_visited'] / work['searches'] if work['searches'] else 0.0
+    # Every visited node offers up to two children; pruned ones were skipped
+    considered = work['search_visited'] - work['searches'] + work['search_pruned']
+    combined['prune_rate'] = work['search_pruned'] / considered if considered > 0 else 0.0
+    return combined
@@ -0,0 +1,35 @@
+from data_structures.bst import BST
+
+
+class PriceIndex:
+    """Rooms indexed by base price; rooms sharing a price share one tree node"""
+    
+    def __init__(self, rooms=()):
+        self.tree = BST()
+        self.count = 0
+        for room in rooms:
+            self.add(room)
+    
+    def add(self, room):
+        bucket = self.tree.search(room.base_price)
+        if bucket is None:
+            bucket = []
+            self.tree.insert(room.base_price, bucket)
+        bucket.append(room)
+        self.count += 1
+    
+    def remove(self, room):
+        bucket = self.tree.search(room.base_price)
+        if bucket is None or room not in bucket:
+            raise ValueError("Room is not in the price index")
+        bucket.remove(room)
+        if not bucket:
+            self.tree.delete(room.base_price)
+        self.count -= 1
+    
+    def range_query(self, min_price, max_price):
+        """All rooms with min_price <= base_price <= max_price, cheapest first"""
+        return [room for bucket in self.tree.range_query(min_price, max_price) for room in bucket]
+    
+    def __len__(self):
+        return self.count
\ No newline at end of file
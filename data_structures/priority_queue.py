@@ -1,3 +1,5 @@
+from heapq import heappop
+
 class PriorityQueue:
     """Min-heap based priority queue for waitlist management"""
     
@@ -30,24 +32,152 @@ class PriorityQueue:
         return len(self.heap) == 0
     
     def _heapify_up(self, index):
-        parent = (index - 1) // 2
-        if index > 0 and self.heap[index][0] < self.heap[parent][0]:
+        while index > 0:
+            parent = (index - 1) // 2
+            if self.heap[index][0] >= self.heap[parent][0]:
+                break
             self.heap[index], self.heap[parent] = self.heap[parent], self.heap[index]
-            self._heapify_up(parent)
+            index = parent
     
     def _heapify_down(self, index):
-        smallest = index
-        left = 2 * index + 1
-        right = 2 * index + 2
-        
-        if left < len(self.heap) and self.heap[left][0] < self.heap[smallest][0]:
-            smallest = left
-        if right < len(self.heap) and self.heap[right][0] < self.heap[smallest][0]:
-            smallest = right
-        
-        if smallest != index:
+        size = len(self.heap)
+        while True:
+            smallest = index
+            left = 2 * index + 1
+            right = 2 * index + 2
+            
+            if left < size and self.heap[left][0] < self.heap[smallest][0]:
+                smallest = left
+            if right < size and self.heap[right][0] < self.heap[smallest][0]:
+                smallest = right
+            
+            if smallest == index:
+                break
             self.heap[index], self.heap[smallest] = self.heap[smallest], self.heap[index]
-            self._heapify_down(smallest)
+            index = smallest
+    
+    def __len__(self):
+        return len(self.heap)
+
+
+class IndexedPriorityQueue:
+    """Min-heap with an item -> position map
+    
+    Items must be hashable and unique. Besides push/pop/peek this supports
+    O(log n) update_priority and remove, and O(1) membership tests.
+    """
+    
+    def __init__(self, items=None):
+        self.heap = []
+        self.position = {}
+        if items is not None:
+            self.heapify(items)
+    
+    def push(self, priority, item):
+        """Add item with priority (lower = higher priority)"""
+        if item in self.position:
+            raise ValueError("Item is already in the queue")
+        self.heap.append((priority, item))
+        self.position[item] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+    
+    def heapify(self, items):
+        """Replace the contents with (priority, item) pairs in O(n)"""
+        self.heap = list(items)
+        self.position = {}
+        for index, (_, item) in enumerate(self.heap):
+            if item in self.position:
+                raise ValueError("Item is already in the queue")
+            self.position[item] = index
+        for index in reversed(range(len(self.heap) // 2)):
+            self._sift_down(index)
+    
+    def pop(self):
+        """Remove and return highest priority item"""
+        if not self.heap:
+            return None
+        item = self.heap[0][1]
+        self._remove_at(0)
+        return item
+    
+    def peek(self):
+        """View highest priority item"""
+        return self.heap[0][1] if self.heap else None
+    
+    def contains(self, item):
+        return item in self.position
+    
+    def get_priority(self, item):
+        return self.heap[self.position[item]][0]
+    
+    def update_priority(self, item, priority):
+        """Change an item's priority"""
+        index = self.position[item]
+        old_priority = self.heap[index][0]
+        self.heap[index] = (priority, item)
+        if priority < old_priority:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+    
+    def remove(self, item):
+        """Withdraw an item"""
+        if item not in self.position:
+            raise KeyError(item)
+        self._remove_at(self.position[item])
+    
+    def is_empty(self):
+        return len(self.heap) == 0
+    
+    def ordered(self):
+        """Items from highest to lowest priority, popped lazily from a copy
+        of the heap so the queue itself is left alone"""
+        heap = list(self.heap)
+        while heap:
+            yield heappop(heap)[1]
+    
+    def _remove_at(self, index):
+        del self.position[self.heap[index][1]]
+        last = self.heap.pop()
+        if index == len(self.heap):
+            return
+        
+        self.heap[index] = last
+        self.position[last[1]] = index
+        self._sift_up(index)
+        self._sift_down(self.position[last[1]])
+    
+    def _sift_up(self, index):
+        entry = self.heap[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if entry[0] >= self.heap[parent][0]:
+                break
+            self.heap[index] = self.heap[parent]
+            self.position[self.heap[index][1]] = index
+            index = parent
+        self.heap[index] = entry
+        self.position[entry[1]] = index
+    
+    def _sift_down(self, index):
+        size = len(self.heap)
+        entry = self.heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and self.heap[child + 1][0] < self.heap[child][0]:
+                child += 1
+            if self.heap[child][0] >= entry[0]:
+                break
+            self.heap[index] = self.heap[child]
+            self.position[self.heap[index][1]] = index
+            index = child
+        self.heap[index] = entry
+        self.position[entry[1]] = index
+    
+    def __contains__(self, item):
+        return item in self.position
     
     def __len__(self):
-        return len(self.heap)
\ No newline at end of file
+        return len(self.heap)
@@ -8,6 +8,9 @@ class BookingStatus(Enum):
     CANCELLED = "Cancelled"
 
 class Booking:
+    __slots__ = ('booking_id', 'guest_id', 'room_id', 'check_in', 'check_out', 'total_price',
+                 'status', 'created_at', 'special_requests')
+    
     def __init__(self, booking_id, guest_id, room_id, check_in, check_out, total_price):
         self.booking_id = booking_id
         self.guest_id = guest_id
@@ -19,6 +22,9 @@ class Booking:
         self.created_at = datetime.now()
         self.special_requests = []
     
+    def cancel(self):
+        self.status = BookingStatus.CANCELLED
+    
     def get_duration(self):
         return (self.check_out - self.check_in).days
     
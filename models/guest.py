@@ -9,6 +9,17 @@ class LoyaltyTier(Enum):
     PLATINUM = "Platinum"
 
 class Guest:
+    __slots__ = ('guest_id', 'name', 'email', 'phone', 'id_proof', 'loyalty_tier', 'loyalty_points',
+                 'booking_history', 'preferences', 'created_at')
+    
+    # Minimum points per tier, highest first
+    TIER_THRESHOLDS = [
+        (10000, LoyaltyTier.PLATINUM),
+        (5000, LoyaltyTier.GOLD),
+        (2000, LoyaltyTier.SILVER),
+        (500, LoyaltyTier.BRONZE)
+    ]
+    
     def __init__(self, guest_id, name, email, phone, id_proof):
         self.guest_id = guest_id
         self.name = name
@@ -26,14 +37,14 @@ class Guest:
         self._update_tier()
     
     def _update_tier(self):
-        if self.loyalty_points >= 10000:
-            self.loyalty_tier = LoyaltyTier.PLATINUM
-        elif self.loyalty_points >= 5000:
-            self.loyalty_tier = LoyaltyTier.GOLD
-        elif self.loyalty_points >= 2000:
-            self.loyalty_tier = LoyaltyTier.SILVER
-        elif self.loyalty_points >= 500:
-            self.loyalty_tier = LoyaltyTier.BRONZE
+        self.loyalty_tier = Guest.tier_for_points(self.loyalty_points)
+    
+    @staticmethod
+    def tier_for_points(points):
+        for threshold, tier in Guest.TIER_THRESHOLDS:
+            if points >= threshold:
+                return tier
+        return LoyaltyTier.NONE
     
     def to_dict(self):
         return {
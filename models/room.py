@@ -13,6 +13,8 @@ class RoomStatus(Enum):
     MAINTENANCE = "Maintenance"
 
 class Room:
+    __slots__ = ('room_id', 'room_number', 'room_type', 'floor', 'base_price', 'features', 'status')
+    
     def __init__(self, room_id, room_number, room_type, floor, base_price, features=None):
         self.room_id = room_id
         self.room_number = room_number
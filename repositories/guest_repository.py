@@ -0,0 +1,210 @@
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from itertools import islice
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_NON_DIGIT = re.compile(r'\D')
+_SPACE = re.compile(r'\s')
+
+
+def normalize_name(name):
+    """Lower-case, accent-free name tokens"""
+    text = name or ''
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _TOKEN.findall(text.lower())
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def normalize_phone(phone):
+    return _NON_DIGIT.sub('', phone or '')
+
+
+def normalize_id_proof(id_proof):
+    return _SPACE.sub('', id_proof or '').upper()
+
+
+class GuestRepository:
+    """Guests by id, with exact indexes on email/phone/ID proof and a name prefix index
+    
+    Each name token is kept in one sorted list of (token, guest_id) pairs,
+    so a prefix search is a bisect plus a walk over the matching run.
+    
+    The keys a guest was indexed under are remembered, so after editing a
+    guest's details reindex() can drop the old entries.
+    """
+    
+    def __init__(self, guests=()):
+        self.guests = {}
+        self.by_email = {}
+        self.by_phone = {}
+        self.by_id_proof = {}
+        self.name_tokens = []
+        # guest_id -> (email, phone, id_proof, name tokens) as last indexed
+        self.indexed_keys = {}
+        self.add_many(guests)
+    
+    def add(self, guest):
+        if guest.guest_id in self.guests:
+            self._unindex(guest.guest_id)
+        self.guests[guest.guest_id] = guest
+        self._index(guest)
+    
+    def add_many(self, guests):
+        """Bulk add: index names with one sort instead of one insort per token"""
+        tokens = []
+        for guest in guests:
+            if guest.guest_id in self.guests:
+                self._unindex(guest.guest_id)
+            self.guests[guest.guest_id] = guest
+            self._index(guest, tokens)
+        self.name_tokens.extend(tokens)
+        self.name_tokens.sort()
+    
+    def remove(self, guest_id):
+        guest = self.guests.pop(guest_id)
+        self._unindex(guest_id)
+        return guest
+    
+    def reindex(self, guest):
+        """Refresh the indexes after a guest's name or contact details changed"""
+        self.add(guest)
+    
+    def find_by_email(self, email):
+        return self._lookup(self.by_email, normalize_email(email))
+    
+    def find_by_phone(self, phone):
+        return self._lookup(self.by_phone, normalize_phone(phone))
+    
+    def find_by_id_proof(self, id_proof):
+        return self._lookup(self.by_id_proof, normalize_id_proof(id_proof))
+    
+    def find_duplicates(self, email=None, phone=None, id_proof=None):
+        """Existing guests sharing any of the given email, phone or ID proof"""
+        matches = {}
+        if normalize_email(email):
+            for guest in self.find_by_email(email):
+                matches[guest.guest_id] = guest
+        if normalize_phone(phone):
+            for guest in self.find_by_phone(phone):
+                matches[guest.guest_id] = guest
+        if normalize_id_proof(id_proof):
+            for guest in self.find_by_id_proof(id_proof):
+                matches[guest.guest_id] = guest
+        return list(matches.values())
+    
+    def search(self, text, limit=20):
+        """Type-ahead search: exact email/phone/ID, then name-prefix matches
+        
+        Every word typed must prefix some token of the guest's name.
+        """
+        results = {}
+        for guest in self.find_duplicates(text, text, text):
+            results[guest.guest_id] = guest
+        
+        words = normalize_name(text)
+        if words:
+            # Walk the run of the longest word; it is the most selective
+            anchor = max(words, key=len)
+            others = [w for w in words if w is not anchor]
+            pos = bisect_left(self.name_tokens, (anchor, ''))
+            while pos < len(self.name_tokens) and len(results) < limit:
+                token, guest_id = self.name_tokens[pos]
+                if not token.startswith(anchor):
+                    break
+                pos += 1
+                if guest_id in results:
+                    continue
+                guest = self.guests[guest_id]
+                tokens = normalize_name(guest.name)
+                if all(any(t.startswith(w) for t in tokens) for w in others):
+                    results[guest_id] = guest
+        
+        return list(results.values())[:limit]
+    
+    def first(self, limit=20):
+        return list(islice(self.guests.values(), limit))
+    
+    def _index(self, guest, pending_tokens=None):
+        guest_id = guest.guest_id
+        email = normalize_email(guest.email)
+        phone = normalize_phone(guest.phone)
+        id_proof = normalize_id_proof(guest.id_proof)
+        tokens = tuple(set(normalize_name(guest.name)))
+        self.indexed_keys[guest_id] = (email, phone, id_proof, tokens)
+        
+        self._add_key(self.by_email, email, guest_id)
+        self._add_key(self.by_phone, phone, guest_id)
+        self._add_key(self.by_id_proof, id_proof, guest_id)
+        for token in tokens:
+            if pending_tokens is None:
+                insort(self.name_tokens, (token, guest_id))
+            else:
+                pending_tokens.append((token, guest_id))
+    
+    def _unindex(self, guest_id):
+        # The guest object may already hold new details; use the old keys
+        email, phone, id_proof, tokens = self.indexed_keys.pop(guest_id)
+        self._remove_key(self.by_email, email, guest_id)
+        self._remove_key(self.by_phone, phone, guest_id)
+        self._remove_key(self.by_id_proof, id_proof, guest_id)
+        for token in tokens:
+            pos = bisect_left(self.name_tokens, (token, guest_id))
+            if pos < len(self.name_tokens) and self.name_tokens[pos] == (token, guest_id):
+                del self.name_tokens[pos]
+    
+    def _add_key(self, index, key, guest_id):
+        # A single id is stored bare; only shared keys pay for a tuple
+        if not key:
+            return
+        existing = index.get(key)
+        if existing is None:
+            index[key] = guest_id
+        elif isinstance(existing, tuple):
+            index[key] = existing + (guest_id,)
+        else:
+            index[key] = (existing, guest_id)
+    
+    def _remove_key(self, index, key, guest_id):
+        existing = index.get(key)
+        if existing == guest_id:
+            del index[key]
+        elif isinstance(existing, tuple):
+            remaining = tuple(gid for gid in existing if gid != guest_id)
+            index[key] = remaining[0] if len(remaining) == 1 else remaining
+    
+    def _lookup(self, index, key):
+        existing = index.get(key)
+        if existing is None:
+            return []
+        if isinstance(existing, tuple):
+            return [self.guests[gid] for gid in existing]
+        return [self.guests[existing]]
+    
+    # Mapping interface so callers can keep treating this like the old dict
+    
+    def __getitem__(self, guest_id):
+        return self.guests[guest_id]
+    
+    def get(self, guest_id, default=None):
+        return self.guests.get(guest_id, default)
+    
+    def values(self):
+        return self.guests.values()
+    
+    def items(self):
+        return self.guests.items()
+    
+    def __iter__(self):
+        return iter(self.guests)
+    
+    def __contains__(self, guest_id):
+        return guest_id in self.guests
+    
+    def __len__(self):
+        return len(self.guests)
@@ -0,0 +1,121 @@
+from data_structures.price_index import PriceIndex
+
+
+class RoomRepository:
+    """Rooms with hash indexes on id/number and slot bitmaps per type, floor and feature
+    
+    Every room gets a slot number; the type, floor and feature indexes are
+    Python ints with bit i set when the room in slot i matches, so compound
+    queries are a handful of bitwise ANDs.
+    """
+    
+    def __init__(self, rooms=()):
+        self.slots = []
+        self.slot_of = {}
+        self.by_number = {}
+        self.type_bits = {}
+        self.floor_bits = {}
+        self.feature_bits = {}
+        self.all_bits = 0
+        self.price_index = PriceIndex()
+        for room in rooms:
+            self.add(room)
+    
+    def add(self, room):
+        if room.room_id in self.slot_of:
+            raise ValueError(f"Room {room.room_id} already exists")
+        
+        slot = len(self.slots)
+        bit = 1 << slot
+        self.slots.append(room)
+        self.slot_of[room.room_id] = slot
+        self.by_number[room.room_number] = room
+        self.type_bits[room.room_type] = self.type_bits.get(room.room_type, 0) | bit
+        self.floor_bits[room.floor] = self.floor_bits.get(room.floor, 0) | bit
+        for feature in room.features:
+            self.feature_bits[feature] = self.feature_bits.get(feature, 0) | bit
+        self.all_bits |= bit
+        self.price_index.add(room)
+    
+    def remove(self, room_id):
+        slot = self.slot_of.pop(room_id)
+        room = self.slots[slot]
+        mask = ~(1 << slot)
+        
+        self.slots[slot] = None
+        del self.by_number[room.room_number]
+        self.type_bits[room.room_type] &= mask
+        self.floor_bits[room.floor] &= mask
+        for feature in room.features:
+            self.feature_bits[feature] &= mask
+        self.all_bits &= mask
+        self.price_index.remove(room)
+        return room
+    
+    def get(self, room_id):
+        """Get a room by ID"""
+        slot = self.slot_of.get(room_id)
+        return None if slot is None else self.slots[slot]
+    
+    def get_by_number(self, room_number):
+        return self.by_number.get(room_number)
+    
+    def by_type(self, room_type):
+        return self._rooms(self.type_bits.get(room_type, 0))
+    
+    def by_floor(self, floor):
+        return self._rooms(self.floor_bits.get(floor, 0))
+    
+    def features_mask(self, features):
+        """Slot bitmap of rooms that have every feature in features"""
+        bits = self.all_bits
+        for feature in features:
+            bits &= self.feature_bits.get(feature, 0)
+        return bits
+    
+    def query(self, room_type=None, floor=None, min_floor=None, max_floor=None,
+              features=None, min_price=None, max_price=None):
+        """Rooms matching every given condition, in insertion order"""
+        bits = self.all_bits
+        
+        if room_type is not None:
+            bits &= self.type_bits.get(room_type, 0)
+        
+        if floor is not None:
+            bits &= self.floor_bits.get(floor, 0)
+        if min_floor is not None or max_floor is not None:
+            floor_mask = 0
+            for f, f_bits in self.floor_bits.items():
+                if (min_floor is None or f >= min_floor) and (max_floor is None or f <= max_floor):
+                    floor_mask |= f_bits
+            bits &= floor_mask
+        
+        if features:
+            bits &= self.features_mask(features)
+        
+        if min_price is not None or max_price is not None:
+            low = min_price if min_price is not None else float('-inf')
+            high = max_price if max_price is not None else float('inf')
+            price_mask = 0
+            for room in self.price_index.range_query(low, high):
+                price_mask |= 1 << self.slot_of[room.room_id]
+            bits &= price_mask
+        
+        return self._rooms(bits)
+    
+    def _rooms(self, bits):
+        rooms = []
+        while bits:
+            low = bits & -bits
+            rooms.append(self.slots[low.bit_length() - 1])
+            bits ^= low
+        return rooms
+    
+    def __iter__(self):
+        return (room for room in self.slots if room is not None)
+    
+    def __len__(self):
+        return len(self.slot_of)
+    
+    def __contains__(self, room_id):
+        return room_id in self.slot_of
@@ -1,43 +1,236 @@
-from data_structures.graph import Graph
+import random
+import time
+from datetime import datetime
+from models.booking import BookingStatus
+from models.room import RoomStatus
+from data_structures.graph import CSRGraph
+from repositories.room_repository import RoomRepository
+from services.instrumentation import instrumented
 
 class AllocationService:
-    def __init__(self, booking_service):
+    def __init__(self, booking_service, rooms=None):
         self.booking_service = booking_service
-        self.room_graph = Graph()
+        self.rooms = rooms if rooms is not None else RoomRepository()
+        self.room_graph = CSRGraph.from_rooms([])
     
-    def build_room_graph(self, rooms):
-        """Build adjacency graph"""
-        # Group by floor
-        floors = {}
-        for room in rooms:
-            if room.floor not in floors:
-                floors[room.floor] = []
-            floors[room.floor].append(room)
-        
-        # Connect adjacent rooms
-        for floor_rooms in floors.values():
-            floor_rooms.sort(key=lambda r: r.room_number)
-            for i in range(len(floor_rooms) - 1):
-                self.room_graph.add_edge(floor_rooms[i].room_id, floor_rooms[i+1].room_id)
+    def build_room_graph(self, rooms=None, vertical=False):
+        """Build adjacency graph (corridor neighbours, optionally across floors)"""
+        self.room_graph = CSRGraph.from_rooms(rooms if rooms is not None else self.rooms, vertical)
     
-    def allocate_group_booking(self, num_rooms, check_in, check_out, all_rooms):
+    @instrumented()
+    def allocate_group_booking(self, num_rooms, check_in, check_out, all_rooms=None):
         """Allocate rooms for group"""
+        if all_rooms is None:
+            all_rooms = self.rooms
         available = self.booking_service.find_available_rooms(check_in, check_out, all_rooms)
         
         if len(available) < num_rooms:
             return None
         
-        available_ids = {room.room_id for room in available}
+        graph = self.room_graph
+        available_idx = [graph.index[r.room_id] for r in available if r.room_id in graph.index]
         
-        # Find best connected component
-        best_rooms = []
-        for room in available:
-            component = self.room_graph.find_connected_component(room.room_id, available_ids)
-            if len(component) >= num_rooms:
-                best_rooms = component[:num_rooms]
-                break
+        # Best fit: smallest connected block that still holds the group,
+        # so larger blocks stay free for bigger groups
+        components = graph.connected_components(available_idx)
+        fitting = [c for c in components if len(c) >= num_rooms]
         
-        if not best_rooms:
-            best_rooms = [r.room_id for r in available[:num_rooms]]
+        if fitting:
+            best = min(fitting, key=len)
+            return [graph.room_ids[i] for i in graph.contiguous_block(best, num_rooms)]
         
-        return best_rooms
\ No newline at end of file
+        return [r.room_id for r in available[:num_rooms]]
+    
+    @instrumented()
+    def allocate_group_batch(self, requests, all_rooms=None, time_budget=1.0, seed=None):
+        """Allocate contiguous blocks for many (num_rooms, check_in, check_out) requests
+        
+        Requests are placed one at a time in some order with the same best-fit
+        rule as allocate_group_booking; a local search over that order runs
+        until time_budget seconds have passed, keeping the order with the
+        fewest unplaced requests, then split blocks, then orphaned rooms.
+        """
+        started = time.perf_counter()
+        rng = random.Random(seed)
+        if all_rooms is None:
+            all_rooms = self.rooms
+        graph = self.room_graph
+        
+        free = []
+        for num_rooms, check_in, check_out in requests:
+            available = self.booking_service.find_available_rooms(check_in, check_out, all_rooms)
+            free.append(frozenset(graph.index[r.room_id] for r in available if r.room_id in graph.index))
+        
+        # Requests with overlapping dates compete for the same rooms
+        conflicts = [
+            [j for j, (_, other_in, other_out) in enumerate(requests)
+             if j != i and check_in < other_out and other_in < check_out]
+            for i, (_, check_in, check_out) in enumerate(requests)
+        ]
+        min_size = min((r[0] for r in requests), default=0)
+        
+        def place(order):
+            assigned = {}
+            unplaced = splits = orphans = 0
+            for i in order:
+                num_rooms = requests[i][0]
+                blocked = set()
+                for j in conflicts[i]:
+                    blocked.update(assigned.get(j, ()))
+                available = free[i] - blocked
+                
+                if len(available) < num_rooms:
+                    unplaced += 1
+                    continue
+                
+                components = graph.connected_components(list(available))
+                fitting = [c for c in components if len(c) >= num_rooms]
+                if fitting:
+                    best = min(fitting, key=len)
+                    assigned[i] = graph.contiguous_block(best, num_rooms)
+                    if 0 < len(best) - num_rooms < min_size:
+                        orphans += len(best) - num_rooms
+                else:
+                    # Not enough contiguous rooms: fill from the largest blocks
+                    block = []
+                    for component in sorted(components, key=len, reverse=True):
+                        block.extend(component[:num_rooms - len(block)])
+                        splits += 1
+                        if len(block) == num_rooms:
+                            break
+                    assigned[i] = block
+                    splits -= 1
+            return (unplaced, splits, orphans), assigned
+        
+        # Largest groups first, then earliest arrival
+        order = sorted(range(len(requests)), key=lambda i: (-requests[i][0], requests[i][1]))
+        score, assigned = place(order)
+        best_score, best_assigned = score, assigned
+        iterations = 1
+        
+        while len(order) > 1 and best_score != (0, 0, 0) and time.perf_counter() - started < time_budget:
+            candidate = order[:]
+            a, b = rng.sample(range(len(candidate)), 2)
+            candidate[a], candidate[b] = candidate[b], candidate[a]
+            candidate_score, candidate_assigned = place(candidate)
+            iterations += 1
+            
+            if candidate_score <= score:
+                order, score = candidate, candidate_score
+                if candidate_score < best_score:
+                    best_score, best_assigned = candidate_score, candidate_assigned
+        
+        assignments = [
+            [graph.room_ids[r] for r in best_assigned[i]] if i in best_assigned else None
+            for i in range(len(requests))
+        ]
+        
+        return {
+            'assignments': assignments,
+            'metrics': {
+                'solve_time': time.perf_counter() - started,
+                'iterations': iterations,
+                'placed': len(best_assigned),
+                'unplaced': best_score[0],
+                'split_blocks': best_score[1],
+                'orphan_rooms': best_score[2]
+            }
+        }
+    
+    @instrumented()
+    def rebook_for_maintenance(self, room_ids, all_rooms=None, from_date=None):
+        """Put rooms into maintenance and move their future bookings
+        
+        Displaced bookings are matched to free rooms of the same type with
+        augmenting paths, so one booking can give way to another when that
+        lets both be placed. Candidate rooms are tried in order: neighbours
+        in room_graph, then the same floor, then the nearest floor. All moves
+        are applied in one batch; bookings with no room are left in place
+        and reported. The rooms are only marked as in maintenance once the
+        moves have gone through.
+        """
+        started = time.perf_counter()
+        if from_date is None:
+            from_date = datetime.now()
+        
+        service = self.booking_service
+        rooms = self.rooms if all_rooms is None else RoomRepository(all_rooms)
+        out_of_service = set(room_ids)
+        unknown = sorted(room_id for room_id in out_of_service if room_id not in rooms)
+        if unknown:
+            raise ValueError(f"Unknown rooms: {', '.join(unknown)}")
+        
+        displaced = []
+        for room_id in out_of_service:
+            for interval in service.room_intervals(room_id, from_date):
+                if service.bookings[interval.booking_id].status == BookingStatus.CONFIRMED:
+                    displaced.append(interval)
+        
+        by_type = {}
+        for room_type in rooms.type_bits:
+            by_type[room_type] = [r for r in rooms.by_type(room_type) if r.room_id not in out_of_service]
+        
+        graph = self.room_graph
+        candidates = {}
+        for interval in displaced:
+            origin = rooms.get(interval.room_id)
+            neighbors = set()
+            if origin.room_id in graph.index:
+                neighbors = {graph.room_ids[i] for i in graph.get_neighbors(graph.index[origin.room_id])}
+            
+            free = service.find_available_rooms(
+                interval.start, interval.end, by_type.get(origin.room_type, []))
+            free.sort(key=lambda r: (r.room_id not in neighbors,
+                                     r.floor != origin.floor,
+                                     abs(r.floor - origin.floor),
+                                     r.room_number))
+            candidates[interval.booking_id] = [room.room_id for room in free]
+        
+        placed = {}
+        match = {}
+        
+        def assign(interval, visited):
+            for room_id in candidates[interval.booking_id]:
+                if room_id in visited:
+                    continue
+                visited.add(room_id)
+                
+                clashes = [other for other in placed.get(room_id, []) if other.overlaps(interval)]
+                if not clashes:
+                    placed.setdefault(room_id, []).append(interval)
+                    match[interval.booking_id] = room_id
+                    return True
+                
+                if len(clashes) == 1:
+                    # Take the room and try to re-home the booking it displaces
+                    other = clashes[0]
+                    placed[room_id].remove(other)
+                    placed[room_id].append(interval)
+                    match[interval.booking_id] = room_id
+                    del match[other.booking_id]
+                    if assign(other, visited):
+                        return True
+                    placed[room_id].remove(interval)
+                    placed[room_id].append(other)
+                    del match[interval.booking_id]
+                    match[other.booking_id] = room_id
+            return False
+        
+        # Most constrained bookings first
+        displaced.sort(key=lambda iv: (len(candidates[iv.booking_id]), iv.start))
+        unresolved = [iv.booking_id for iv in displaced if not assign(iv, set())]
+        
+        moves = {
+            interval.booking_id: (interval.room_id, match[interval.booking_id])
+            for interval in displaced if interval.booking_id in match
+        }
+        if moves:
+            service.move_bookings(moves)
+        for room_id in out_of_service:
+            rooms.get(room_id).status = RoomStatus.MAINTENANCE
+        
+        return {
+            'moved': [(bid, old, new) for bid, (old, new) in moves.items()],
+            'unresolved': unresolved,
+            'elapsed': time.perf_counter() - started
+        }
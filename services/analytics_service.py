@@ -1,54 +1,61 @@
 from datetime import datetime, timedelta
 from collections import defaultdict
+from repositories.room_repository import RoomRepository
+from services.instrumentation import instrumented
 
 class AnalyticsService:
     def __init__(self, booking_service, rooms):
         self.booking_service = booking_service
-        self.rooms = {r.room_id: r for r in rooms}
+        self.rooms = rooms if isinstance(rooms, RoomRepository) else RoomRepository(rooms)
     
+    @instrumented()
     def get_occupancy_rate(self, start_date, end_date):
         """Calculate occupancy rate"""
         total_room_nights = len(self.rooms) * (end_date - start_date).days
         occupied_nights = 0
         
-        for booking in self.booking_service.get_all_bookings():
-            if booking.status.value == "Cancelled":
+        for _, _, _, check_in, check_out, _, status in self.booking_service.booking_rows():
+            if status.value == "Cancelled":
                 continue
             
-            overlap_start = max(booking.check_in, start_date)
-            overlap_end = min(booking.check_out, end_date)
+            overlap_start = max(check_in, start_date)
+            overlap_end = min(check_out, end_date)
             
             if overlap_start < overlap_end:
                 occupied_nights += (overlap_end - overlap_start).days
         
         return (occupied_nights / total_room_nights * 100) if total_room_nights > 0 else 0
     
+    @instrumented()
     def get_revenue(self, start_date, end_date):
         """Calculate total revenue"""
         total = 0
-        for booking in self.booking_service.get_all_bookings():
-            if booking.status.value != "Cancelled":
-                if start_date <= booking.check_in < end_date:
-                    total += booking.total_price
+        for _, _, _, check_in, _, total_price, status in self.booking_service.booking_rows():
+            if status.value != "Cancelled":
+                if start_date <= check_in < end_date:
+                    total += total_price
         return total
     
+    @instrumented()
     def get_room_type_distribution(self):
         """Get bookings by room type"""
+        # The interval trees hold exactly the non-cancelled bookings, so count
+        # per room from their sizes and resolve each room only once
         distribution = defaultdict(int)
-        for booking in self.booking_service.get_all_bookings():
-            if booking.status.value != "Cancelled":
-                room = self.rooms.get(booking.room_id)
-                if room:
-                    distribution[room.room_type.value] += 1
+        for room_id, count in self.booking_service.active_booking_counts().items():
+            room = self.rooms.get(room_id)
+            if room and count:
+                distribution[room.room_type.value] += count
         return dict(distribution)
     
+    @instrumented()
     def get_booking_stats(self):
         """Get overall statistics"""
-        bookings = self.booking_service.get_all_bookings()
-        total = len(bookings)
-        confirmed = sum(1 for b in bookings if b.status.value == "Confirmed")
-        cancelled = sum(1 for b in bookings if b.status.value == "Cancelled")
-        checked_in = sum(1 for b in bookings if b.status.value == "Checked In")
+        statuses = [row[6].value for row in self.booking_service.booking_rows()]
+        total = len(statuses)
+        confirmed = statuses.count("Confirmed")
+        cancelled = statuses.count("Cancelled")
+        checked_in = statuses.count("Checked In")
         
         return {
             'total': total,
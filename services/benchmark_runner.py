@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from services.benchmark_suite import BenchmarkSuite, CASES, PROFILES
+
+def available_cpus():
+    """CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def run_task(suite_options, num_bookings, num_rooms, cases, cpu):
+    """Worker entry point: pin to cpu, build the fixture, run the cases"""
+    if cpu is not None and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {cpu})
+    started = time.perf_counter()
+    suite = BenchmarkSuite(**suite_options)
+    results = suite.run_size(num_bookings, num_rooms, cases)
+    return {
+        'results': results,
+        'cpu': cpu,
+        'pid': os.getpid(),
+        'elapsed': time.perf_counter() - started
+    }
+
+
+class ParallelBenchmarkRunner:
+    """Spread independent benchmark tasks over a process pool
+    
+    A task is one size with all its cases, sharing a fixture. With
+    isolate=True every (size, case) pair is its own task and each worker
+    process runs a single task, so no case sees another's heap or caches.
+    With pin=True each running task is bound to a CPU nobody else is using.
+    Results come back in the same report schema as BenchmarkSuite.run.
+    """
+    
+    def __init__(self, workers=None, isolate=False, pin=True, **suite_options):
+        self.cpus = available_cpus()
+        self.workers = min(workers or len(self.cpus), len(self.cpus)) if pin else (workers or len(self.cpus))
+        self.isolate = isolate
+        self.pin = pin and hasattr(os, 'sched_setaffinity')
+        self.suite_options = suite_options
+    
+    def tasks(self, sizes, cases=None):
+        names = [name for name in CASES if cases is None or name in cases]
+        # Biggest first so the longest task doesn't start last
+        sizes = sorted(sizes, key=lambda size: size[0] * max(1, size[1]), reverse=True)
+        if not self.isolate:
+            return [(num_bookings, num_rooms, names) for num_bookings, num_rooms in sizes]
+        return [(num_bookings, num_rooms, [name]) for num_bookings, num_rooms in sizes for name in names]
+    
+    def run(self, sizes=None, cases=None, progress=None, profile=None):
+        """Run every task and return a report; progress(event) is called
+        in this process as each task finishes"""
+        if sizes is None:
+            sizes = PROFILES[profile or 'quick']
+        pending = self.tasks(sizes, cases)
+        total = len(pending)
+        free_cpus = list(self.cpus[:self.workers])
+        results = {}
+        started = time.perf_counter()
+        
+        # spawn: max_tasks_per_child can't be combined with fork
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 max_tasks_per_child=1 if self.isolate else None) as pool:
+            running = {}
+            while pending or running:
+                # Only hand out as many tasks as there are free CPUs, so two
+                # running tasks never share one
+                while pending and len(running) < self.workers:
+                    num_bookings, num_rooms, names = pending.pop(0)
+                    cpu = free_cpus.pop() if self.pin else None
+                    future = pool.submit(run_task, self.suite_options, num_bookings, num_rooms, names, cpu)
+                    running[future] = cpu
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    cpu = running.pop(future)
+                    if cpu is not None:
+                        free_cpus.append(cpu)
+                    outcome = future.result()
+                    results.update(outcome['results'])
+                    if progress:
+                        progress({
+                            'completed': total - len(pending) - len(running),
+                            'total': total,
+                            'results': list(outcome['results'].values()),
+                            'cpu': outcome['cpu'],
+                            'pid': outcome['pid'],
+                            'elapsed': outcome['elapsed']
+                        })
+        
+        report = BenchmarkSuite(**self.suite_options).make_report(results, profile)
+        report['meta'].update({
+            'workers': self.workers,
+            'isolated': self.isolate,
+            'pinned': self.pin,
+            'wall_time': time.perf_counter() - started
+        })
+        return report
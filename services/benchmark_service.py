@@ -1,7 +1,21 @@
 import time
+import heapq
 import random
+import tracemalloc
+import gc
+import json
+import os
+import tempfile
 from datetime import datetime, timedelta
-from data_structures.interval_tree import IntervalTree, Interval
+from data_structures.interval_tree import IntervalTree, Interval, IntervalNode
+from data_structures.graph import Graph, CSRGraph
+from data_structures.priority_queue import IndexedPriorityQueue
+from models.room import Room, RoomType
+from models.booking import Booking, BookingStatus
+from models.guest import Guest
+from services.booking_service import BookingService
+from services.allocation_service import AllocationService
+from services.loyalty_service import LoyaltyService
 
 class BenchmarkService:
     
@@ -110,4 +124,408 @@ class BenchmarkService:
                 'speedup': speedup
             })
         
-        return results
\ No newline at end of file
+        return results
+    
+    @staticmethod
+    def generate_rooms(num_rooms, rooms_per_floor=100):
+        """Generate a property with long single-corridor floors"""
+        rooms = []
+        for i in range(num_rooms):
+            floor = i // rooms_per_floor + 1
+            room_number = floor * 1000 + i % rooms_per_floor
+            rooms.append(Room(f"R{room_number}", room_number, RoomType.STANDARD, floor, 100.0))
+        return rooms
+    
+    @staticmethod
+    def build_list_graph(rooms, vertical=False):
+        """Adjacency-list graph built edge by edge (previous representation)"""
+        graph = Graph()
+        floors = {}
+        for room in rooms:
+            floors.setdefault(room.floor, []).append(room)
+        for floor_rooms in floors.values():
+            floor_rooms.sort(key=lambda r: r.room_number)
+            for i in range(len(floor_rooms) - 1):
+                graph.add_edge(floor_rooms[i].room_id, floor_rooms[i + 1].room_id)
+        if vertical:
+            for floor, floor_rooms in floors.items():
+                for upper, lower in zip(floors.get(floor + 1, []), floor_rooms):
+                    graph.add_edge(lower.room_id, upper.room_id)
+        return graph
+    
+    @staticmethod
+    def legacy_group_allocation(booking_service, room_graph, num_rooms, check_in, check_out, all_rooms):
+        """Previous approach: one DFS per available room"""
+        available = booking_service.find_available_rooms(check_in, check_out, all_rooms)
+        if len(available) < num_rooms:
+            return None
+        
+        available_ids = {room.room_id for room in available}
+        for room in available:
+            component = room_graph.find_connected_component(room.room_id, available_ids)
+            if len(component) >= num_rooms:
+                return component[:num_rooms]
+        
+        return [r.room_id for r in available[:num_rooms]]
+    
+    @staticmethod
+    def benchmark_group_allocation(room_counts=[100, 1000, 10000], group_size=50, rooms_per_floor=1000):
+        """Compare union-find group allocation with per-room DFS"""
+        results = []
+        check_in = datetime(2026, 3, 1)
+        check_out = datetime(2026, 3, 4)
+        
+        for count in room_counts:
+            rooms = BenchmarkService.generate_rooms(count, rooms_per_floor)
+            booking_service = BookingService()
+            
+            # Blocks one room short of the group everywhere except at the far
+            # end of the property, so the legacy scan re-walks every block
+            free_tail = min(count, group_size * 2)
+            for i, room in enumerate(rooms[:count - free_tail]):
+                if i % group_size == group_size - 1:
+                    booking_service.create_booking("G0001", room.room_id, check_in, check_out, 0)
+            
+            allocation_service = AllocationService(booking_service)
+            allocation_service.build_room_graph(rooms)
+            
+            list_graph = BenchmarkService.build_list_graph(rooms)
+            
+            start = time.perf_counter()
+            legacy = BenchmarkService.legacy_group_allocation(
+                booking_service, list_graph, group_size, check_in, check_out, rooms)
+            legacy_time = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            union_find = allocation_service.allocate_group_booking(group_size, check_in, check_out, rooms)
+            union_find_time = time.perf_counter() - start
+            
+            results.append({
+                'count': count,
+                'legacy_time': legacy_time,
+                'union_find_time': union_find_time,
+                'speedup': legacy_time / union_find_time if union_find_time > 0 else 0,
+                'legacy_rooms': legacy,
+                'union_find_rooms': union_find
+            })
+        
+        return results
+    
+    @staticmethod
+    def benchmark_room_graph(room_counts=[1000, 10000, 100000], rooms_per_floor=100, vertical=True):
+        """Compare adjacency-list and CSR room graphs: memory, build and lookup time"""
+        results = []
+        
+        for count in room_counts:
+            rooms = BenchmarkService.generate_rooms(count, rooms_per_floor)
+            row = {'count': count}
+            
+            for name, build in (('list', BenchmarkService.build_list_graph),
+                                ('csr', CSRGraph.from_rooms)):
+                tracemalloc.start()
+                start = time.perf_counter()
+                graph = build(rooms, vertical)
+                build_time = time.perf_counter() - start
+                memory = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+                
+                keys = [r.room_id for r in rooms] if name == 'list' else range(count)
+                start = time.perf_counter()
+                for key in keys:
+                    for _ in graph.get_neighbors(key):
+                        pass
+                lookup_time = (time.perf_counter() - start) / count
+                
+                start = time.perf_counter()
+                graph.connected_components(list(keys))
+                components_time = time.perf_counter() - start
+                
+                row[name] = {
+                    'memory_bytes': memory,
+                    'build_time': build_time,
+                    'avg_neighbor_time': lookup_time,
+                    'components_time': components_time
+                }
+            
+            row['memory_ratio'] = row['list']['memory_bytes'] / max(1, row['csr']['memory_bytes'])
+            results.append(row)
+        
+        return results
+    
+    @staticmethod
+    def generate_queue_operations(size, num_operations, seed=0):
+        """Initial (priority, item) pairs plus a mix of update/remove/pop/push"""
+        rng = random.Random(seed)
+        initial = [(rng.random(), i) for i in range(size)]
+        live = list(range(size))
+        next_item = size
+        operations = []
+        
+        for _ in range(num_operations):
+            roll = rng.random()
+            if roll < 0.35 and live:
+                operations.append(('update', live[rng.randrange(len(live))], rng.random()))
+            elif roll < 0.6 and live:
+                index = rng.randrange(len(live))
+                live[index], live[-1] = live[-1], live[index]
+                operations.append(('remove', live.pop(), None))
+            elif roll < 0.8:
+                operations.append(('push', next_item, rng.random()))
+                live.append(next_item)
+                next_item += 1
+            else:
+                operations.append(('pop', None, None))
+        
+        return initial, operations
+    
+    @staticmethod
+    def run_indexed_queue(initial, operations):
+        """Replay operations on IndexedPriorityQueue"""
+        queue = IndexedPriorityQueue(initial)
+        for op, item, priority in operations:
+            if op == 'update':
+                if item in queue:
+                    queue.update_priority(item, priority)
+            elif op == 'remove':
+                if item in queue:
+                    queue.remove(item)
+            elif op == 'push':
+                queue.push(priority, item)
+            else:
+                queue.pop()
+        return len(queue)
+    
+    @staticmethod
+    def run_lazy_heapq(initial, operations):
+        """Replay operations on heapq with lazy deletion (baseline)"""
+        heap = []
+        entries = {}
+        counter = 0
+        for priority, item in initial:
+            entry = [priority, counter, item, True]
+            entries[item] = entry
+            heap.append(entry)
+            counter += 1
+        heapq.heapify(heap)
+        
+        for op, item, priority in operations:
+            if op in ('update', 'remove'):
+                entry = entries.pop(item, None)
+                if entry is None:
+                    continue
+                entry[3] = False
+                if op == 'update':
+                    entry = [priority, counter, item, True]
+                    entries[item] = entry
+                    heapq.heappush(heap, entry)
+                    counter += 1
+            elif op == 'push':
+                entry = [priority, counter, item, True]
+                entries[item] = entry
+                heapq.heappush(heap, entry)
+                counter += 1
+            else:
+                while heap:
+                    entry = heapq.heappop(heap)
+                    if entry[3]:
+                        del entries[entry[2]]
+                        break
+        return len(entries), len(heap)
+    
+    @staticmethod
+    def benchmark_priority_queue(sizes=[1000, 10000, 100000], num_operations=50000):
+        """Compare IndexedPriorityQueue with heapq plus lazy deletion"""
+        results = []
+        
+        for size in sizes:
+            initial, operations = BenchmarkService.generate_queue_operations(size, num_operations)
+            
+            start = time.perf_counter()
+            indexed_left = BenchmarkService.run_indexed_queue(initial, operations)
+            indexed_time = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            lazy_left, lazy_heap_size = BenchmarkService.run_lazy_heapq(initial, operations)
+            lazy_time = time.perf_counter() - start
+            
+            results.append({
+                'size': size,
+                'operations': num_operations,
+                'indexed_time': indexed_time,
+                'lazy_heapq_time': lazy_time,
+                'ratio': indexed_time / lazy_time if lazy_time > 0 else 0,
+                'remaining': indexed_left,
+                'lazy_stale_entries': lazy_heap_size - lazy_left,
+                'consistent': indexed_left == lazy_left
+            })
+        
+        return results
+    
+    @staticmethod
+    def benchmark_loyalty_recompute(num_bookings=1000000, num_guests=100000, cancel_rate=0.1, seed=0):
+        """Time a full loyalty recomputation over a synthetic booking store"""
+        rng = random.Random(seed)
+        base_date = datetime(2024, 1, 1)
+        guests = [Guest(f"G{i:06d}", f"Guest {i}", f"guest{i}@example.com", "", "") for i in range(num_guests)]
+        
+        bookings = []
+        for i in range(num_bookings):
+            check_in = base_date + timedelta(days=rng.randint(0, 365))
+            booking = Booking(f"B{i:07d}", guests[rng.randrange(num_guests)].guest_id, "R101",
+                              check_in, check_in + timedelta(days=2), rng.uniform(100, 1000))
+            if rng.random() < cancel_rate:
+                booking.status = BookingStatus.CANCELLED
+            bookings.append(booking)
+        
+        loyalty = LoyaltyService(BookingService())
+        
+        first = loyalty.recompute_all(guests, bookings)
+        second = loyalty.recompute_all(guests, bookings)
+        
+        return {
+            'bookings': num_bookings,
+            'guests': num_guests,
+            'first_run_time': first['elapsed'],
+            'first_run_changed': len(first['changed']),
+            'tier_changes': len(first['tier_changes']),
+            'steady_state_time': second['elapsed'],
+            'steady_state_changed': len(second['changed'])
+        }
+    
+    @staticmethod
+    def measure_booking_memory(booking_cls, interval_cls, node_cls, num_bookings, seed=0):
+        """Traced bytes per booking for a Booking plus its Interval and IntervalNode"""
+        rng = random.Random(seed)
+        base_date = datetime(2024, 1, 1)
+        created_at = datetime.now()
+        # Dates and prices are shared so only the per-object overhead is measured
+        dates = [base_date + timedelta(days=d) for d in range(400)]
+        
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        
+        records = []
+        for i in range(num_bookings):
+            check_in = dates[rng.randrange(365)]
+            check_out = dates[rng.randrange(365) + 30]
+            booking = booking_cls(i, i, i, check_in, check_out, 0.0)
+            booking.created_at = created_at
+            records.append(node_cls(interval_cls(check_in, check_out, i, i)))
+            records.append(booking)
+        
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        # The list holding the records isn't part of the model cost
+        used -= len(records) * 8
+        return used / num_bookings
+    
+    @staticmethod
+    def benchmark_model_memory(num_bookings=1000000):
+        """Bytes per booking with the slotted models vs. equivalent __dict__ classes"""
+        def unslotted(cls):
+            return type(cls.__name__ + 'Dict', (), {'__init__': cls.__init__})
+        
+        before = BenchmarkService.measure_booking_memory(
+            unslotted(Booking), unslotted(Interval), unslotted(IntervalNode), num_bookings)
+        after = BenchmarkService.measure_booking_memory(Booking, Interval, IntervalNode, num_bookings)
+        
+        return {
+            'bookings': num_bookings,
+            'bytes_per_booking_dict': before,
+            'bytes_per_booking_slots': after,
+            'saving': 1 - after / before if before > 0 else 0
+        }
+    
+    @staticmethod
+    def generate_booking_records(num_bookings, num_rooms, num_guests, cancel_rate=0.1, seed=0):
+        """Booking dicts in the saved-file format, non-overlapping per room"""
+        rng = random.Random(seed)
+        base_date = datetime(2020, 1, 1)
+        room_free = {}
+        records = []
+        for i in range(num_bookings):
+            room_id = f"R{rng.randrange(num_rooms):04d}"
+            check_in = room_free.get(room_id, base_date) + timedelta(days=rng.randint(0, 3))
+            check_out = check_in + timedelta(days=rng.randint(1, 5))
+            room_free[room_id] = check_out
+            records.append({
+                'booking_id': f"B{i + 1:06d}",
+                'guest_id': f"G{rng.randrange(num_guests):05d}",
+                'room_id': room_id,
+                'check_in': check_in.isoformat(),
+                'check_out': check_out.isoformat(),
+                'total_price': 100.0,
+                'status': 'Cancelled' if rng.random() < cancel_rate else 'Checked Out',
+                'created_at': base_date.isoformat(),
+                'special_requests': []
+            })
+        return records
+    
+    @staticmethod
+    def benchmark_booking_store(num_bookings=200000, num_rooms=2000, num_guests=50000, num_queries=200):
+        """Memory per loaded booking and availability query time on a large store"""
+        records = BenchmarkService.generate_booking_records(num_bookings, num_rooms, num_guests)
+        rooms = [Room(f"R{i:04d}", str(i), RoomType.STANDARD, 1, 100) for i in range(num_rooms)]
+        
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        booking_service = BookingService()
+        for record in records:
+            booking_service.add_booking(Booking.from_dict(record), keep_sorted=False)
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        
+        rng = random.Random(1)
+        start = time.perf_counter()
+        for _ in range(num_queries):
+            check_in = datetime(2020, 1, 1) + timedelta(days=rng.randrange(1500))
+            booking_service.find_available_rooms(check_in, check_in + timedelta(days=2), rooms)
+        query_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for record in records[::10]:
+            booking_service.get_booking(record['booking_id'])
+        lookup_time = time.perf_counter() - start
+        
+        return {
+            'bookings': num_bookings,
+            'rooms': num_rooms,
+            'bytes_per_booking': used / num_bookings,
+            'query_time': query_time,
+            'avg_query_ms': query_time / num_queries * 1000,
+            'lookup_time': lookup_time
+        }
+    
+    @staticmethod
+    def benchmark_startup(num_bookings=200000, num_rooms=2000, num_guests=50000):
+        """Time load_from_file plus the stat-card totals, eager vs lazy"""
+        records = BenchmarkService.generate_booking_records(num_bookings, num_rooms, num_guests)
+        fd, filename = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'booking_counter': num_bookings + 1,
+                       'bookings': {r['booking_id']: r for r in records}}, f)
+        del records
+        
+        results = {'bookings': num_bookings}
+        try:
+            for mode, lazy in (('eager', False), ('lazy', True)):
+                # Don't let the previous mode's garbage count against this one
+                booking_service = None
+                gc.collect()
+                start = time.perf_counter()
+                booking_service = BookingService(lazy=lazy)
+                booking_service.load_from_file(filename)
+                loaded = time.perf_counter() - start
+                
+                # What the dashboard needs before the window is usable
+                active = sum(1 for row in booking_service.booking_rows()
+                             if row[6] == BookingStatus.CONFIRMED)
+                results[f'{mode}_load_time'] = loaded
+                results[f'{mode}_ready_time'] = time.perf_counter() - start
+                results[f'{mode}_active'] = active
+        finally:
+            os.remove(filename)
+        
+        results['speedup'] = (results['eager_ready_time'] / results['lazy_ready_time']
+                              if results['lazy_ready_time'] > 0 else 0)
+        return results
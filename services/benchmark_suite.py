@@ -0,0 +1,394 @@
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from models.room import Room, RoomType
+from services.booking_service import BookingService
+from services.allocation_service import AllocationService
+from services.pricing_service import PricingService
+from services.analytics_service import AnalyticsService
+from services.memory_profiler import MemoryProfiler, profile_booking_load, profile_workload
+from repositories.room_repository import RoomRepository
+
+# (bookings, rooms) pairs run by each profile
+PROFILES = {
+    'quick': [(1000, 10), (10000, 100)],
+    'standard': [(1000, 10), (10000, 100), (100000, 1000)],
+    'full': [(1000, 10), (10000, 100), (100000, 1000), (1000000, 10000)]
+}
+
+# Read-only cases first so the mutating ones can't skew them; load/save last
+CASES = [
+    'find_available_rooms',
+    'group_allocation',
+    'pricing',
+    'occupancy_rate',
+    'revenue',
+    'room_type_distribution',
+    'booking_stats',
+    'create_booking',
+    'cancel_booking',
+    'save',
+    'load'
+]
+
+# Memory cases, run by run_memory under tracemalloc rather than timed
+MEMORY_CASES = ['memory_load', 'memory_workload']
+
+# Cap on replayed workload events per size; generating them is the slow part
+MEMORY_WORKLOAD_EVENTS = 100000
+
+REPORT_SCHEMA = 1
+
+
+def percentile(sorted_samples, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0
+    rank = max(1, -(-len(sorted_samples) * q // 100))
+    return sorted_samples[int(rank) - 1]
+
+
+def summarize(samples_ns):
+    """Repetition statistics for one case, all in nanoseconds"""
+    samples = sorted(samples_ns)
+    return {
+        'samples': len(samples),
+        'min_ns': samples[0],
+        'median_ns': percentile(samples, 50),
+        'mean_ns': sum(samples) // len(samples),
+        'p95_ns': percentile(samples, 95),
+        'p99_ns': percentile(samples, 99),
+        'max_ns': samples[-1]
+    }
+
+
+def case_id(name, num_bookings, num_rooms, engine=None):
+    if engine is None:
+        return f"{name}[bookings={num_bookings},rooms={num_rooms}]"
+    return f"{name}[bookings={num_bookings},rooms={num_rooms},engine={engine}]"
+
+
+def engine_winners(results):
+    """Fastest engine by median for every (case, bookings, rooms) in results
+    
+    Returns rows ordered by case and size, each with the winner and the
+    median of every engine that ran it.
+    """
+    groups = {}
+    for result in results.values():
+        key = (CASES.index(result['case']), result['bookings'], result['rooms'])
+        groups.setdefault(key, {})[result['engine']] = result['median_ns']
+    rows = []
+    for (index, num_bookings, num_rooms), medians in sorted(groups.items()):
+        rows.append({
+            'case': CASES[index],
+            'bookings': num_bookings,
+            'rooms': num_rooms,
+            'winner': min(medians, key=medians.get),
+            'medians': medians
+        })
+    return rows
+
+
+class Fixture:
+    """A seeded property and booking store shared by the cases of one size"""
+    
+    ROOM_TYPES = [(RoomType.STANDARD, 100.0), (RoomType.DELUXE, 180.0),
+                  (RoomType.SUITE, 320.0), (RoomType.PENTHOUSE, 750.0)]
+    
+    def __init__(self, num_bookings, num_rooms, seed=0, engine=None):
+        self.num_bookings = num_bookings
+        self.num_rooms = num_rooms
+        rng = random.Random(seed)
+        
+        rooms_per_floor = min(num_rooms, 100)
+        self.rooms = []
+        for i in range(num_rooms):
+            floor = i // rooms_per_floor + 1
+            room_number = floor * 1000 + i % rooms_per_floor
+            room_type, price = self.ROOM_TYPES[i % len(self.ROOM_TYPES)]
+            self.rooms.append(Room(f"R{room_number}", room_number, room_type, floor, price))
+        
+        # Back-to-back stays per room with short gaps, so the horizon grows
+        # with bookings per room like a real calendar does
+        self.start = datetime(2024, 1, 1)
+        room_free = [self.start] * num_rooms
+        num_guests = max(10, num_bookings // 5)
+        bookings = {}
+        for i in range(num_bookings):
+            index = rng.randrange(num_rooms)
+            check_in = room_free[index] + timedelta(days=rng.randint(0, 3))
+            check_out = check_in + timedelta(days=rng.randint(1, 6))
+            room_free[index] = check_out
+            booking_id = f"B{i + 1:07d}"
+            bookings[booking_id] = {
+                'booking_id': booking_id,
+                'guest_id': f"G{rng.randrange(num_guests):06d}",
+                'room_id': self.rooms[index].room_id,
+                'check_in': check_in.isoformat(),
+                'check_out': check_out.isoformat(),
+                'total_price': self.rooms[index].base_price * (check_out - check_in).days,
+                'status': 'Cancelled' if rng.random() < 0.08 else 'Confirmed',
+                'created_at': self.start.isoformat(),
+                'special_requests': []
+            }
+        self.end = max(room_free)
+        
+        self.data = {'booking_counter': num_bookings + 1, 'bookings': bookings}
+        self.booking_service = BookingService(engine=engine)
+        self.booking_service.load_data(self.data)
+        self.repository = RoomRepository(self.rooms)
+        self.pricing_service = PricingService()
+        self.analytics_service = AnalyticsService(self.booking_service, self.repository)
+        self.allocation_service = AllocationService(self.booking_service, self.repository)
+        self.allocation_service.build_room_graph()
+    
+    def random_stay(self, rng, max_nights=7):
+        check_in = self.start + timedelta(days=rng.randrange(max(1, (self.end - self.start).days)))
+        return check_in, check_in + timedelta(days=rng.randint(1, max_nights))
+
+
+class BenchmarkSuite:
+    """Seeded, repeatable timings of the booking hot paths
+    
+    Every case is timed with perf_counter_ns: warmup untimed calls, then
+    up to repeat timed calls (fewer if time_budget seconds run out, but
+    never fewer than min_repeat). With engine set, the booking store uses
+    that availability engine and case ids are tagged with it.
+    """
+    
+    def __init__(self, seed=0, warmup=3, repeat=30, min_repeat=5, time_budget=2.0, engine=None):
+        self.seed = seed
+        self.warmup = warmup
+        self.repeat = repeat
+        self.min_repeat = min_repeat
+        self.time_budget = time_budget
+        self.engine = engine
+        self.scratch_files = []
+    
+    def run(self, sizes=None, cases=None, progress=None, profile=None):
+        """Run cases for each (bookings, rooms) size and return a report"""
+        if sizes is None:
+            sizes = PROFILES[profile or 'quick']
+        results = {}
+        for num_bookings, num_rooms in sizes:
+            results.update(self.run_size(num_bookings, num_rooms, cases, progress))
+        return self.make_report(results, profile)
+    
+    def run_size(self, num_bookings, num_rooms, cases=None, progress=None):
+        """Build one fixture and run the cases against it, in CASES order"""
+        names = [name for name in CASES if cases is None or name in cases]
+        fixture = Fixture(num_bookings, num_rooms, self.seed, self.engine)
+        results = {}
+        try:
+            for name in names:
+                result = self.run_case(fixture, name)
+                results[result['id']] = result
+                if progress:
+                    progress(result)
+        finally:
+            while self.scratch_files:
+                os.remove(self.scratch_files.pop())
+        return results
+    
+    def run_case(self, fixture, name):
+        """Time one case against a fixture"""
+        if name not in CASES:
+            raise ValueError(f"Unknown benchmark case: {name}")
+        rng = random.Random(f"{self.seed}:{name}")
+        operation = getattr(self, f'case_{name}')(fixture, rng)
+        
+        for _ in range(self.warmup):
+            operation()
+        
+        samples = []
+        deadline = time.perf_counter_ns() + int(self.time_budget * 1e9)
+        while len(samples) < self.repeat:
+            started = time.perf_counter_ns()
+            operation()
+            finished = time.perf_counter_ns()
+            samples.append(finished - started)
+            if finished > deadline and len(samples) >= self.min_repeat:
+                break
+        
+        result = summarize(samples)
+        result.update({
+            'id': case_id(name, fixture.num_bookings, fixture.num_rooms, self.engine),
+            'case': name,
+            'engine': fixture.booking_service.engine_name,
+            'bookings': fixture.num_bookings,
+            'rooms': fixture.num_rooms
+        })
+        return result
+    
+    def run_memory(self, num_bookings, num_rooms):
+        """Retained and peak bytes of loading a saved store of this size and
+        of replaying a synthetic workload, keyed like timing results"""
+        fixture = Fixture(num_bookings, num_rooms, self.seed, self.engine)
+        filename = self._scratch_file()
+        try:
+            fixture.booking_service.save_to_file(filename)
+            del fixture
+            profiler = MemoryProfiler(top=5)
+            profile_booking_load(filename, engine=self.engine, profiler=profiler)
+            profile_workload(min(num_bookings, MEMORY_WORKLOAD_EVENTS), seed=self.seed, engine=self.engine,
+                             profiler=profiler, floors=max(1, num_rooms // 100),
+                             rooms_per_floor=min(num_rooms, 100), days=3650)
+            profiler.stop()
+        finally:
+            while self.scratch_files:
+                os.remove(self.scratch_files.pop())
+        
+        results = {}
+        for name, phase in zip(MEMORY_CASES, (profiler.phases['load_from_file'], profiler.phases['workload'])):
+            result = dict(phase)
+            result.update({
+                'id': case_id(name, num_bookings, num_rooms, self.engine),
+                'case': name,
+                'bookings': num_bookings,
+                'rooms': num_rooms
+            })
+            results[result['id']] = result
+        return results
+    
+    def make_report(self, results, profile=None):
+        return {
+            'schema': REPORT_SCHEMA,
+            'meta': {
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'profile': profile,
+                'seed': self.seed,
+                'warmup': self.warmup,
+                'repeat': self.repeat,
+                'engine': self.engine,
+                'python': sys.version.split()[0],
+                'platform': platform.platform()
+            },
+            'results': results
+        }
+    
+    # Each case returns a zero-argument callable; one call is one sample
+    
+    def case_find_available_rooms(self, fixture, rng):
+        def operation():
+            fixture.booking_service.find_available_rooms(*fixture.random_stay(rng, 3), fixture.rooms)
+        return operation
+    
+    def case_group_allocation(self, fixture, rng):
+        group_size = max(2, min(10, fixture.num_rooms // 5))
+        
+        def operation():
+            fixture.allocation_service.allocate_group_booking(group_size, *fixture.random_stay(rng, 3))
+        return operation
+    
+    def case_pricing(self, fixture, rng):
+        def operation():
+            room = fixture.rooms[rng.randrange(fixture.num_rooms)]
+            fixture.pricing_service.calculate_price(room, *fixture.random_stay(rng, 14))
+        return operation
+    
+    def case_occupancy_rate(self, fixture, rng):
+        def operation():
+            start, _ = fixture.random_stay(rng)
+            fixture.analytics_service.get_occupancy_rate(start, start + timedelta(days=30))
+        return operation
+    
+    def case_revenue(self, fixture, rng):
+        def operation():
+            start, _ = fixture.random_stay(rng)
+            fixture.analytics_service.get_revenue(start, start + timedelta(days=30))
+        return operation
+    
+    def case_room_type_distribution(self, fixture, rng):
+        return fixture.analytics_service.get_room_type_distribution
+    
+    def case_booking_stats(self, fixture, rng):
+        return fixture.analytics_service.get_booking_stats
+    
+    def case_create_booking(self, fixture, rng):
+        # Past the end of the fixture's calendar, a room at a time, so no
+        # call can collide with an existing stay
+        calls = iter(range(sys.maxsize))
+        
+        def operation():
+            call = next(calls)
+            room = fixture.rooms[call % fixture.num_rooms]
+            check_in = fixture.end + timedelta(days=3 * (call // fixture.num_rooms) + 1)
+            fixture.booking_service.create_booking(
+                "G000000", room.room_id, check_in, check_in + timedelta(days=2), room.base_price * 2)
+        return operation
+    
+    def case_cancel_booking(self, fixture, rng):
+        active = [b for b in fixture.data['bookings'].values() if b['status'] == 'Confirmed']
+        rng.shuffle(active)
+        booking_ids = iter([b['booking_id'] for b in active])
+        
+        def operation():
+            fixture.booking_service.cancel_booking(next(booking_ids))
+        return operation
+    
+    def case_save(self, fixture, rng):
+        filename = self._scratch_file()
+        return lambda: fixture.booking_service.save_to_file(filename)
+    
+    def case_load(self, fixture, rng):
+        filename = self._scratch_file()
+        fixture.booking_service.save_to_file(filename)
+        engine = fixture.booking_service.engine_name
+        return lambda: BookingService(engine=engine).load_from_file(filename)
+    
+    def _scratch_file(self):
+        fd, filename = tempfile.mkstemp(suffix='.json', prefix='benchmark_')
+        os.close(fd)
+        self.scratch_files.append(filename)
+        return filename
+
+
+def save_report(report, filename):
+    """Write a report with stable key order so runs diff cleanly"""
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filename, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_report(filename):
+    with open(filename, 'r') as f:
+        report = json.load(f)
+    if report.get('schema') != REPORT_SCHEMA:
+        raise ValueError(f"Unsupported benchmark report schema: {report.get('schema')}")
+    return report
+
+
+def compare_reports(baseline, current, threshold=0.10, metric='median_ns'):
+    """Per-case change of metric between two reports
+    
+    Returns (regressions, rows): rows covers every case present in both
+    reports, plus peak and retained bytes of memory cases when both have
+    them; regressions are the rows worse than baseline by more than
+    threshold (0.10 = 10%).
+    """
+    rows = []
+    for cid, result in sorted(current['results'].items()):
+        before = baseline['results'].get(cid)
+        if before is None or not before[metric]:
+            continue
+        change = result[metric] / before[metric] - 1
+        rows.append({'id': cid, 'baseline': before[metric], 'current': result[metric],
+                     'change': change, 'unit': 'ns'})
+    for cid, result in sorted(current.get('memory', {}).items()):
+        before = baseline.get('memory', {}).get(cid)
+        if before is None:
+            continue
+        for field in ('peak_bytes', 'retained_bytes'):
+            if before[field] > 0:
+                rows.append({'id': f"{cid}.{field[:-6]}", 'baseline': before[field], 'current': result[field],
+                             'change': result[field] / before[field] - 1, 'unit': 'bytes'})
+    regressions = [row for row in rows if row['change'] > threshold]
+    return regressions, rows
@@ -1,25 +1,106 @@
+from bisect import bisect_left, insort
 from datetime import datetime
 from models.booking import Booking, BookingStatus
-from data_structures.interval_tree import IntervalTree
+from models.room import RoomStatus
+from data_structures.interval_tree import Interval, combine_metrics
+from data_structures.availability_engine import create_engine
+from data_structures.id_registry import IdRegistry
+from services.instrumentation import instrumented
 import json
 import os
 
+STATUS_BY_VALUE = {status.value: status for status in BookingStatus}
+
+class BookingTable:
+    """Read-only mapping view of booking_id -> Booking over BookingService's records"""
+    
+    def __init__(self, service):
+        self.service = service
+    
+    def __getitem__(self, booking_id):
+        key = self.service.booking_ids.lookup(booking_id)
+        if key is None:
+            raise KeyError(booking_id)
+        return self.service._booking(key)
+    
+    def get(self, booking_id, default=None):
+        key = self.service.booking_ids.lookup(booking_id)
+        return default if key is None else self.service._booking(key)
+    
+    def values(self):
+        return self.service.get_all_bookings()
+    
+    def items(self):
+        return ((booking.booking_id, booking) for booking in self.values())
+    
+    def __iter__(self):
+        return iter(self.service.booking_ids.ids)
+    
+    def __contains__(self, booking_id):
+        return booking_id in self.service.booking_ids
+    
+    def __len__(self):
+        return len(self.service.records)
+
+
 class BookingService:
-    def __init__(self):
-        self.bookings = {}
-        self.room_trees = {}
+    """Bookings and per-room availability
+    
+    Internally bookings, rooms and guests are addressed by dense integer
+    keys from IdRegistry: records[booking_key] is the Booking, and the
+    availability engine holds each room's active intervals under its room
+    key, with booking keys rather than strings. String ids are only used
+    at the public methods.
+    
+    engine picks the availability backend by name (see
+    data_structures.availability_engine.ENGINES); by default it comes from
+    $AVAILABILITY_ENGINE, falling back to the AVL interval tree.
+    
+    With lazy=True, load_from_file only decodes what the indexes need and
+    stores a ROW tuple per booking; the Booking is built on first access
+    through get_booking/get_all_bookings and replaces the row.
+    
+    Listeners are called with the Booking: add_listeners after a booking
+    is added one at a time (not by load_data), update_listeners after one
+    is cancelled or moved, cancel_listeners after update_listeners on
+    cancellation. A cancel listener may return what it did about the
+    cancellation (the waitlist returns its promotion); cancel_booking
+    hands those back through its effects list.
+    """
+    
+    # Layout of a not-yet-materialized record; booking_rows() yields the first 7
+    ROW = ('booking_id', 'guest_id', 'room_id', 'check_in', 'check_out', 'total_price',
+           'status', 'created_at', 'special_requests')
+    
+    def __init__(self, lazy=False, engine=None):
+        self.lazy = lazy
+        self.engine_name = create_engine(engine).name
+        self.add_listeners = []
+        self.update_listeners = []
+        self.cancel_listeners = []
+        self._reset()
+    
+    def _reset(self):
+        self.booking_ids = IdRegistry()
+        self.room_ids = IdRegistry()
+        self.guest_ids = IdRegistry()
+        self.records = []
+        self.engine = create_engine(self.engine_name)
+        self.bookings = BookingTable(self)
         self.booking_counter = 1
+        self.guest_bookings = {}
+        self.guest_value = {}
     
+    @instrumented()
     def create_booking(self, guest_id, room_id, check_in, check_out, total_price):
         """Create a new booking"""
         if check_in >= check_out:
             raise ValueError("Check-in date must be before check-out date")
         
         # Check if room is available
-        if room_id in self.room_trees:
-            overlaps = self.room_trees[room_id].search(check_in, check_out)
-            if overlaps:
-                raise ValueError("Room is not available for the selected dates")
+        room_key = self.room_ids.key(room_id)
+        if self.engine.any_overlap(room_key, check_in, check_out):
+            raise ValueError("Room is not available for the selected dates")
         
         # Create booking
         booking_id = f"B{self.booking_counter:06d}"
@@ -27,79 +108,405 @@ class BookingService:
         
         booking = Booking(
             booking_id=booking_id,
-            guest_id=guest_id,
-            room_id=room_id,
+            guest_id=self.guest_ids.intern(guest_id),
+            room_id=self.room_ids.external(room_key),
             check_in=check_in,
             check_out=check_out,
             total_price=total_price
         )
+        self.add_booking(booking)
         
-        self.bookings[booking_id] = booking
+        return booking
+    
+    def add_booking(self, booking, keep_sorted=True, pending=None):
+        """Register an existing Booking (e.g. one read back from disk)"""
+        booking.booking_id, booking.guest_id, booking.room_id = self._index(
+            booking.booking_id, booking.guest_id, booking.room_id, booking.check_in,
+            booking.check_out, booking.total_price, booking.status, keep_sorted, pending)
+        self.records.append(booking)
         
-        # Add to interval tree
-        if room_id not in self.room_trees:
-            self.room_trees[room_id] = IntervalTree()
+        if pending is None:
+            for listener in self.add_listeners:
+                listener(booking)
+        return booking
+    
+    def _add_row(self, data, pending):
+        """Index a saved booking dict, keeping it as a row until it's needed"""
+        check_in = datetime.fromisoformat(data['check_in'])
+        check_out = datetime.fromisoformat(data['check_out'])
+        status = STATUS_BY_VALUE[data['status']]
+        ids = self._index(data['booking_id'], data['guest_id'], data['room_id'],
+                          check_in, check_out, data['total_price'], status, False, pending)
+        self.records.append(ids + (check_in, check_out, data['total_price'], status,
+                                   data['created_at'], data.get('special_requests', [])))
+    
+    def _index(self, booking_id, guest_id, room_id, check_in, check_out, total_price, status,
+               keep_sorted=True, pending=None):
+        """Register ids and index one booking; the caller appends its record
         
-        self.room_trees[room_id].insert(check_in, check_out, booking_id)
+        Returns the canonical (booking_id, guest_id, room_id) strings. With
+        pending, intervals are collected per room key for a bulk build.
+        """
+        if booking_id in self.booking_ids:
+            raise ValueError(f"Booking {booking_id} already exists")
         
-        return booking
+        key = self.booking_ids.key(booking_id)
+        room_key = self.room_ids.key(room_id)
+        guest_key = self.guest_ids.key(guest_id)
+        
+        # Only active bookings hold their dates in the availability engine
+        active = status != BookingStatus.CANCELLED
+        if active:
+            interval = Interval(check_in, check_out, key, room_key)
+            if pending is None:
+                self.engine.insert(room_key, interval)
+            else:
+                pending.setdefault(room_key, []).append(interval)
+        self._index_guest(guest_key, key, check_in, total_price if active else 0.0, keep_sorted)
+        
+        return self.booking_ids.ids[key], self.guest_ids.ids[guest_key], self.room_ids.ids[room_key]
+    
+    def _booking(self, key):
+        """The Booking for a key, materializing a lazy row on first access"""
+        record = self.records[key]
+        if type(record) is tuple:
+            (booking_id, guest_id, room_id, check_in, check_out, total_price,
+             status, created_at, special_requests) = record
+            record = Booking(booking_id, guest_id, room_id, check_in, check_out, total_price)
+            record.status = status
+            record.created_at = datetime.fromisoformat(created_at)
+            record.special_requests = special_requests
+            self.records[key] = record
+        return record
     
-    def cancel_booking(self, booking_id):
-        """Cancel a booking"""
-        if booking_id not in self.bookings:
+    def _status(self, key):
+        record = self.records[key]
+        return record[6] if type(record) is tuple else record.status
+    
+    @instrumented()
+    def cancel_booking(self, booking_id, effects=None):
+        """Cancel a booking
+        
+        Non-None results of cancel_listeners are appended to effects, if
+        given.
+        """
+        key = self.booking_ids.lookup(booking_id)
+        if key is None:
             raise ValueError("Booking not found")
         
-        booking = self.bookings[booking_id]
+        booking = self._booking(key)
         
         if booking.status == BookingStatus.CANCELLED:
             raise ValueError("Booking is already cancelled")
         
         booking.cancel()
         
-        # Remove from interval tree (just mark as cancelled, don't actually remove)
-        # In a real system, you might want to physically remove it from the tree
+        # Remove from the engine so the dates can be booked again
+        room_key = self.room_ids.lookup(booking.room_id)
+        self.engine.remove(room_key, Interval(booking.check_in, booking.check_out, key, room_key))
+        self.guest_value[self.guest_ids.lookup(booking.guest_id)] -= booking.total_price
+        
+        for listener in self.update_listeners:
+            listener(booking)
+        for listener in self.cancel_listeners:
+            result = listener(booking)
+            if result is not None and effects is not None:
+                effects.append(result)
         
         return booking
     
+    @instrumented()
+    def move_bookings(self, moves):
+        """Move bookings between rooms: {booking_id: (old_room_id, new_room_id)}
+        
+        The new interval sets are built and checked first and swapped in
+        together, so an error part way through leaves every room untouched.
+        """
+        key_moves = {}
+        for booking_id, (old_room, new_room) in moves.items():
+            key = self.booking_ids.lookup(booking_id)
+            if key is None:
+                raise ValueError(f"Booking {booking_id} not found")
+            key_moves[key] = (self.room_ids.key(old_room), self.room_ids.key(new_room))
+        
+        affected = set()
+        for old_room, new_room in key_moves.values():
+            affected.add(old_room)
+            affected.add(new_room)
+        
+        room_intervals = {room_key: [] for room_key in affected}
+        for room_key in affected:
+            for interval in self.engine.intervals(room_key):
+                if interval.booking_id not in key_moves:
+                    room_intervals[room_key].append(interval)
+        
+        for key, (_, new_room) in key_moves.items():
+            booking = self._booking(key)
+            room_intervals[new_room].append(
+                Interval(booking.check_in, booking.check_out, key, new_room))
+        
+        for room_key, intervals in room_intervals.items():
+            intervals.sort(key=lambda iv: iv.start)
+            for prev, cur in zip(intervals, intervals[1:]):
+                if prev.overlaps(cur):
+                    raise ValueError(f"Moves would double-book room {self.room_ids.external(room_key)}")
+        
+        for room_key, intervals in room_intervals.items():
+            self.engine.replace(room_key, intervals)
+        for key, (_, new_room) in key_moves.items():
+            booking = self._booking(key)
+            booking.room_id = self.room_ids.external(new_room)
+            for listener in self.update_listeners:
+                listener(booking)
+    
     def get_booking(self, booking_id):
         """Get a booking by ID"""
         return self.bookings.get(booking_id)
     
     def get_all_bookings(self):
         """Get all bookings"""
-        return list(self.bookings.values())
+        return [self._booking(key) for key in range(len(self.records))]
+    
+    def booking_rows(self):
+        """(booking_id, guest_id, room_id, check_in, check_out, total_price, status)
+        for every booking, without materializing lazy rows"""
+        for record in self.records:
+            if type(record) is tuple:
+                yield record[:7]
+            else:
+                yield (record.booking_id, record.guest_id, record.room_id, record.check_in,
+                       record.check_out, record.total_price, record.status)
+    
+    def booking_row(self, key):
+        """booking_rows() entry for one booking key (0 .. len(bookings) - 1,
+        in the order bookings were added)"""
+        record = self.records[key]
+        if type(record) is tuple:
+            return record[:7]
+        return (record.booking_id, record.guest_id, record.room_id, record.check_in,
+                record.check_out, record.total_price, record.status)
+    
+    def get_room_tree(self, room_id):
+        """The room's interval tree, or None if it has never been booked
+        (or the engine isn't tree-based)"""
+        room_key = self.room_ids.lookup(room_id)
+        if room_key is None or not hasattr(self.engine, 'tree'):
+            return None
+        return self.engine.tree(room_key)
+    
+    def get_room_trees(self):
+        """{room_id: IntervalTree} for every room that has a tree; empty
+        unless the engine is tree-based"""
+        if not hasattr(self.engine, 'tree'):
+            return {}
+        return {self.room_ids.external(room_key): self.engine.tree(room_key)
+                for room_key in self.engine.room_keys()}
+    
+    def get_tree_metrics(self):
+        """Structure and work counters combined over every room's tree,
+        or None unless the engine is tree-based"""
+        if not hasattr(self.engine, 'tree'):
+            return None
+        return combine_metrics(self.get_room_trees().values())
+    
+    def room_intervals(self, room_id, start=None, end=None):
+        """Active intervals of a room, ordered by start, with string ids
+        
+        With start/end only the intervals overlapping that range are returned.
+        """
+        room_key = self.room_ids.lookup(room_id)
+        if room_key is None:
+            return []
+        if start is None:
+            intervals = self.engine.intervals(room_key)
+        else:
+            intervals = self.engine.overlaps(room_key, start, end or datetime.max)
+            intervals.sort(key=lambda iv: iv.start)
+        external = self.booking_ids.ids
+        room_id = self.room_ids.intern(room_id)
+        return [Interval(iv.start, iv.end, external[iv.booking_id], room_id) for iv in intervals]
+    
+    def active_booking_counts(self):
+        """{room_id: number of active bookings} for every room the engine holds"""
+        external = self.room_ids.ids
+        return {external[room_key]: self.engine.count(room_key) for room_key in self.engine.room_keys()}
+    
+    def get_guest_bookings(self, guest_id):
+        """A guest's bookings, cancelled ones included, ordered by check-in"""
+        return [self._booking(key) for _, key in self._guest_entries(guest_id)]
+    
+    def get_booking_history(self, guest_id):
+        """A guest's booking IDs ordered by check-in"""
+        external = self.booking_ids.ids
+        return [external[key] for _, key in self._guest_entries(guest_id)]
+    
+    def get_next_stay(self, guest_id, now=None):
+        """The guest's first confirmed booking checking in at or after now"""
+        entries = self._guest_entries(guest_id)
+        if not entries:
+            return None
+        if now is None:
+            now = datetime.now()
+        
+        for _, key in entries[bisect_left(entries, (now,)):]:
+            if self._status(key) == BookingStatus.CONFIRMED:
+                return self._booking(key)
+        return None
+    
+    def get_lifetime_value(self, guest_id):
+        """Total price of the guest's bookings, excluding cancelled ones"""
+        return self.guest_value.get(self.guest_ids.lookup(guest_id), 0.0)
+    
+    def sync_booking_history(self, guests):
+        """Copy the index into each guest's booking_history before saving"""
+        for guest in guests:
+            guest.booking_history = self.get_booking_history(guest.guest_id)
+    
+    def _guest_entries(self, guest_id):
+        return self.guest_bookings.get(self.guest_ids.lookup(guest_id), ())
+    
+    def _index_guest(self, guest_key, key, check_in, value, keep_sorted=True):
+        entries = self.guest_bookings.setdefault(guest_key, [])
+        if keep_sorted:
+            insort(entries, (check_in, key))
+        else:
+            entries.append((check_in, key))
+        self.guest_value[guest_key] = self.guest_value.get(guest_key, 0.0) + value
     
+    @instrumented()
+    def is_room_available(self, room_id, check_in, check_out):
+        """True if no active booking of the room overlaps the dates"""
+        room_key = self.room_ids.lookup(room_id)
+        return room_key is None or not self.engine.any_overlap(room_key, check_in, check_out)
+    
+    @instrumented()
     def find_available_rooms(self, check_in, check_out, rooms):
         """Find available rooms for given dates"""
-        available_rooms = []
-        
-        for room in rooms:
-            if room.room_id not in self.room_trees:
-                available_rooms.append(room)
-            else:
-                overlaps = self.room_trees[room.room_id].search(check_in, check_out)
-                # Filter out cancelled bookings
-                active_overlaps = [
-                    o for o in overlaps 
-                    if self.bookings[o].status != BookingStatus.CANCELLED
-                ]
-                if not active_overlaps:
-                    available_rooms.append(room)
+        room_keys = self.room_ids.keys
+        candidates = [(room, room_keys.get(room.room_id)) for room in rooms
+                      if room.status != RoomStatus.MAINTENANCE]
         
-        return available_rooms
+        # Cancelled bookings are never in the engine, so any overlap means taken
+        free = self.engine.free_rooms([key for _, key in candidates if key is not None],
+                                      check_in, check_out)
+        return [room for room, key in candidates if key is None or key in free]
     
+    @instrumented('persistence.save_bookings')
     def save_to_file(self, filename='data/bookings.json'):
         """Save bookings to JSON file"""
-        os.makedirs('data', exist_ok=True)
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
         
         data = {
             'booking_counter': self.booking_counter,
-            'bookings': {bid: b.to_dict() for bid, b in self.bookings.items()}
+            'bookings': {record[0] if type(record) is tuple else record.booking_id: self._record_dict(record)
+                         for record in self.records}
         }
         
         with open(filename, 'w') as f:
             json.dump(data, f, indent=2)
     
+    def _record_dict(self, record):
+        """to_dict() output for a Booking or a lazy row"""
+        if type(record) is not tuple:
+            return record.to_dict()
+        row = dict(zip(self.ROW, record))
+        row['check_in'] = row['check_in'].isoformat()
+        row['check_out'] = row['check_out'].isoformat()
+        row['status'] = row['status'].value
+        return row
+    
+    def check_changes(self, changes):
+        """Problems a batch of changes would hit, without making any
+        
+        changes are ('booking', booking_id, room_id, check_in, check_out,
+        active) and ('cancellation', booking_id) tuples, in the order they
+        would be applied; bookings in the batch are checked against the
+        store and each other. Returns one message per rejected change, so
+        an empty list means the whole batch can go in.
+        """
+        problems = []
+        batch = create_engine(self.engine_name)
+        batch_ids = []
+        # booking_id -> (batch key, room_id, interval or None if cancelled)
+        added = {}
+        batch_rooms = {}
+        freed = set()
+        
+        for change in changes:
+            booking_id = change[1]
+            if change[0] == 'cancellation':
+                if booking_id in added:
+                    key, room_id, interval = added[booking_id]
+                    if interval is None:
+                        problems.append(f"Booking {booking_id} is already cancelled")
+                        continue
+                    batch.remove(batch_rooms[room_id], interval)
+                    added[booking_id] = (key, room_id, None)
+                    continue
+                key = self.booking_ids.lookup(booking_id)
+                if key is None:
+                    problems.append(f"Booking {booking_id} not found")
+                elif key in freed or self._status(key) == BookingStatus.CANCELLED:
+                    problems.append(f"Booking {booking_id} is already cancelled")
+                else:
+                    freed.add(key)
+                continue
+            
+            _, booking_id, room_id, check_in, check_out, active = change
+            if booking_id in self.booking_ids or booking_id in added:
+                problems.append(f"Booking {booking_id} already exists")
+                continue
+            if check_in >= check_out:
+                problems.append(f"Booking {booking_id}: check-in date must be before check-out date")
+                continue
+            
+            key = len(batch_ids)
+            batch_ids.append(booking_id)
+            room_key = batch_rooms.setdefault(room_id, len(batch_rooms))
+            if not active:
+                added[booking_id] = (key, room_id, None)
+                continue
+            
+            clash = [batch_ids[iv.booking_id] for iv in batch.overlaps(room_key, check_in, check_out)]
+            store_room = self.room_ids.lookup(room_id)
+            if store_room is not None:
+                clash += [self.booking_ids.ids[iv.booking_id]
+                          for iv in self.engine.overlaps(store_room, check_in, check_out)
+                          if iv.booking_id not in freed]
+            if clash:
+                problems.append(f"Booking {booking_id} overlaps {', '.join(sorted(clash))} in room {room_id}")
+                added[booking_id] = (key, room_id, None)
+                continue
+            
+            interval = Interval(check_in, check_out, key, room_key)
+            batch.insert(room_key, interval)
+            added[booking_id] = (key, room_id, interval)
+        
+        return problems
+    
+    def load_data(self, data):
+        """Bulk-load bookings in the saved-file format ({'booking_counter', 'bookings'})"""
+        self.booking_counter = data.get('booking_counter', 1)
+        
+        # Collect active intervals per room so the engine can build each
+        # room in one go (a balanced tree, for the interval tree engine)
+        pending = {}
+        for b_data in data.get('bookings', {}).values():
+            if self.lazy:
+                self._add_row(b_data, pending)
+            else:
+                self.add_booking(Booking.from_dict(b_data), False, pending)
+        
+        for room_key, intervals in pending.items():
+            self.engine.bulk_load(room_key, intervals)
+        
+        # Bulk load appends unsorted; sort each guest's list once
+        for entries in self.guest_bookings.values():
+            entries.sort()
+    
+    @instrumented('persistence.load_bookings')
     def load_from_file(self, filename='data/bookings.json'):
         """Load bookings from JSON file"""
         try:
@@ -115,34 +522,14 @@ class BookingService:
             with open(filename, 'r') as f:
                 data = json.load(f)
             
-            self.booking_counter = data.get('booking_counter', 1)
-            
-            # Load bookings
-            for bid, b_data in data.get('bookings', {}).items():
-                booking = Booking.from_dict(b_data)
-                self.bookings[bid] = booking
-                
-                # Rebuild interval trees for active bookings
-                if booking.status != BookingStatus.CANCELLED:
-                    if booking.room_id not in self.room_trees:
-                        self.room_trees[booking.room_id] = IntervalTree()
-                    
-                    self.room_trees[booking.room_id].insert(
-                        booking.check_in, 
-                        booking.check_out, 
-                        booking.booking_id
-                    )
+            self.load_data(data)
         
         except json.JSONDecodeError:
             # JSON is corrupted, start fresh
             print(f"Warning: {filename} is corrupted. Starting with empty bookings.")
-            self.bookings = {}
-            self.room_trees = {}
-            self.booking_counter = 1
+            self._reset()
         
         except Exception as e:
             # Any other error, print and start fresh
             print(f"Warning: Error loading {filename}: {e}. Starting with empty bookings.")
-            self.bookings = {}
-            self.room_trees = {}
-            self.booking_counter = 1
+            self._reset()
@@ -0,0 +1,404 @@
+import json
+import os
+from contextlib import nullcontext
+from models.room import Room, RoomType
+from models.guest import Guest
+from models.booking import Booking, BookingStatus
+from services.booking_service import BookingService
+from services.allocation_service import AllocationService
+from services.pricing_service import PricingService
+from services.analytics_service import AnalyticsService
+from services.waitlist_service import WaitlistService
+from services.loyalty_service import LoyaltyService
+from services.instrumentation import timed
+from repositories.room_repository import RoomRepository
+from repositories.guest_repository import GuestRepository
+
+class HotelCore:
+    """Rooms, guests and bookings plus the services over them, without any UI
+    
+    Owns loading and saving the data directory (rooms.json, guests.json,
+    bookings.json) and the booking workflows that touch more than one
+    service: pricing with loyalty discounts, loyalty points, waitlist
+    promotion on cancellation. MainWindow and cli.py are both thin layers
+    over it; nothing here imports Qt.
+    
+    Every change is saved straight away, as the UI always did. Pass a
+    MemoryProfiler to have loading recorded as phases.
+    """
+    
+    def __init__(self, data_dir='data', lazy=True, engine=None, memory_profiler=None):
+        self.data_dir = data_dir
+        self.memory_profiler = memory_profiler
+        self.booking_service = BookingService(lazy=lazy, engine=engine)
+        self.pricing_service = PricingService()
+        self.rooms = RoomRepository()
+        self.guests = GuestRepository()
+        self.guest_counter = 1
+        
+        self.load()
+        
+        self.allocation_service = AllocationService(self.booking_service, self.rooms)
+        self.allocation_service.build_room_graph()
+        self.analytics_service = AnalyticsService(self.booking_service, self.rooms)
+        self.waitlist_service = WaitlistService(self.booking_service, self.pricing_service, self.rooms)
+        self.loyalty_service = LoyaltyService(self.booking_service)
+    
+    def path(self, name):
+        return os.path.join(self.data_dir, name)
+    
+    def memory_phase(self, name):
+        """A MemoryProfiler phase when profiling, else a no-op"""
+        if self.memory_profiler is None:
+            return nullcontext()
+        return self.memory_profiler.phase(name)
+    
+    def load(self):
+        """Read the data directory, creating sample rooms/guests if missing"""
+        try:
+            with timed('persistence.load_rooms'):
+                rooms_data = self._read_json('rooms.json')
+                if rooms_data:
+                    self.rooms = RoomRepository(Room.from_dict(r) for r in rooms_data)
+                else:
+                    self.create_sample_rooms()
+        except:
+            self.create_sample_rooms()
+        
+        try:
+            with timed('persistence.load_guests'):
+                guests_data = self._read_json('guests.json')
+                if guests_data:
+                    guests = [Guest.from_dict(g_data) for g_data in guests_data.values()]
+                    self.guests.add_many(guests)
+                    for guest in guests:
+                        guest_num = int(guest.guest_id.replace('G', ''))
+                        self.guest_counter = max(self.guest_counter, guest_num + 1)
+                else:
+                    self.create_sample_guests()
+        except:
+            self.create_sample_guests()
+        
+        with self.memory_phase('startup.load_bookings'):
+            self.booking_service.load_from_file(self.path('bookings.json'))
+    
+    def _read_json(self, name):
+        """Parsed contents of a data file, or None if it's missing or empty"""
+        filename = self.path(name)
+        if not os.path.exists(filename):
+            return None
+        with open(filename, 'r') as f:
+            content = f.read().strip()
+        return json.loads(content) if content else None
+    
+    def save(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        
+        try:
+            with timed('persistence.save_rooms'), open(self.path('rooms.json'), 'w') as f:
+                json.dump([r.to_dict() for r in self.rooms], f, indent=2)
+        except Exception as e:
+            print(f"Error saving rooms: {e}")
+        
+        self.booking_service.sync_booking_history(self.guests.values())
+        
+        try:
+            with timed('persistence.save_guests'), open(self.path('guests.json'), 'w') as f:
+                json.dump({gid: g.to_dict() for gid, g in self.guests.items()}, f, indent=2)
+        except Exception as e:
+            print(f"Error saving guests: {e}")
+        
+        self.booking_service.save_to_file(self.path('bookings.json'))
+    
+    def create_sample_rooms(self):
+        self.rooms = RoomRepository()
+        room_counter = 101
+        
+        for floor in range(1, 4):
+            for _ in range(3):
+                self.rooms.add(Room(
+                    room_id=f"R{room_counter}",
+                    room_number=room_counter,
+                    room_type=RoomType.STANDARD,
+                    floor=floor,
+                    base_price=100.0,
+                    features=["WiFi", "TV"]
+                ))
+                room_counter += 1
+        
+        for floor in range(1, 4):
+            for _ in range(2):
+                self.rooms.add(Room(
+                    room_id=f"R{room_counter}",
+                    room_number=room_counter,
+                    room_type=RoomType.DELUXE,
+                    floor=floor,
+                    base_price=150.0,
+                    features=["WiFi", "TV", "Mini Bar", "Balcony"]
+                ))
+                room_counter += 1
+        
+        for floor in [3, 4]:
+            self.rooms.add(Room(
+                room_id=f"R{room_counter}",
+                room_number=room_counter,
+                room_type=RoomType.SUITE,
+                floor=floor,
+                base_price=250.0,
+                features=["WiFi", "TV", "Mini Bar", "Balcony", "Living Room", "Jacuzzi"]
+            ))
+            room_counter += 1
+        
+        self.rooms.add(Room(
+            room_id=f"R{room_counter}",
+            room_number=room_counter,
+            room_type=RoomType.PENTHOUSE,
+            floor=5,
+            base_price=500.0,
+            features=["WiFi", "TV", "Mini Bar", "Terrace", "Living Room", "Jacuzzi", "Kitchen", "Sea View"]
+        ))
+        
+        self.save()
+    
+    def create_sample_guests(self):
+        sample_guests = [
+            ("John Doe", "john@email.com", "1234567890", "ID001"),
+            ("Jane Smith", "jane@email.com", "0987654321", "ID002"),
+            ("Bob Wilson", "bob@email.com", "5555555555", "ID003"),
+        ]
+        
+        for name, email, phone, id_proof in sample_guests:
+            guest_id = f"G{self.guest_counter:04d}"
+            self.guest_counter += 1
+            
+            guest = Guest(guest_id, name, email, phone, id_proof)
+            self.guests.add(guest)
+        
+        self.save()
+    
+    def add_guest(self, name, email, phone, id_proof):
+        """Register a new guest; check guests.find_duplicates first if that matters"""
+        guest_id = f"G{self.guest_counter:04d}"
+        self.guest_counter += 1
+        
+        guest = Guest(guest_id=guest_id, name=name, email=email, phone=phone, id_proof=id_proof)
+        self.guests.add(guest)
+        self.save()
+        return guest
+    
+    def available_rooms(self, check_in, check_out, room_type=None, min_price=None, max_price=None):
+        """Rooms matching the filters that are free for the dates"""
+        if check_in >= check_out:
+            raise ValueError("Check-in date must be before check-out date")
+        rooms = self.rooms.query(room_type=room_type, min_price=min_price, max_price=max_price)
+        return self.booking_service.find_available_rooms(check_in, check_out, rooms)
+    
+    def quote(self, room, check_in, check_out, guest_id=None):
+        """(price, price before the guest's loyalty discount)"""
+        price = self.pricing_service.calculate_price(room, check_in, check_out)
+        guest = self.guests.get(guest_id) if guest_id else None
+        if guest is None:
+            return price, price
+        return self.pricing_service.apply_loyalty_discount(price, guest.loyalty_tier.value), price
+    
+    def book(self, guest_id, room_id, check_in, check_out):
+        """Book at the discounted price and award loyalty points
+        
+        Returns (booking, points earned).
+        """
+        guest = self.guests.get(guest_id)
+        if guest is None:
+            raise ValueError(f"Guest {guest_id} not found")
+        room = self.rooms.get(room_id)
+        if room is None:
+            raise ValueError(f"Room {room_id} not found")
+        
+        price, _ = self.quote(room, check_in, check_out, guest_id)
+        booking = self.booking_service.create_booking(guest_id, room.room_id, check_in, check_out, price)
+        
+        points = int(price)
+        guest.add_loyalty_points(points)
+        self.save()
+        return booking, points
+    
+    def cancel(self, booking_id):
+        """Cancel a booking, take back its points and credit any waitlist
+        promotions it triggered
+        
+        Returns (cancelled booking, [(waitlist request, new booking)]).
+        """
+        # The waitlist's promotions come back as cancel listener results
+        promoted = []
+        cancelled = self.booking_service.cancel_booking(booking_id, promoted)
+        
+        # Take back the points the cancelled booking earned
+        guest = self.guests.get(cancelled.guest_id)
+        if guest:
+            self.loyalty_service.recompute_guest(guest)
+        
+        for request, booking in promoted:
+            guest = self.guests.get(booking.guest_id)
+            if guest:
+                guest.add_loyalty_points(int(booking.total_price))
+        
+        self.save()
+        return cancelled, promoted
+    
+    def join_waitlist(self, guest_id, room_type, check_in, check_out):
+        """(request id, requests now queued for the room type)"""
+        request_id = self.waitlist_service.add_request(self.guests[guest_id], room_type, check_in, check_out)
+        return request_id, len(self.waitlist_service.get_waitlist(room_type))
+    
+    def booking_totals(self):
+        """(confirmed bookings, revenue excluding cancellations) without materializing bookings"""
+        active = 0
+        revenue = 0
+        for _, _, _, _, _, total_price, status in self.booking_service.booking_rows():
+            if status == BookingStatus.CONFIRMED:
+                active += 1
+            if status != BookingStatus.CANCELLED:
+                revenue += total_price
+        return active, revenue
+    
+    def run_loyalty_job(self):
+        result = self.loyalty_service.recompute_all(self.guests.values())
+        if result['changed']:
+            self.save()
+        return result
+    
+    def import_bookings(self, data):
+        """Add bookings in the saved-file format to the store
+        
+        The whole file is checked first; if any booking is malformed,
+        already exists or would double-book a room, nothing is imported
+        and the ValueError lists every bad record. The guests involved get
+        their loyalty points recomputed.
+        """
+        changes = []
+        problems = []
+        guest_ids = set()
+        for record in data.get('bookings', {}).values():
+            try:
+                booking = Booking.from_dict(record)
+            except (KeyError, TypeError, ValueError) as e:
+                problems.append(f"Booking {record.get('booking_id', '?')}: bad record ({e})")
+                continue
+            changes.append(self._booking_change(booking))
+            guest_ids.add(booking.guest_id)
+        self._check_import(changes, problems)
+        
+        before = len(self.booking_service.bookings)
+        counter = self.booking_service.booking_counter
+        self.booking_service.load_data(data)
+        self.booking_service.booking_counter = max(counter, self.booking_service.booking_counter)
+        self.loyalty_service.recompute_all(self._guests_by_id(guest_ids))
+        self.save()
+        return len(self.booking_service.bookings) - before
+    
+    def import_events(self, events):
+        """Apply workload events (services.workload_generator): rooms and
+        guests are added if new, bookings and cancellations replayed
+        
+        All events are parsed and the bookings and cancellations checked
+        against the store before any is applied, as in import_bookings.
+        Cancellations only reach the waitlist once the whole batch is in,
+        so a promotion can't clash with an imported booking or its id.
+        The guests involved get their loyalty points recomputed.
+        
+        Returns {event kind: number applied}, with 'promotion' counting
+        waitlist requests promoted into the freed rooms.
+        """
+        actions = []
+        changes = []
+        problems = []
+        for event in events:
+            kind = event['event']
+            record = dict(event)
+            del record['event']
+            try:
+                if kind == 'room':
+                    actions.append((kind, Room.from_dict(record)))
+                elif kind == 'guest':
+                    actions.append((kind, Guest.from_dict(record)))
+                elif kind == 'booking':
+                    booking = Booking.from_dict(record)
+                    actions.append((kind, booking))
+                    changes.append(self._booking_change(booking))
+                elif kind == 'cancellation':
+                    actions.append((kind, record['booking_id']))
+                    changes.append((kind, record['booking_id']))
+            except (KeyError, TypeError, ValueError) as e:
+                problems.append(f"Bad {kind} event: {e}")
+        self._check_import(changes, problems)
+        
+        counts = {}
+        counter = self.booking_service.booking_counter
+        cancelled = []
+        affected = set()
+        cancel_listeners = self.booking_service.cancel_listeners
+        self.booking_service.cancel_listeners = []
+        try:
+            for kind, item in actions:
+                if kind == 'room':
+                    if item.room_id in self.rooms:
+                        continue
+                    self.rooms.add(item)
+                elif kind == 'guest':
+                    if item.guest_id in self.guests:
+                        continue
+                    self.guests.add(item)
+                    guest_num = int(item.guest_id.lstrip('G') or 0)
+                    self.guest_counter = max(self.guest_counter, guest_num + 1)
+                elif kind == 'booking':
+                    self.booking_service.add_booking(item)
+                    affected.add(item.guest_id)
+                    counter = max(counter, int(item.booking_id[1:]) + 1)
+                else:
+                    booking = self.booking_service.cancel_booking(item)
+                    cancelled.append(booking)
+                    affected.add(booking.guest_id)
+                counts[kind] = counts.get(kind, 0) + 1
+        finally:
+            self.booking_service.cancel_listeners = cancel_listeners
+        self.booking_service.booking_counter = counter
+        
+        # Rooms may have been added; rebuild the views that index them
+        self.allocation_service.build_room_graph(self.rooms)
+        
+        # Now offer the freed rooms to the waitlist; promotions go through
+        # create_booking, so they get fresh ids and availability checks
+        promoted = []
+        for booking in cancelled:
+            for listener in cancel_listeners:
+                result = listener(booking)
+                if result is not None:
+                    promoted.append(result)
+        for request, booking in promoted:
+            affected.add(booking.guest_id)
+        if promoted:
+            counts['promotion'] = len(promoted)
+        
+        self.loyalty_service.recompute_all(self._guests_by_id(affected))
+        self.save()
+        return counts
+    
+    def _guests_by_id(self, guest_ids):
+        return [self.guests[guest_id] for guest_id in guest_ids if guest_id in self.guests]
+    
+    @staticmethod
+    def _booking_change(booking):
+        return ('booking', booking.booking_id, booking.room_id, booking.check_in,
+                booking.check_out, booking.status != BookingStatus.CANCELLED)
+    
+    # Enough to fix a file by; the count says how many more there are
+    MAX_REPORTED_PROBLEMS = 20
+    
+    def _check_import(self, changes, problems):
+        """Raise ValueError listing every problem, before anything is changed"""
+        problems = problems + self.booking_service.check_changes(changes)
+        if not problems:
+            return
+        shown = problems[:self.MAX_REPORTED_PROBLEMS]
+        if len(problems) > len(shown):
+            shown.append(f"... and {len(problems) - len(shown)} more")
+        raise ValueError("Import rejected, nothing was changed:\n  " + "\n  ".join(shown))
@@ -0,0 +1,153 @@
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Bucket upper bounds: 1µs doubling up to ~16.8s, then +Inf
+BUCKET_BOUNDS_NS = [1000 << k for k in range(25)]
+
+
+class Histogram:
+    """Call count and latency histogram with fixed log2 buckets"""
+    
+    __slots__ = ('counts', 'count', 'total_ns', 'max_ns')
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+    
+    def observe(self, ns):
+        # ((ns - 1) // 1000).bit_length() is the index of the first bound >= ns
+        index = ((ns - 1) // 1000).bit_length() if ns > 0 else 0
+        self.counts[min(index, len(BUCKET_BOUNDS_NS))] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+    
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (0 < q <= 1)"""
+        if not self.count:
+            return 0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_NS, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max_ns
+    
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ns': self.total_ns,
+            'mean_ns': self.total_ns // self.count if self.count else 0,
+            'p50_ns': self.quantile(0.5),
+            'p95_ns': self.quantile(0.95),
+            'p99_ns': self.quantile(0.99),
+            'max_ns': self.max_ns,
+            'buckets': self.counts
+        }
+
+
+class Instrumentation:
+    """Registry of per-call-site histograms, switchable at runtime
+    
+    While disabled an instrumented call costs one attribute check. Not
+    thread-safe; the app and benchmarks time from a single thread.
+    """
+    
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+    
+    def enable(self):
+        self.enabled = True
+    
+    def disable(self):
+        self.enabled = False
+    
+    def reset(self):
+        self.histograms = {}
+    
+    def observe(self, name, ns):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(ns)
+    
+    def snapshot(self):
+        """{name: histogram dict}, sorted by name"""
+        return {name: self.histograms[name].to_dict() for name in sorted(self.histograms)}
+    
+    def to_json(self):
+        return json.dumps({
+            'enabled': self.enabled,
+            'bucket_bounds_ns': BUCKET_BOUNDS_NS,
+            'metrics': self.snapshot()
+        }, indent=2)
+    
+    def to_prometheus(self):
+        """Prometheus text exposition: one histogram family, labelled by method"""
+        lines = [
+            '# HELP hotel_call_duration_seconds Latency of instrumented service calls',
+            '# TYPE hotel_call_duration_seconds histogram'
+        ]
+        for name in sorted(self.histograms):
+            histogram = self.histograms[name]
+            cumulative = 0
+            for bound, count in zip(BUCKET_BOUNDS_NS, histogram.counts):
+                cumulative += count
+                lines.append(f'hotel_call_duration_seconds_bucket{{method="{name}",le="{bound / 1e9:g}"}} {cumulative}')
+            lines.append(f'hotel_call_duration_seconds_bucket{{method="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'hotel_call_duration_seconds_sum{{method="{name}"}} {histogram.total_ns / 1e9:.9f}')
+            lines.append(f'hotel_call_duration_seconds_count{{method="{name}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+    
+    def export(self, filename):
+        """Write JSON, or Prometheus text if filename ends in .prom or .txt"""
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        text = self.to_prometheus() if filename.endswith(('.prom', '.txt')) else self.to_json()
+        with open(filename, 'w') as f:
+            f.write(text)
+
+
+# Process-wide registry; HOTEL_INSTRUMENTATION=1 turns it on at startup
+metrics = Instrumentation(enabled=os.environ.get('HOTEL_INSTRUMENTATION') == '1')
+
+
+def instrumented(name=None):
+    """Decorator timing every call into metrics under name
+    (default: Class.method)"""
+    def decorate(func):
+        label = name or func.__qualname__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.observe(label, time.perf_counter_ns() - started)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def timed(name):
+    """Context manager timing a block into metrics under name"""
+    if not metrics.enabled:
+        yield
+        return
+    started = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        metrics.observe(name, time.perf_counter_ns() - started)
@@ -0,0 +1,74 @@
+import time
+from models.booking import BookingStatus
+from models.guest import Guest
+
+class LoyaltyService:
+    """Recompute loyalty points and tiers from the booking store
+    
+    Points are earned at one per unit of price on every booking that
+    isn't cancelled, the same rate create_booking awards them.
+    """
+    
+    def __init__(self, booking_service):
+        self.booking_service = booking_service
+    
+    def aggregate_points(self, bookings=None):
+        """Points per guest_id in one pass over the bookings (by default the
+        booking store's rows, which leaves lazy bookings unbuilt)"""
+        cancelled = BookingStatus.CANCELLED
+        points = {}
+        get = points.get
+        if bookings is None:
+            for _, gid, _, _, _, total_price, status in self.booking_service.booking_rows():
+                if status is not cancelled:
+                    points[gid] = get(gid, 0) + int(total_price)
+            return points
+        
+        for booking in bookings:
+            if booking.status is not cancelled:
+                gid = booking.guest_id
+                points[gid] = get(gid, 0) + int(booking.total_price)
+        return points
+    
+    def recompute_all(self, guests, bookings=None):
+        """Bring every guest's points and tier in line with their bookings
+        
+        Only guests whose points or tier differ are written to. Returns the guest
+        IDs that changed and, separately, those whose tier changed.
+        """
+        started = time.perf_counter()
+        points = self.aggregate_points(bookings)
+        
+        changed = []
+        tier_changes = []
+        for guest in guests:
+            earned = points.get(guest.guest_id, 0)
+            tier = Guest.tier_for_points(earned)
+            if earned == guest.loyalty_points and tier == guest.loyalty_tier:
+                continue
+            
+            if tier != guest.loyalty_tier:
+                tier_changes.append((guest.guest_id, guest.loyalty_tier, tier))
+                guest.loyalty_tier = tier
+            guest.loyalty_points = earned
+            changed.append(guest.guest_id)
+        
+        return {
+            'changed': changed,
+            'tier_changes': tier_changes,
+            'guests_with_bookings': len(points),
+            'elapsed': time.perf_counter() - started
+        }
+    
+    def recompute_guest(self, guest):
+        """Recompute one guest from the booking service's guest index"""
+        earned = sum(
+            int(b.total_price) for b in self.booking_service.get_guest_bookings(guest.guest_id)
+            if b.status != BookingStatus.CANCELLED
+        )
+        tier = Guest.tier_for_points(earned)
+        if earned == guest.loyalty_points and tier == guest.loyalty_tier:
+            return False
+        guest.loyalty_points = earned
+        guest.loyalty_tier = tier
+        return True
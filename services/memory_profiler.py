@@ -0,0 +1,204 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from itertools import islice
+from services.booking_service import BookingService
+from services.workload_generator import WorkloadGenerator
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level project packages reported as their own subsystem
+PROJECT_PACKAGES = ('models', 'data_structures', 'services', 'repositories', 'ui')
+
+
+def subsystem(filename):
+    """Bucket an allocation site's file into a subsystem name"""
+    path = os.path.abspath(filename)
+    if path.startswith(PROJECT_ROOT + os.sep):
+        package = os.path.relpath(path, PROJECT_ROOT).split(os.sep)[0]
+        return package if package in PROJECT_PACKAGES else 'app'
+    name = os.path.basename(os.path.dirname(path))
+    if name == 'json':
+        return 'json'
+    if 'PyQt5' in path:
+        return 'qt'
+    return 'other'
+
+
+def site_name(filename, lineno):
+    path = os.path.abspath(filename)
+    if path.startswith(PROJECT_ROOT + os.sep):
+        return f"{os.path.relpath(path, PROJECT_ROOT)}:{lineno}"
+    # Outside the project the last two path parts are enough (json/decoder.py)
+    return f"{os.path.join(*path.split(os.sep)[-2:])}:{lineno}"
+
+
+class MemoryProfiler:
+    """tracemalloc-based memory report, one entry per profiled phase
+    
+    A phase records the memory it left allocated (retained) and the
+    highest point reached while it ran (peak), both relative to where it
+    started, plus retained bytes per subsystem and the top allocation
+    sites. Phases may nest; an inner phase doesn't hide its share of
+    the outer one's peak. Tracing slows Python down several times over,
+    so only use it for profiling runs, never for timing.
+    """
+    
+    def __init__(self, frames=1, top=15):
+        self.frames = frames
+        self.top = top
+        self.phases = {}
+        # [baseline, highest peak seen in finished child phases] per open phase
+        self._open = []
+        self._started_tracing = False
+    
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+    
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    @contextmanager
+    def phase(self, name):
+        """Profile the enclosed block as a named phase"""
+        self.start()
+        # Otherwise garbage from before the phase can be freed inside it
+        gc.collect()
+        if self._open:
+            # reset_peak below would lose the parent's peak so far
+            parent = self._open[-1]
+            parent[1] = max(parent[1], tracemalloc.get_traced_memory()[1])
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        state = [baseline, baseline]
+        self._open.append(state)
+        try:
+            yield
+        finally:
+            self._open.pop()
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, state[1])
+            after = tracemalloc.take_snapshot()
+            self.phases[name] = self._summarize(before, after, current - baseline, peak - baseline)
+            if self._open:
+                self._open[-1][1] = max(self._open[-1][1], peak)
+    
+    def _summarize(self, before, after, retained, peak):
+        # The snapshots themselves are tracemalloc's own allocations
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        before = before.filter_traces(ignore)
+        after = after.filter_traces(ignore)
+        
+        subsystems = {}
+        for stat in after.compare_to(before, 'filename'):
+            name = subsystem(stat.traceback[0].filename)
+            subsystems[name] = subsystems.get(name, 0) + stat.size_diff
+        
+        top = []
+        for stat in islice(after.compare_to(before, 'lineno'), self.top):
+            frame = stat.traceback[0]
+            top.append({
+                'site': site_name(frame.filename, frame.lineno),
+                'subsystem': subsystem(frame.filename),
+                'size_bytes': stat.size_diff,
+                'count': stat.count_diff
+            })
+        
+        return {
+            'retained_bytes': retained,
+            'peak_bytes': peak,
+            'subsystems': dict(sorted(subsystems.items(), key=lambda item: -item[1])),
+            'top': top
+        }
+    
+    def report(self):
+        return {
+            'python': sys.version.split()[0],
+            'frames': self.frames,
+            'phases': self.phases
+        }
+    
+    def save(self, filename):
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filename, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def format_report(report):
+    """Plain-text rendering of MemoryProfiler.report()"""
+    lines = []
+    for name, phase in report['phases'].items():
+        lines.append(f"{name}: retained {phase['retained_bytes'] / 2**20:.1f} MiB, "
+                     f"peak {phase['peak_bytes'] / 2**20:.1f} MiB")
+        for system, size in phase['subsystems'].items():
+            if abs(size) < 1024:
+                continue
+            lines.append(f"    {system:<16} {size / 2**20:>8.2f} MiB")
+        for site in phase['top']:
+            lines.append(f"    {site['size_bytes'] / 2**20:>8.2f} MiB {site['count']:>9} blocks  {site['site']}")
+    return '\n'.join(lines)
+
+
+def profile_booking_load(filename, lazy=False, engine=None, profiler=None):
+    """Profile BookingService.load_from_file on a saved bookings file"""
+    profiler = profiler or MemoryProfiler()
+    service = BookingService(lazy=lazy, engine=engine)
+    with profiler.phase('load_from_file'):
+        service.load_from_file(filename)
+    return profiler, service
+
+
+def profile_workload(num_events=50000, seed=0, lazy=False, engine=None, profiler=None, **workload_options):
+    """Profile replaying num_events bookings and cancellations from a
+    synthetic workload (services.workload_generator) into a fresh store
+    
+    The events are generated before the phase starts, so only the booking
+    store's own growth is measured.
+    """
+    profiler = profiler or MemoryProfiler()
+    booking_service = BookingService(lazy=lazy, engine=engine)
+    events = (event for event in WorkloadGenerator(seed=seed, **workload_options).events()
+              if event['event'] in ('booking', 'cancellation'))
+    events = list(islice(events, num_events))
+    with profiler.phase('workload'):
+        WorkloadGenerator.replay(events, booking_service)
+    return profiler, booking_service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory profile of loading bookings and a steady-state workload")
+    parser.add_argument('bookings', nargs='?', default='data/bookings.json')
+    parser.add_argument('--lazy', action='store_true')
+    parser.add_argument('--engine')
+    parser.add_argument('--workload', type=int, default=50000, metavar='EVENTS',
+                        help="synthetic bookings/cancellations replayed into an empty store "
+                             "after the load (default 50000, 0 to skip)")
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--output', help="write the JSON report here")
+    args = parser.parse_args(argv)
+    
+    profiler = MemoryProfiler(top=args.top)
+    profile_booking_load(args.bookings, args.lazy, args.engine, profiler)
+    if args.workload:
+        profile_workload(args.workload, lazy=args.lazy, engine=args.engine, profiler=profiler)
+    profiler.stop()
+    
+    print(format_report(profiler.report()))
+    if args.output:
+        profiler.save(args.output)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
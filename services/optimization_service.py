@@ -0,0 +1,145 @@
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from models.booking import BookingStatus
+
+class OptimizationService:
+    def __init__(self, booking_service):
+        self.booking_service = booking_service
+    
+    def optimize_room_assignments(self, rooms, start_date=None, orphan_nights=1, apply=True):
+        """Reassign confirmed bookings within each room type to close orphan gaps
+        
+        A gap of 1..orphan_nights free nights between two bookings can't be
+        sold. Bookings that start on or after start_date and are still only
+        confirmed may move to another room of the same type; everything else
+        stays put. All moves are applied to the interval trees in one step.
+        """
+        started = time.perf_counter()
+        if start_date is None:
+            start_date = datetime.combine(datetime.now().date(), datetime.min.time())
+        
+        by_type = {}
+        for room in rooms:
+            by_type.setdefault(room.room_type, []).append(room.room_id)
+        
+        moves = {}
+        orphans_before = 0
+        orphans_after = 0
+        
+        for room_ids in by_type.values():
+            fixed, movable = self._split_bookings(room_ids, start_date)
+            before = sum(self._orphan_nights(ivs, orphan_nights)
+                         for ivs in self._layout(room_ids, fixed, movable).values())
+            
+            plan = self._pack(room_ids, fixed, movable, orphan_nights)
+            after = before
+            if plan is not None:
+                after = sum(self._orphan_nights(ivs, orphan_nights)
+                            for ivs in self._layout(room_ids, fixed, movable, plan).values())
+            
+            if plan is not None and after < before:
+                for interval in movable:
+                    if plan[interval.booking_id] != interval.room_id:
+                        moves[interval.booking_id] = (interval.room_id, plan[interval.booking_id])
+                orphans_after += after
+            else:
+                orphans_after += before
+            orphans_before += before
+        
+        if apply and moves:
+            self.booking_service.move_bookings(moves)
+        
+        return {
+            'moves': [(bid, old, new) for bid, (old, new) in moves.items()],
+            'orphan_nights_before': orphans_before,
+            'orphan_nights_after': orphans_after,
+            'nights_recovered': orphans_before - orphans_after,
+            'elapsed': time.perf_counter() - started
+        }
+    
+    def _split_bookings(self, room_ids, start_date):
+        """Split a room type's intervals into fixed and movable ones"""
+        fixed = {room_id: [] for room_id in room_ids}
+        movable = []
+        for room_id in room_ids:
+            for interval in self.booking_service.room_intervals(room_id):
+                booking = self.booking_service.bookings[interval.booking_id]
+                if booking.status == BookingStatus.CONFIRMED and interval.start >= start_date:
+                    movable.append(interval)
+                else:
+                    fixed[room_id].append(interval)
+        movable.sort(key=lambda iv: (iv.start, iv.end))
+        return fixed, movable
+    
+    def _layout(self, room_ids, fixed, movable, plan=None):
+        """(start, end) pairs per room, sorted, for the current or planned layout"""
+        layout = {room_id: [(iv.start, iv.end) for iv in fixed[room_id]] for room_id in room_ids}
+        for interval in movable:
+            room_id = plan[interval.booking_id] if plan else interval.room_id
+            layout[room_id].append((interval.start, interval.end))
+        for intervals in layout.values():
+            intervals.sort()
+        return layout
+    
+    def _pack(self, room_ids, fixed, movable, orphan_nights):
+        """Greedy best-fit packing of movable bookings, in start order
+        
+        Each booking goes to the room where it leaves the fewest orphan
+        nights on either side, then the tightest gap before it. Returns
+        {booking_id: room_id}, or None if some booking doesn't fit.
+        """
+        fixed_starts = {r: [iv.start for iv in fixed[r]] for r in room_ids}
+        last_end = {r: None for r in room_ids}
+        limit = timedelta(days=orphan_nights)
+        plan = {}
+        
+        for interval in movable:
+            best = None
+            best_key = None
+            for room_id in room_ids:
+                prev_end = last_end[room_id]
+                if prev_end is not None and prev_end > interval.start:
+                    continue
+                
+                starts = fixed_starts[room_id]
+                pos = bisect_left(starts, interval.end)
+                if pos > 0 and fixed[room_id][pos - 1].end > interval.start:
+                    continue
+                if pos > 0:
+                    before_end = fixed[room_id][pos - 1].end
+                    if prev_end is None or before_end > prev_end:
+                        prev_end = before_end
+                
+                gap_before = interval.start - prev_end if prev_end is not None else None
+                gap_after = starts[pos] - interval.end if pos < len(starts) else None
+                
+                orphans = 0
+                if gap_before is not None and timedelta(0) < gap_before <= limit:
+                    orphans += gap_before.days
+                if gap_after is not None and timedelta(0) < gap_after <= limit:
+                    orphans += gap_after.days
+                
+                key = (orphans,
+                       gap_before if gap_before is not None else timedelta.max,
+                       room_id != interval.room_id)
+                if best_key is None or key < best_key:
+                    best, best_key = room_id, key
+                    if key == (0, timedelta(0), False):
+                        break
+            
+            if best is None:
+                return None
+            plan[interval.booking_id] = best
+            last_end[best] = interval.end
+        
+        return plan
+    
+    def _orphan_nights(self, intervals, orphan_nights):
+        """Unsellable nights between consecutive bookings of one room"""
+        total = 0
+        for (_, prev_end), (next_start, _) in zip(intervals, intervals[1:]):
+            gap = (next_start - prev_end).days
+            if 0 < gap <= orphan_nights:
+                total += gap
+        return total
@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from services.instrumentation import instrumented
 
 class PricingService:
     def __init__(self):
@@ -10,6 +11,7 @@ class PricingService:
             'off': 0.8
         }
     
+    @instrumented()
     def calculate_price(self, room, check_in, check_out):
         """Calculate total price with dynamic pricing"""
         days = (check_out - check_in).days
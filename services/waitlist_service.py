@@ -0,0 +1,115 @@
+from datetime import datetime
+from models.guest import LoyaltyTier
+from data_structures.priority_queue import IndexedPriorityQueue
+from data_structures.interval_tree import IntervalTree, Interval
+from repositories.room_repository import RoomRepository
+
+class WaitlistService:
+    """Waitlist per room type, promoted automatically when a booking is cancelled
+    
+    Each room type's IndexedPriorityQueue holds its requests' priorities
+    and gives the waitlist order. A cancellation only looks at requests
+    whose dates overlap the freed ones, found through the per-type
+    interval index, and takes them in queue priority; popping the heap
+    instead would walk requests that can't use the room.
+    """
+    
+    TIER_PRIORITY = {
+        LoyaltyTier.PLATINUM: 0,
+        LoyaltyTier.GOLD: 1,
+        LoyaltyTier.SILVER: 2,
+        LoyaltyTier.BRONZE: 3,
+        LoyaltyTier.NONE: 4
+    }
+    
+    def __init__(self, booking_service, pricing_service, rooms):
+        self.booking_service = booking_service
+        self.pricing_service = pricing_service
+        self.rooms = rooms if isinstance(rooms, RoomRepository) else RoomRepository(rooms)
+        self.queues = {}
+        self.request_index = {}
+        self.requests = {}
+        self.request_counter = 1
+        
+        booking_service.cancel_listeners.append(self.on_booking_cancelled)
+    
+    def add_request(self, guest, room_type, check_in, check_out):
+        """Put a guest on the waitlist for a room type and dates"""
+        if check_in >= check_out:
+            raise ValueError("Check-in date must be before check-out date")
+        
+        request_id = f"W{self.request_counter:06d}"
+        self.request_counter += 1
+        
+        # Higher tiers first, then first come first served
+        priority = (self.TIER_PRIORITY[guest.loyalty_tier], datetime.now(), request_id)
+        request = {
+            'request_id': request_id,
+            'guest_id': guest.guest_id,
+            'loyalty_tier': guest.loyalty_tier,
+            'room_type': room_type,
+            'check_in': check_in,
+            'check_out': check_out
+        }
+        self.requests[request_id] = request
+        
+        if room_type not in self.queues:
+            self.queues[room_type] = IndexedPriorityQueue()
+            self.request_index[room_type] = IntervalTree()
+        
+        self.queues[room_type].push(priority, request_id)
+        self.request_index[room_type].insert(Interval(check_in, check_out, request_id, room_type.value))
+        
+        return request_id
+    
+    def cancel_request(self, request_id):
+        """Withdraw a waitlist request"""
+        if request_id not in self.requests:
+            raise ValueError("Waitlist request not found")
+        self._remove(self.requests[request_id])
+    
+    def get_waitlist(self, room_type):
+        """Active requests for a room type in promotion order"""
+        queue = self.queues.get(room_type)
+        if queue is None:
+            return []
+        return [self.requests[rid] for rid in queue.ordered()]
+    
+    def on_booking_cancelled(self, booking):
+        """Give the freed room to the first waiting request that fits
+        
+        Returns (request, new booking), or None if nobody was promoted.
+        """
+        room = self.rooms.get(booking.room_id)
+        if room is None or room.room_type not in self.request_index:
+            return None
+        
+        # Only requests overlapping the freed dates can use them
+        freed = Interval(booking.check_in, booking.check_out, booking.booking_id, booking.room_id)
+        queue = self.queues[room.room_type]
+        overlapping = [iv.booking_id for iv in self.request_index[room.room_type].search_overlaps(freed)]
+        overlapping.sort(key=queue.get_priority)
+        candidates = [self.requests[rid] for rid in overlapping]
+        
+        for request in candidates:
+            if not self.booking_service.find_available_rooms(request['check_in'], request['check_out'], [room]):
+                continue
+            
+            price = self.pricing_service.calculate_price(room, request['check_in'], request['check_out'])
+            price = self.pricing_service.apply_loyalty_discount(price, request['loyalty_tier'].value)
+            promoted = self.booking_service.create_booking(
+                request['guest_id'], room.room_id, request['check_in'], request['check_out'], price)
+            
+            self._remove(request)
+            return request, promoted
+        
+        return None
+    
+    def _remove(self, request):
+        del self.requests[request['request_id']]
+        self.request_index[request['room_type']].delete(
+            Interval(request['check_in'], request['check_out'], request['request_id'], request['room_type'].value))
+        self.queues[request['room_type']].remove(request['request_id'])
+    
+    def __len__(self):
+        return len(self.requests)
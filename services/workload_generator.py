@@ -0,0 +1,304 @@
+import argparse
+import heapq
+import json
+import math
+import random
+from datetime import datetime, timedelta
+from models.booking import Booking, BookingStatus
+from models.room import Room, RoomType
+from models.guest import Guest
+from services.booking_service import BookingService
+from services.pricing_service import PricingService
+from repositories.room_repository import RoomRepository
+
+class WorkloadGenerator:
+    """Seeded synthetic hotel: a property, a guest base and a booking stream
+    
+    Each simulated day brings a Poisson number of booking requests. A
+    request has a lead time (a last-minute / planned mixture), a stay
+    length and a room type. Requests for stays on weekends and in high
+    season are more likely to go ahead. Accepted requests are booked
+    through BookingService, so a room is never double-booked; when every
+    room of the type is taken the request is recorded as denied. Some
+    bookings are cancelled later, more often the further ahead they were
+    made.
+    """
+    
+    # (room type, share of rooms, base price); better rooms sit higher up
+    ROOM_MIX = [
+        (RoomType.STANDARD, 0.55, 100.0),
+        (RoomType.DELUXE, 0.28, 180.0),
+        (RoomType.SUITE, 0.13, 320.0),
+        (RoomType.PENTHOUSE, 0.04, 750.0)
+    ]
+    FEATURES = {
+        RoomType.STANDARD: ['WiFi', 'TV'],
+        RoomType.DELUXE: ['WiFi', 'TV', 'Mini Bar'],
+        RoomType.SUITE: ['WiFi', 'TV', 'Mini Bar', 'Jacuzzi'],
+        RoomType.PENTHOUSE: ['WiFi', 'TV', 'Mini Bar', 'Jacuzzi', 'Balcony']
+    }
+    # Demand by month of the stay, January first
+    SEASONALITY = [0.65, 0.7, 0.85, 0.95, 1.05, 1.25, 1.35, 1.35, 1.05, 0.9, 0.8, 1.2]
+    WEEKEND_FACTOR = 1.3
+    # Nights per stay and their weights
+    STAY_LENGTHS = [(1, 30), (2, 26), (3, 17), (4, 10), (5, 7), (6, 3), (7, 5), (10, 1), (14, 1)]
+    LAST_MINUTE_SHARE = 0.3
+    LAST_MINUTE_MEAN_DAYS = 3
+    FIRST_NAMES = ['Aarav', 'Priya', 'James', 'Maria', 'Wei', 'Fatima', 'Lucas', 'Amara', 'Kenji',
+                   'Sofia', 'Omar', 'Elena', 'Rahul', 'Chloe', 'Mateo', 'Aisha', 'Noah', 'Yuki']
+    LAST_NAMES = ['Sharma', 'Smith', 'Garcia', 'Chen', 'Khan', 'Silva', 'Tanaka', 'Okafor', 'Rossi',
+                  'Müller', 'Patel', 'Kim', 'Novak', 'Haddad', 'Johansson', 'Reyes', 'Ivanova']
+    
+    def __init__(self, seed=0, floors=10, rooms_per_floor=20, num_guests=5000,
+                 start=datetime(2025, 1, 1), days=365, occupancy=0.75, cancel_rate=0.18,
+                 mean_lead_days=30):
+        self.rng = random.Random(seed)
+        self.start = start
+        self.days = days
+        self.occupancy = occupancy
+        self.cancel_rate = cancel_rate
+        self.mean_lead_days = mean_lead_days
+        
+        self.rooms = self.build_property(floors, rooms_per_floor)
+        self.repository = RoomRepository(self.rooms)
+        self.guests = self.build_guests(num_guests)
+        self.booking_service = BookingService()
+        self.pricing_service = PricingService()
+        
+        self.room_types = [room_type for room_type, _, _ in self.ROOM_MIX]
+        self.rooms_by_type = {room_type: self.repository.by_type(room_type) for room_type in self.room_types}
+        self.type_weights = [share for _, share, _ in self.ROOM_MIX]
+        self.nights = [nights for nights, _ in self.STAY_LENGTHS]
+        self.night_weights = [weight for _, weight in self.STAY_LENGTHS]
+    
+    def build_property(self, floors, rooms_per_floor):
+        """Rooms floor by floor, filling the room mix from the ground up"""
+        total = floors * rooms_per_floor
+        types = []
+        for room_type, share, price in self.ROOM_MIX:
+            types.extend([(room_type, price)] * round(total * share))
+        types = (types + [types[-1]] * total)[:total]
+        
+        rooms = []
+        for i, (room_type, price) in enumerate(types):
+            floor = i // rooms_per_floor + 1
+            room_number = floor * 100 + i % rooms_per_floor + 1
+            # Higher floors cost a little more
+            base_price = round(price * (1 + 0.02 * (floor - 1)), 2)
+            rooms.append(Room(f"R{room_number}", room_number, room_type, floor, base_price,
+                              list(self.FEATURES[room_type])))
+        return rooms
+    
+    def build_guests(self, num_guests):
+        guests = []
+        for i in range(num_guests):
+            first = self.rng.choice(self.FIRST_NAMES)
+            last = self.rng.choice(self.LAST_NAMES)
+            guest = Guest(
+                guest_id=f"G{i + 1:06d}",
+                name=f"{first} {last}",
+                email=f"{first.lower()}.{last.lower()}{i + 1}@example.com",
+                phone=f"+1-555-{self.rng.randrange(10 ** 7):07d}",
+                id_proof=f"ID{self.rng.randrange(10 ** 9):09d}"
+            )
+            guest.created_at = self.start
+            guests.append(guest)
+        return guests
+    
+    def demand(self, day):
+        """Relative demand for a night, 1.0 being an average weekday"""
+        factor = self.SEASONALITY[day.month - 1]
+        if day.weekday() in (4, 5):
+            factor *= self.WEEKEND_FACTOR
+        return factor
+    
+    def requests_per_day(self):
+        """Mean daily requests needed to hit the target occupancy
+        
+        Requests are thinned by demand / peak demand and some bookings are
+        later cancelled, so the raw rate is scaled up for both.
+        """
+        mean_nights = (sum(n * w for n, w in self.STAY_LENGTHS) /
+                       sum(w for _, w in self.STAY_LENGTHS))
+        year = [self.demand(self.start + timedelta(days=d)) for d in range(365)]
+        acceptance = sum(year) / len(year) / self.peak_demand()
+        return (self.occupancy * len(self.rooms) / mean_nights /
+                acceptance / (1 - self.cancel_rate / 2))
+    
+    def peak_demand(self):
+        return max(self.SEASONALITY) * self.WEEKEND_FACTOR
+    
+    def lead_time(self):
+        if self.rng.random() < self.LAST_MINUTE_SHARE:
+            return int(self.rng.expovariate(1 / self.LAST_MINUTE_MEAN_DAYS))
+        return int(self.rng.expovariate(1 / self.mean_lead_days))
+    
+    def stay_length(self, check_in):
+        nights = self.rng.choices(self.nights, self.night_weights)[0]
+        # Friday arrivals are mostly weekend breaks
+        if check_in.weekday() == 4 and self.rng.random() < 0.5:
+            nights = 2
+        return nights
+    
+    def pick_guest(self):
+        # Skewed towards low ids so a minority of guests are regulars
+        return self.guests[int(len(self.guests) * self.rng.random() ** 2)]
+    
+    def poisson(self, mean):
+        if mean > 50:
+            return max(0, round(self.rng.gauss(mean, math.sqrt(mean))))
+        limit = math.exp(-mean)
+        count = 0
+        product = self.rng.random()
+        while product > limit:
+            count += 1
+            product *= self.rng.random()
+        return count
+    
+    def events(self):
+        """Yield events in time order while applying them to booking_service
+        
+        Event kinds: 'room' and 'guest' (the property and guest base, first),
+        then 'booking', 'cancellation' and 'denied'.
+        """
+        for room in self.rooms:
+            yield {'event': 'room', **room.to_dict()}
+        for guest in self.guests:
+            record = guest.to_dict()
+            del record['booking_history']
+            yield {'event': 'guest', **record}
+        
+        rate = self.requests_per_day()
+        peak = self.peak_demand()
+        cancellations = []
+        sequence = 0
+        
+        for offset in range(self.days):
+            day = self.start + timedelta(days=offset)
+            day_events = []
+            
+            for _ in range(self.poisson(rate)):
+                at = day + timedelta(seconds=self.rng.randrange(86400))
+                check_in = datetime.combine((at + timedelta(days=self.lead_time())).date(), datetime.min.time())
+                if check_in < day:
+                    check_in = day
+                if self.rng.random() * peak > self.demand(check_in):
+                    continue
+                check_out = check_in + timedelta(days=self.stay_length(check_in))
+                room_type = self.rng.choices(self.room_types, self.type_weights)[0]
+                day_events.append((at, 0, sequence, (self.pick_guest(), room_type, check_in, check_out)))
+                sequence += 1
+            
+            next_day = day + timedelta(days=1)
+            while cancellations and cancellations[0][0] < next_day:
+                at, seq, booking_id = heapq.heappop(cancellations)
+                day_events.append((at, 1, seq, booking_id))
+            
+            day_events.sort(key=lambda e: (e[0], e[1], e[2]))
+            for at, kind, _, payload in day_events:
+                if kind == 1:
+                    booking = self.booking_service.get_booking(payload)
+                    if booking.status == BookingStatus.CANCELLED:
+                        continue
+                    self.booking_service.cancel_booking(payload)
+                    yield {'event': 'cancellation', 'at': at.isoformat(), 'booking_id': payload}
+                    continue
+                
+                guest, room_type, check_in, check_out = payload
+                booking = self.book(guest, room_type, check_in, check_out, at)
+                if booking is None:
+                    yield {'event': 'denied', 'at': at.isoformat(), 'guest_id': guest.guest_id,
+                           'room_type': room_type.value, 'check_in': check_in.isoformat(),
+                           'check_out': check_out.isoformat()}
+                    continue
+                
+                yield {'event': 'booking', **booking.to_dict()}
+                
+                # Far-ahead bookings are cancelled more often
+                lead_days = (check_in - at).days
+                chance = self.cancel_rate * (0.5 + min(lead_days, 90) / 90)
+                if lead_days > 0 and self.rng.random() < chance:
+                    cancel_at = at + (check_in - at) * self.rng.random()
+                    heapq.heappush(cancellations, (cancel_at, sequence, booking.booking_id))
+                    sequence += 1
+    
+    def book(self, guest, room_type, check_in, check_out, at):
+        """Book a free room of the type, or return None if the type is full
+        
+        Rooms are tried from a random starting point and the first free one
+        is taken, so a busy type doesn't need a full availability scan.
+        """
+        candidates = self.rooms_by_type[room_type]
+        if not candidates:
+            # Small properties may not have every type
+            return None
+        first = self.rng.randrange(len(candidates))
+        for room in candidates[first:] + candidates[:first]:
+            if self.booking_service.is_room_available(room.room_id, check_in, check_out):
+                return self.create(guest, room, check_in, check_out, at)
+        return None
+    
+    def create(self, guest, room, check_in, check_out, at):
+        price = self.pricing_service.calculate_price(room, check_in, check_out)
+        booking = self.booking_service.create_booking(guest.guest_id, room.room_id, check_in, check_out, price)
+        booking.created_at = at
+        return booking
+    
+    def write_jsonl(self, filename, limit=None):
+        """Stream events to a JSON Lines file; returns the number written"""
+        count = 0
+        with open(filename, 'w') as f:
+            for event in self.events():
+                f.write(json.dumps(event))
+                f.write('\n')
+                count += 1
+                if limit is not None and count >= limit:
+                    break
+        return count
+    
+    @staticmethod
+    def read_jsonl(filename):
+        with open(filename, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    @staticmethod
+    def replay(events, booking_service):
+        """Apply booking and cancellation events, keeping the recorded ids"""
+        counter = booking_service.booking_counter
+        for event in events:
+            if event['event'] == 'booking':
+                record = dict(event)
+                del record['event']
+                booking_service.add_booking(Booking.from_dict(record))
+                counter = max(counter, int(record['booking_id'][1:]) + 1)
+            elif event['event'] == 'cancellation':
+                booking_service.cancel_booking(event['booking_id'])
+        booking_service.booking_counter = counter
+        return booking_service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic hotel workload as JSON Lines")
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--floors', type=int, default=10)
+    parser.add_argument('--rooms-per-floor', type=int, default=20)
+    parser.add_argument('--guests', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--start', type=datetime.fromisoformat, default=datetime(2025, 1, 1))
+    parser.add_argument('--occupancy', type=float, default=0.75)
+    parser.add_argument('--cancel-rate', type=float, default=0.18)
+    parser.add_argument('--limit', type=int, help="stop after this many events")
+    args = parser.parse_args(argv)
+    
+    generator = WorkloadGenerator(seed=args.seed, floors=args.floors, rooms_per_floor=args.rooms_per_floor,
+                                  num_guests=args.guests, start=args.start, days=args.days,
+                                  occupancy=args.occupancy, cancel_rate=args.cancel_rate)
+    count = generator.write_jsonl(args.output, args.limit)
+    print(f"Wrote {count} events to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import tempfile
+import unittest
+from datetime import datetime
+from models.booking import BookingStatus
+from models.room import RoomType
+from services.hotel_core import HotelCore
+
+
+class ImportEventsWaitlistTest(unittest.TestCase):
+    """Imported cancellations reach the waitlist only after the whole batch"""
+    
+    CHECK_IN = datetime(2030, 1, 1)
+    CHECK_OUT = datetime(2030, 1, 4)
+    
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.core = HotelCore(data_dir=self.data_dir.name)
+        # The sample hotel has a single penthouse
+        self.penthouse = self.core.rooms.by_type(RoomType.PENTHOUSE)[0].room_id
+        self.booking, _ = self.core.book('G0001', self.penthouse, self.CHECK_IN, self.CHECK_OUT)
+        self.request_id, _ = self.core.join_waitlist('G0002', RoomType.PENTHOUSE, self.CHECK_IN, self.CHECK_OUT)
+    
+    def tearDown(self):
+        self.data_dir.cleanup()
+    
+    def booking_event(self, booking_id, guest_id, room_id):
+        return {
+            'event': 'booking',
+            'booking_id': booking_id,
+            'guest_id': guest_id,
+            'room_id': room_id,
+            'check_in': self.CHECK_IN.isoformat(),
+            'check_out': self.CHECK_OUT.isoformat(),
+            'total_price': 300.0,
+            'status': BookingStatus.CONFIRMED.value,
+            'created_at': datetime(2029, 12, 1).isoformat()
+        }
+    
+    def test_cancellation_promotes_after_the_batch(self):
+        # B000002 is the id the waitlist would have taken mid-import
+        next_id = f"B{self.core.booking_service.booking_counter:06d}"
+        counts = self.core.import_events([
+            {'event': 'cancellation', 'booking_id': self.booking.booking_id},
+            self.booking_event(next_id, 'G0003', 'R101')
+        ])
+        
+        self.assertEqual(counts, {'cancellation': 1, 'booking': 1, 'promotion': 1})
+        imported = self.core.booking_service.get_booking(next_id)
+        self.assertEqual((imported.guest_id, imported.room_id), ('G0003', 'R101'))
+        
+        promoted = self.core.booking_service.get_guest_bookings('G0002')
+        self.assertEqual(len(promoted), 1)
+        self.assertEqual(promoted[0].room_id, self.penthouse)
+        self.assertNotEqual(promoted[0].booking_id, next_id)
+        self.assertEqual(len(self.core.waitlist_service), 0)
+        
+        # Points follow the bookings: taken back, credited, earned
+        self.assertEqual(self.core.guests['G0001'].loyalty_points, 0)
+        self.assertEqual(self.core.guests['G0002'].loyalty_points, int(promoted[0].total_price))
+        self.assertEqual(self.core.guests['G0003'].loyalty_points, 300)
+    
+    def test_imported_booking_keeps_the_freed_room(self):
+        next_id = f"B{self.core.booking_service.booking_counter:06d}"
+        counts = self.core.import_events([
+            {'event': 'cancellation', 'booking_id': self.booking.booking_id},
+            self.booking_event(next_id, 'G0003', self.penthouse)
+        ])
+        
+        self.assertNotIn('promotion', counts)
+        active = self.core.booking_service.room_intervals(self.penthouse)
+        self.assertEqual([interval.booking_id for interval in active], [next_id])
+        self.assertEqual(self.core.booking_service.get_guest_bookings('G0002'), [])
+        self.assertEqual(len(self.core.waitlist_service), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
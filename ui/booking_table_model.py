@@ -0,0 +1,160 @@
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from models.booking import BookingStatus
+
+class BookingTableModel(QAbstractTableModel):
+    """Bookings in creation order, read straight from BookingService
+    
+    Rows are fetched in batches as the view scrolls (canFetchMore/
+    fetchMore), and data() only looks up the rows the view paints, via
+    booking_row() so lazy bookings stay unbuilt. BookingService's add and
+    update listeners turn new, cancelled and moved bookings into row
+    inserts and dataChanged; refresh() resets the model for anything they
+    don't cover, such as a bulk load.
+    """
+    
+    COLUMNS = ["ID", "Guest", "Room", "Check-in", "Check-out", "Price", "Status", "Actions"]
+    ACTIONS_COLUMN = 7
+    FETCH_BATCH = 1000
+    
+    # Roles for a row's booking id and BookingStatus, used by the delegate
+    BookingIdRole = Qt.UserRole
+    StatusRole = Qt.UserRole + 1
+    
+    def __init__(self, booking_service, guests, rooms, parent=None):
+        super().__init__(parent)
+        self.booking_service = booking_service
+        self.guests = guests
+        self.rooms = rooms
+        self.fetched = min(len(booking_service.records), self.FETCH_BATCH)
+        
+        booking_service.add_listeners.append(self.on_booking_added)
+        booking_service.update_listeners.append(self.on_booking_updated)
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.fetched
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.fetched < len(self.booking_service.records)
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        total = len(self.booking_service.records)
+        count = min(total - self.fetched, self.FETCH_BATCH)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + count - 1)
+        self.fetched += count
+        self.endInsertRows()
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return super().headerData(section, orientation, role)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.fetched:
+            return None
+        if role not in (Qt.DisplayRole, self.BookingIdRole, self.StatusRole):
+            return None
+        booking_id, guest_id, room_id, check_in, check_out, total_price, status = \
+            self.booking_service.booking_row(index.row())
+        
+        if role == self.BookingIdRole:
+            return booking_id
+        if role == self.StatusRole:
+            return status
+        
+        column = index.column()
+        if column == 0:
+            return booking_id
+        if column == 1:
+            guest = self.guests.get(guest_id)
+            return guest.name if guest else "Unknown"
+        if column == 2:
+            room = self.rooms.get(room_id)
+            return str(room.room_number) if room else "Unknown"
+        if column == 3:
+            return check_in.strftime("%Y-%m-%d")
+        if column == 4:
+            return check_out.strftime("%Y-%m-%d")
+        if column == 5:
+            return f"${total_price:.2f}"
+        if column == 6:
+            return status.value
+        return None
+    
+    def refresh(self):
+        """Re-read everything, keeping as many rows fetched as before"""
+        self.beginResetModel()
+        total = len(self.booking_service.records)
+        self.fetched = min(total, max(self.fetched, self.FETCH_BATCH))
+        self.endResetModel()
+    
+    def on_booking_added(self, booking):
+        key = self.booking_service.booking_ids.lookup(booking.booking_id)
+        # Rows past the fetched ones arrive through fetchMore
+        if key != self.fetched:
+            return
+        self.beginInsertRows(QModelIndex(), key, key)
+        self.fetched += 1
+        self.endInsertRows()
+    
+    def on_booking_updated(self, booking):
+        key = self.booking_service.booking_ids.lookup(booking.booking_id)
+        if key < self.fetched:
+            self.dataChanged.emit(self.index(key, 0), self.index(key, len(self.COLUMNS) - 1))
+
+
+class CancelButtonDelegate(QStyledItemDelegate):
+    """Paints a Cancel button in confirmed bookings' Actions cell and emits
+    cancel_requested(booking_id) when it's clicked, so the table needs no
+    per-row widgets"""
+    
+    cancel_requested = pyqtSignal(str)
+    
+    def __init__(self, color="#f5576c", parent=None):
+        super().__init__(parent)
+        self.color = QColor(color)
+    
+    def button_rect(self, option):
+        return option.rect.adjusted(4, 4, -4, -4)
+    
+    def is_cancellable(self, index):
+        return index.data(BookingTableModel.StatusRole) == BookingStatus.CONFIRMED
+    
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        if not self.is_cancellable(index):
+            return
+        
+        hovered = option.state & QStyle.State_MouseOver
+        color = self.color.lighter(115) if hovered else self.color
+        
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(QRectF(self.button_rect(option)), 8, 8)
+        
+        font = QFont(option.font)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(Qt.white)
+        painter.drawText(self.button_rect(option), Qt.AlignCenter, "Cancel")
+        painter.restore()
+    
+    def sizeHint(self, option, index):
+        return QSize(100, 36)
+    
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and self.is_cancellable(index) and self.button_rect(option).contains(event.pos())):
+            self.cancel_requested.emit(index.data(BookingTableModel.BookingIdRole))
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -1,14 +1,13 @@
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-from models.room import Room, RoomType
-from models.guest import Guest
-from services.booking_service import BookingService
-from services.allocation_service import AllocationService
-from services.pricing_service import PricingService
-from services.analytics_service import AnalyticsService
-import json
+from models.room import RoomType
+from services.hotel_core import HotelCore
+from services.instrumentation import metrics
+from services.memory_profiler import MemoryProfiler
+from ui.booking_table_model import BookingTableModel, CancelButtonDelegate
 import os
 
 class ModernButton(QPushButton):
@@ -135,6 +134,10 @@ class StatCard(QFrame):
         self.animation.start()
 
 class MainWindow(QMainWindow):
+    GUEST_SEARCH_LIMIT = 20
+    LOYALTY_RECOMPUTE_MS = 5 * 60 * 1000
+    DIAGNOSTICS_REFRESH_MS = 2000
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("🏨 Luxe Hotel - Smart Management System")
@@ -179,36 +182,78 @@ class MainWindow(QMainWindow):
             }
         """)
         
-        # Initialize services
-        self.booking_service = BookingService()
-        self.pricing_service = PricingService()
+        # HOTEL_MEMORY_PROFILE=report.json profiles startup memory
+        self.memory_report = os.environ.get('HOTEL_MEMORY_PROFILE')
+        self.memory_profiler = MemoryProfiler() if self.memory_report else None
+        
+        # Load data and build the services
+        with self.memory_phase('startup.load_data'):
+            self.core = HotelCore(memory_profiler=self.memory_profiler)
+        
+        # Shorthands for the widgets
+        self.booking_service = self.core.booking_service
+        self.pricing_service = self.core.pricing_service
+        self.analytics_service = self.core.analytics_service
+        self.rooms = self.core.rooms
+        self.guests = self.core.guests
+        
+        # Tabs are built on first activation; until then their widgets are None
+        self.bookings_table = None
+        self.guests_table = None
+        self.rooms_table = None
+        self.analytics_text = None
+        self.tree_stats_text = None
+        self.game_timer = None
+        
+        # Queries too slow for startup run one per event loop pass once idle
+        self.deferred_tasks = []
+        self.deferred_timer = QTimer()
+        self.deferred_timer.setInterval(0)
+        self.deferred_timer.timeout.connect(self.run_deferred_task)
         
-        # Initialize data
-        self.rooms = []
-        self.guests = {}
-        self.guest_counter = 1
+        # Setup UI
+        with self.memory_phase('startup.setup_ui'):
+            self.setup_ui()
         
-        # Load data
-        self.load_data()
+        if self.memory_profiler:
+            self.memory_profiler.stop()
+            self.memory_profiler.save(self.memory_report)
+            print(f"Memory profile written to {self.memory_report}")
         
-        # Initialize other services
-        self.allocation_service = AllocationService(self.booking_service)
-        self.allocation_service.build_room_graph(self.rooms)
-        self.analytics_service = AnalyticsService(self.booking_service, self.rooms)
-        
-        # Setup UI
-        self.setup_ui()
+        # Periodically reconcile loyalty points with the booking store
+        self.loyalty_timer = QTimer()
+        self.loyalty_timer.timeout.connect(self.run_loyalty_job)
+        self.loyalty_timer.start(self.LOYALTY_RECOMPUTE_MS)
         
         # Start animations
         self.setup_animations()
     
+    def memory_phase(self, name):
+        """A MemoryProfiler phase when startup profiling is on, else a no-op"""
+        if self.memory_profiler is None:
+            return nullcontext()
+        return self.memory_profiler.phase(name)
+    
+    def defer(self, task):
+        """Run task once the event loop is idle (at most once if queued twice)"""
+        if task not in self.deferred_tasks:
+            self.deferred_tasks.append(task)
+        self.deferred_timer.start()
+    
+    def run_deferred_task(self):
+        if not self.deferred_tasks:
+            self.deferred_timer.stop()
+            return
+        task = self.deferred_tasks.pop(0)
+        task()
+    
     def setup_animations(self):
         """Setup continuous animations"""
         self.title_animation = QPropertyAnimation(self.title_label, b"geometry")
         self.title_animation.setDuration(2000)
         self.title_animation.setLoopCount(-1)
         self.title_animation.setEasingCurve(QEasingCurve.InOutSine)
-        
+    
     def setup_ui(self):
         """Setup modern UI"""
         # Central widget with scroll
@@ -273,15 +318,13 @@ class MainWindow(QMainWindow):
         stats_grid = QHBoxLayout()
         stats_grid.setSpacing(20)
         
-        # Create stat cards
-        bookings = self.booking_service.get_all_bookings()
-        active_bookings = sum(1 for b in bookings if b.status.value == "Confirmed")
-        total_revenue = sum(b.total_price for b in bookings if b.status.value != "Cancelled")
-        
+        # Create stat cards; the booking totals scan every booking, so they
+        # are filled in after the window is up
         self.stat_rooms = StatCard("🏠", "Total Rooms", len(self.rooms), "#667eea")
-        self.stat_bookings = StatCard("📅", "Active Bookings", active_bookings, "#f093fb")
+        self.stat_bookings = StatCard("📅", "Active Bookings", "…", "#f093fb")
         self.stat_guests = StatCard("👥", "Total Guests", len(self.guests), "#4facfe")
-        self.stat_revenue = StatCard("💰", f"${total_revenue:.0f}", "Revenue", "#43e97b")
+        self.stat_revenue = StatCard("💰", "Revenue", "…", "#43e97b")
+        self.defer(self.update_stat_cards)
         
         stats_grid.addWidget(self.stat_rooms)
         stats_grid.addWidget(self.stat_bookings)
@@ -292,18 +335,45 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(stats_card)
         
         # Tab widget with modern style
-        tabs = QTabWidget()
-        tabs.setDocumentMode(True)
-        main_layout.addWidget(tabs)
-        
-        # Create tabs with icons
-        tabs.addTab(self.create_modern_booking_tab(), "🎯 Quick Booking")
-        tabs.addTab(self.create_modern_manage_tab(), "📋 Reservations")
-        tabs.addTab(self.create_modern_guests_tab(), "👥 VIP Guests")
-        tabs.addTab(self.create_modern_rooms_tab(), "🏠 Room Gallery")
-        tabs.addTab(self.create_modern_analytics_tab(), "📊 Analytics Pro")
-        tabs.addTab(self.create_visualization_tab(), "🌲 Tech View")
-        tabs.addTab(self.create_game_tab(), "🎮 Fun Zone")
+        self.tabs = QTabWidget()
+        self.tabs.setDocumentMode(True)
+        main_layout.addWidget(self.tabs)
+        
+        # Create tabs with icons; each holds an empty page until first shown
+        self.tab_builders = [
+            (self.create_modern_booking_tab, "🎯 Quick Booking"),
+            (self.create_modern_manage_tab, "📋 Reservations"),
+            (self.create_modern_guests_tab, "👥 VIP Guests"),
+            (self.create_modern_rooms_tab, "🏠 Room Gallery"),
+            (self.create_modern_analytics_tab, "📊 Analytics Pro"),
+            (self.create_visualization_tab, "🌲 Tech View"),
+            (self.create_game_tab, "🎮 Fun Zone"),
+            (self.create_diagnostics_tab, "🩺 Diagnostics")
+        ]
+        self.built_tabs = set()
+        for _, title in self.tab_builders:
+            page = QWidget()
+            page.setStyleSheet("background: transparent;")
+            page_layout = QVBoxLayout()
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            page.setLayout(page_layout)
+            self.tabs.addTab(page, title)
+        
+        self.build_tab(self.tabs.currentIndex())
+        self.tabs.currentChanged.connect(self.build_tab)
+    
+    def build_tab(self, index):
+        """Build a tab's contents the first time it's activated"""
+        if index < 0 or index in self.built_tabs:
+            return
+        self.built_tabs.add(index)
+        builder, _ = self.tab_builders[index]
+        self.tabs.widget(index).layout().addWidget(builder())
+    
+    def update_stat_cards(self):
+        active, revenue = self.core.booking_totals()
+        self.stat_bookings.update_value(active)
+        self.stat_revenue.update_value(f"${revenue:.0f}")
     
     def create_modern_booking_tab(self):
         """Create modern booking tab with animations"""
@@ -343,6 +413,23 @@ class MainWindow(QMainWindow):
         guest_label.setStyleSheet(label_style)
         form_grid.addWidget(guest_label, 0, 0)
         
+        guest_picker = QVBoxLayout()
+        
+        self.guest_search = QLineEdit()
+        self.guest_search.setPlaceholderText("🔍 Type a name, email or phone...")
+        self.guest_search.setStyleSheet("""
+            QLineEdit {
+                padding: 10px;
+                border: 2px solid rgba(102, 126, 234, 0.5);
+                border-radius: 8px;
+                font-size: 13px;
+                background-color: rgba(255, 255, 255, 0.1);
+                color: white;
+            }
+        """)
+        self.guest_search.textChanged.connect(self.update_guest_combo)
+        guest_picker.addWidget(self.guest_search)
+        
         self.guest_combo = QComboBox()
         self.guest_combo.setStyleSheet("""
             QComboBox {
@@ -367,7 +454,8 @@ class MainWindow(QMainWindow):
             }
         """)
         self.update_guest_combo()
-        form_grid.addWidget(self.guest_combo, 0, 1)
+        guest_picker.addWidget(self.guest_combo)
+        form_grid.addLayout(guest_picker, 0, 1)
         
         # New guest button
         new_guest_btn = ModernButton("➕ Add New Guest", "#43e97b")
@@ -440,6 +528,39 @@ class MainWindow(QMainWindow):
         self.checkout_date.dateChanged.connect(self.update_available_rooms)
         form_grid.addWidget(self.checkout_date, 3, 1, 1, 2)
         
+        # Price range
+        price_label = QLabel("💲 Price Range:")
+        price_label.setStyleSheet(label_style)
+        form_grid.addWidget(price_label, 4, 0)
+        
+        spin_style = """
+            QDoubleSpinBox {
+                padding: 10px;
+                border: 2px solid rgba(102, 126, 234, 0.5);
+                border-radius: 8px;
+                font-size: 13px;
+                background-color: rgba(255, 255, 255, 0.1);
+                color: white;
+            }
+        """
+        max_price = max((r.base_price for r in self.rooms), default=0)
+        
+        self.min_price_spin = QDoubleSpinBox()
+        self.min_price_spin.setRange(0, 100000)
+        self.min_price_spin.setPrefix("$")
+        self.min_price_spin.setValue(0)
+        self.min_price_spin.setStyleSheet(spin_style)
+        self.min_price_spin.valueChanged.connect(self.update_available_rooms)
+        form_grid.addWidget(self.min_price_spin, 4, 1)
+        
+        self.max_price_spin = QDoubleSpinBox()
+        self.max_price_spin.setRange(0, 100000)
+        self.max_price_spin.setPrefix("$")
+        self.max_price_spin.setValue(max_price)
+        self.max_price_spin.setStyleSheet(spin_style)
+        self.max_price_spin.valueChanged.connect(self.update_available_rooms)
+        form_grid.addWidget(self.max_price_spin, 4, 2)
+        
         card_layout.addLayout(form_grid)
         
         # Available rooms list
@@ -494,6 +615,10 @@ class MainWindow(QMainWindow):
         book_btn.clicked.connect(self.create_booking)
         card_layout.addWidget(book_btn)
         
+        waitlist_btn = ModernButton("⏳ Join Waitlist", "#f093fb")
+        waitlist_btn.clicked.connect(self.join_waitlist)
+        card_layout.addWidget(waitlist_btn)
+        
         layout.addWidget(card)
         self.update_available_rooms()
         
@@ -530,13 +655,19 @@ class MainWindow(QMainWindow):
         card_layout = QVBoxLayout()
         card.setLayout(card_layout)
         
-        self.bookings_table = QTableWidget()
-        self.bookings_table.setColumnCount(8)
-        self.bookings_table.setHorizontalHeaderLabels([
-            "ID", "Guest", "Room", "Check-in", "Check-out", "Price", "Status", "Actions"
-        ])
+        # A model over the booking store: rows are read as they're painted and
+        # updated in place when bookings are added, cancelled or moved
+        self.bookings_model = BookingTableModel(self.booking_service, self.guests, self.rooms, self)
+        self.bookings_table = QTableView()
+        self.bookings_table.setModel(self.bookings_model)
+        cancel_delegate = CancelButtonDelegate(parent=self.bookings_table)
+        cancel_delegate.cancel_requested.connect(self.cancel_booking)
+        self.bookings_table.setItemDelegateForColumn(BookingTableModel.ACTIONS_COLUMN, cancel_delegate)
+        self.bookings_table.setMouseTracking(True)
+        self.bookings_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.bookings_table.verticalHeader().setDefaultSectionSize(44)
         self.bookings_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: rgba(255, 255, 255, 0.05);
                 border: none;
                 border-radius: 10px;
@@ -551,11 +682,11 @@ class MainWindow(QMainWindow):
                 font-weight: bold;
                 font-size: 13px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
                 color: white;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: rgba(102, 126, 234, 0.5);
             }
         """)
@@ -565,7 +696,7 @@ class MainWindow(QMainWindow):
         card_layout.addWidget(self.bookings_table)
         layout.addWidget(card)
         
-        self.update_bookings_table()
+        self.defer(self.bookings_table.resizeColumnsToContents)
         
         return widget
     
@@ -622,7 +753,7 @@ class MainWindow(QMainWindow):
         card_layout.addWidget(self.guests_table)
         layout.addWidget(card)
         
-        self.update_guests_table()
+        self.defer(self.update_guests_table)
         
         return widget
     
@@ -679,7 +810,7 @@ class MainWindow(QMainWindow):
         card_layout.addWidget(self.rooms_table)
         layout.addWidget(card)
         
-        self.update_rooms_table()
+        self.defer(self.update_rooms_table)
         
         return widget
     
@@ -764,7 +895,8 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(stats_card)
         
-        self.update_analytics()
+        self.analytics_text.setHtml("<p style='color: white;'>Loading analytics…</p>")
+        self.defer(self.update_analytics)
         
         return widget
     
@@ -906,12 +1038,16 @@ class MainWindow(QMainWindow):
         viz_btn.clicked.connect(self.show_tree_visualization)
         room_layout.addWidget(viz_btn)
         
+        stats_btn = ModernButton("📈 Refresh Stats", "#43e97b")
+        stats_btn.clicked.connect(self.update_tree_stats)
+        room_layout.addWidget(stats_btn)
+        
         room_layout.addStretch()
         card_layout.addLayout(room_layout)
         
         self.tree_stats_text = QTextEdit()
         self.tree_stats_text.setReadOnly(True)
-        self.tree_stats_text.setMaximumHeight(200)
+        self.tree_stats_text.setMaximumHeight(460)
         self.tree_stats_text.setStyleSheet("""
             QTextEdit {
                 background-color: rgba(255, 255, 255, 0.05);
@@ -926,10 +1062,127 @@ class MainWindow(QMainWindow):
         layout.addWidget(card)
         layout.addStretch()
         
-        self.update_tree_stats()
+        self.tree_stats_text.setHtml("<p style='color: white;'>Loading statistics…</p>")
+        self.defer(self.update_tree_stats)
+        
+        return widget
+    
+    def create_diagnostics_tab(self):
+        """Call counts and latency histograms of the instrumented services"""
+        widget = QWidget()
+        widget.setStyleSheet("background: transparent;")
+        layout = QVBoxLayout()
+        widget.setLayout(layout)
+        
+        header_layout = QHBoxLayout()
+        header = QLabel("🩺 DIAGNOSTICS")
+        header.setStyleSheet("""
+            font-size: 28px;
+            font-weight: bold;
+            color: white;
+            padding: 15px;
+            background: transparent;
+        """)
+        header_layout.addWidget(header)
+        header_layout.addStretch()
+        
+        self.instrumentation_check = QCheckBox("Record timings")
+        self.instrumentation_check.setStyleSheet("color: white; font-size: 14px; background: transparent;")
+        self.instrumentation_check.setChecked(metrics.enabled)
+        self.instrumentation_check.toggled.connect(self.toggle_instrumentation)
+        header_layout.addWidget(self.instrumentation_check)
+        
+        for text, color, slot in (("🔄 Refresh", "#4facfe", self.update_diagnostics),
+                                  ("🧹 Reset", "#f5576c", self.reset_diagnostics),
+                                  ("💾 Export", "#43e97b", self.export_diagnostics)):
+            button = ModernButton(text, color)
+            button.clicked.connect(slot)
+            header_layout.addWidget(button)
+        
+        layout.addLayout(header_layout)
+        
+        card = GlassCard()
+        card_layout = QVBoxLayout()
+        card.setLayout(card_layout)
+        
+        self.diagnostics_table = QTableWidget()
+        self.diagnostics_table.setColumnCount(7)
+        self.diagnostics_table.setHorizontalHeaderLabels([
+            "Method", "Calls", "Mean", "p50", "p95", "p99", "Max"
+        ])
+        self.diagnostics_table.setStyleSheet("""
+            QTableWidget {
+                background-color: rgba(255, 255, 255, 0.05);
+                border: none;
+                border-radius: 10px;
+                gridline-color: rgba(255, 255, 255, 0.1);
+                color: white;
+            }
+            QHeaderView::section {
+                background-color: rgba(102, 126, 234, 0.8);
+                color: white;
+                padding: 12px;
+                border: none;
+                font-weight: bold;
+                font-size: 13px;
+            }
+        """)
+        self.diagnostics_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        card_layout.addWidget(self.diagnostics_table)
+        
+        note = QLabel("Percentiles are bucket upper bounds (buckets double from 1µs).")
+        note.setStyleSheet("font-size: 12px; padding: 5px; color: rgba(255, 255, 255, 0.6); background: transparent;")
+        card_layout.addWidget(note)
+        
+        layout.addWidget(card)
+        
+        self.diagnostics_timer = QTimer()
+        self.diagnostics_timer.timeout.connect(self.update_diagnostics)
+        if metrics.enabled:
+            self.diagnostics_timer.start(self.DIAGNOSTICS_REFRESH_MS)
+        
+        self.update_diagnostics()
         
         return widget
     
+    def toggle_instrumentation(self, enabled):
+        if enabled:
+            metrics.enable()
+            self.diagnostics_timer.start(self.DIAGNOSTICS_REFRESH_MS)
+        else:
+            metrics.disable()
+            self.diagnostics_timer.stop()
+        self.update_diagnostics()
+    
+    def reset_diagnostics(self):
+        metrics.reset()
+        self.update_diagnostics()
+    
+    def export_diagnostics(self):
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Metrics", "metrics.json", "JSON (*.json);;Prometheus text (*.prom)")
+        if not filename:
+            return
+        try:
+            metrics.export(filename)
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Could not export metrics: {e}")
+    
+    def update_diagnostics(self):
+        def format_ns(ns):
+            for unit, scale in (('s', 1e9), ('ms', 1e6), ('µs', 1e3)):
+                if ns >= scale:
+                    return f"{ns / scale:.2f} {unit}"
+            return f"{ns} ns"
+        
+        snapshot = metrics.snapshot()
+        self.diagnostics_table.setRowCount(len(snapshot))
+        for row, (name, stats) in enumerate(snapshot.items()):
+            values = [name, str(stats['count'])] + [format_ns(stats[key]) for key in
+                                                    ('mean_ns', 'p50_ns', 'p95_ns', 'p99_ns', 'max_ns')]
+            for column, value in enumerate(values):
+                self.diagnostics_table.setItem(row, column, QTableWidgetItem(value))
+    
     # All other methods remain the same...
     def start_game(self):
         self.game_score = 0
@@ -967,11 +1220,16 @@ class MainWindow(QMainWindow):
             
             room_id = self.viz_room_combo.currentData()
             
-            if room_id not in self.booking_service.room_trees:
-                QMessageBox.information(self, "No Data", "No bookings for this room yet!")
+            engine = self.booking_service.engine_name
+            if engine != 'interval_tree':
+                QMessageBox.information(self, "No Tree",
+                    f"The '{engine}' availability engine doesn't keep interval trees.")
                 return
             
-            tree = self.booking_service.room_trees[room_id]
+            tree = self.booking_service.get_room_tree(room_id)
+            if tree is None:
+                QMessageBox.information(self, "No Data", "No bookings for this room yet!")
+                return
             
             if tree.size == 0:
                 QMessageBox.information(self, "Empty", "This room's tree is empty!")
@@ -983,139 +1241,47 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", f"Could not visualize tree: {e}")
     
     def update_tree_stats(self):
-        total_bookings = len(self.booking_service.get_all_bookings())
-        active_bookings = sum(1 for b in self.booking_service.get_all_bookings() if b.status.value != "Cancelled")
-        num_trees = len(self.booking_service.room_trees)
+        total_bookings = len(self.booking_service.bookings)
+        counts = self.booking_service.active_booking_counts()
+        active_bookings = sum(counts.values())
+        num_trees = len(counts)
         
         stats = "<h3 style='color: white;'>Interval Tree Statistics</h3>"
+        stats += f"<p style='color: white;'>• <b>Availability Engine:</b> {self.booking_service.engine_name}</p>"
         stats += f"<p style='color: white;'>• <b>Total Bookings:</b> {total_bookings}</p>"
         stats += f"<p style='color: white;'>• <b>Active Bookings:</b> {active_bookings}</p>"
         stats += f"<p style='color: white;'>• <b>Active Trees:</b> {num_trees}</p>"
         stats += f"<p style='color: white;'>• <b>Avg Tree Size:</b> {active_bookings / num_trees if num_trees > 0 else 0:.1f}</p>"
         
-        self.tree_stats_text.setHtml(stats)
-    
-    def load_data(self):
-        try:
-            if os.path.exists('data/rooms.json'):
-                with open('data/rooms.json', 'r') as f:
-                    content = f.read().strip()
-                    if content:
-                        rooms_data = json.loads(content)
-                        self.rooms = [Room.from_dict(r) for r in rooms_data]
-                    else:
-                        self.create_sample_rooms()
-            else:
-                self.create_sample_rooms()
-        except:
-            self.create_sample_rooms()
-        
-        try:
-            if os.path.exists('data/guests.json'):
-                with open('data/guests.json', 'r') as f:
-                    content = f.read().strip()
-                    if content:
-                        guests_data = json.loads(content)
-                        for g_data in guests_data.values():
-                            guest = Guest.from_dict(g_data)
-                            self.guests[guest.guest_id] = guest
-                            guest_num = int(guest.guest_id.replace('G', ''))
-                            self.guest_counter = max(self.guest_counter, guest_num + 1)
-                    else:
-                        self.create_sample_guests()
-            else:
-                self.create_sample_guests()
-        except:
-            self.create_sample_guests()
-        
-        self.booking_service.load_from_file()
-    
-    def save_data(self):
-        os.makedirs('data', exist_ok=True)
+        tree_metrics = self.booking_service.get_tree_metrics()
+        if tree_metrics:
+            work = tree_metrics['work']
+            balance = ", ".join(f"{factor:+d}: {count}" for factor, count in sorted(tree_metrics['balance'].items()))
+            stats += "<h3 style='color: white;'>Structure</h3>"
+            stats += f"<p style='color: white;'>• <b>Nodes:</b> {tree_metrics['node_count']} "
+            stats += f"({tree_metrics['memory_bytes'] / 1024:.1f} KiB)</p>"
+            stats += f"<p style='color: white;'>• <b>Height:</b> max {tree_metrics['max_height']}, "
+            stats += f"mean {tree_metrics['mean_height']:.1f}, worst {tree_metrics['worst_height_ratio']:.2f}× balanced</p>"
+            stats += f"<p style='color: white;'>• <b>Balance Factors:</b> {balance or 'n/a'}</p>"
+            stats += "<h3 style='color: white;'>Work</h3>"
+            stats += f"<p style='color: white;'>• <b>Searches:</b> {work['searches']} — "
+            stats += f"{tree_metrics['visited_per_search']:.1f} nodes visited each, "
+            stats += f"{tree_metrics['prune_rate']:.0%} of subtrees pruned</p>"
+            stats += f"<p style='color: white;'>• <b>Inserts:</b> {work['inserts']} ({work['insert_visited']} nodes visited), "
+            stats += f"<b>Deletes:</b> {work['deletes']} ({work['delete_visited']} nodes visited), "
+            stats += f"<b>Rotations:</b> {work['rotations']}</p>"
         
-        try:
-            with open('data/rooms.json', 'w') as f:
-                json.dump([r.to_dict() for r in self.rooms], f, indent=2)
-        except Exception as e:
-            print(f"Error saving rooms: {e}")
-        
-        try:
-            with open('data/guests.json', 'w') as f:
-                json.dump({gid: g.to_dict() for gid, g in self.guests.items()}, f, indent=2)
-        except Exception as e:
-            print(f"Error saving guests: {e}")
-        
-        self.booking_service.save_to_file()
-    
-    def create_sample_rooms(self):
-        self.rooms = []
-        room_counter = 101
-        
-        for floor in range(1, 4):
-            for _ in range(3):
-                self.rooms.append(Room(
-                    room_id=f"R{room_counter}",
-                    room_number=room_counter,
-                    room_type=RoomType.STANDARD,
-                    floor=floor,
-                    base_price=100.0,
-                    features=["WiFi", "TV"]
-                ))
-                room_counter += 1
-        
-        for floor in range(1, 4):
-            for _ in range(2):
-                self.rooms.append(Room(
-                    room_id=f"R{room_counter}",
-                    room_number=room_counter,
-                    room_type=RoomType.DELUXE,
-                    floor=floor,
-                    base_price=150.0,
-                    features=["WiFi", "TV", "Mini Bar", "Balcony"]
-                ))
-                room_counter += 1
-        
-        for floor in [3, 4]:
-            self.rooms.append(Room(
-                room_id=f"R{room_counter}",
-                room_number=room_counter,
-                room_type=RoomType.SUITE,
-                floor=floor,
-                base_price=250.0,
-                features=["WiFi", "TV", "Mini Bar", "Balcony", "Living Room", "Jacuzzi"]
-            ))
-            room_counter += 1
-        
-        self.rooms.append(Room(
-            room_id=f"R{room_counter}",
-            room_number=room_counter,
-            room_type=RoomType.PENTHOUSE,
-            floor=5,
-            base_price=500.0,
-            features=["WiFi", "TV", "Mini Bar", "Terrace", "Living Room", "Jacuzzi", "Kitchen", "Sea View"]
-        ))
-        
-        self.save_data()
-    
-    def create_sample_guests(self):
-        sample_guests = [
-            ("John Doe", "john@email.com", "1234567890", "ID001"),
-            ("Jane Smith", "jane@email.com", "0987654321", "ID002"),
-            ("Bob Wilson", "bob@email.com", "5555555555", "ID003"),
-        ]
-        
-        for name, email, phone, id_proof in sample_guests:
-            guest_id = f"G{self.guest_counter:04d}"
-            self.guest_counter += 1
-            
-            guest = Guest(guest_id, name, email, phone, id_proof)
-            self.guests[guest_id] = guest
-        
-        self.save_data()
+        self.tree_stats_text.setHtml(stats)
     
     def update_guest_combo(self):
+        text = self.guest_search.text().strip()
+        if text:
+            matches = self.guests.search(text, limit=self.GUEST_SEARCH_LIMIT)
+        else:
+            matches = self.guests.first(self.GUEST_SEARCH_LIMIT)
+        
         self.guest_combo.clear()
-        for guest in self.guests.values():
+        for guest in matches:
             self.guest_combo.addItem(f"{guest.name} ({guest.guest_id})", guest.guest_id)
     
     def add_new_guest(self):
@@ -1160,21 +1326,19 @@ class MainWindow(QMainWindow):
         layout.addRow(btn_box)
         
         if dialog.exec_() == QDialog.Accepted:
-            guest_id = f"G{self.guest_counter:04d}"
-            self.guest_counter += 1
-            
-            guest = Guest(
-                guest_id=guest_id,
-                name=name_input.text(),
-                email=email_input.text(),
-                phone=phone_input.text(),
-                id_proof=id_input.text()
-            )
+            duplicates = self.guests.find_duplicates(email_input.text(), phone_input.text(), id_input.text())
+            if duplicates:
+                names = "\n".join(f"• {g.name} ({g.guest_id})" for g in duplicates[:5])
+                reply = QMessageBox.question(self, "Possible Duplicate",
+                    f"These guests share the email, phone or ID proof:\n\n{names}\n\nAdd anyway?",
+                    QMessageBox.Yes | QMessageBox.No)
+                if reply != QMessageBox.Yes:
+                    return
             
-            self.guests[guest_id] = guest
+            guest = self.core.add_guest(name_input.text(), email_input.text(),
+                                        phone_input.text(), id_input.text())
             self.update_guest_combo()
             self.update_guests_table()
-            self.save_data()
             
             self.stat_guests.update_value(len(self.guests))
             
@@ -1194,7 +1358,11 @@ class MainWindow(QMainWindow):
         check_in_dt = datetime.combine(check_in, datetime.min.time())
         check_out_dt = datetime.combine(check_out, datetime.min.time())
         
-        filtered_rooms = [r for r in self.rooms if r.room_type == room_type]
+        filtered_rooms = self.rooms.query(
+            room_type=room_type,
+            min_price=self.min_price_spin.value(),
+            max_price=self.max_price_spin.value()
+        )
         available = self.booking_service.find_available_rooms(check_in_dt, check_out_dt, filtered_rooms)
         
         if not available:
@@ -1216,18 +1384,9 @@ class MainWindow(QMainWindow):
         check_in = datetime.combine(self.checkin_date.date().toPyDate(), datetime.min.time())
         check_out = datetime.combine(self.checkout_date.date().toPyDate(), datetime.min.time())
         
-        price = self.pricing_service.calculate_price(room, check_in, check_out)
-        
-        guest_id = self.guest_combo.currentData()
-        if guest_id:
-            guest = self.guests[guest_id]
-            original_price = price
-            price = self.pricing_service.apply_loyalty_discount(price, guest.loyalty_tier.value)
-            
-            if price < original_price:
-                self.price_label.setText(f"💰 ${price:.2f} 🎉 (Was ${original_price:.2f})")
-            else:
-                self.price_label.setText(f"💰 ${price:.2f}")
+        price, original_price = self.core.quote(room, check_in, check_out, self.guest_combo.currentData())
+        if price < original_price:
+            self.price_label.setText(f"💰 ${price:.2f} 🎉 (Was ${original_price:.2f})")
         else:
             self.price_label.setText(f"💰 ${price:.2f}")
     
@@ -1247,27 +1406,14 @@ class MainWindow(QMainWindow):
             check_in = datetime.combine(self.checkin_date.date().toPyDate(), datetime.min.time())
             check_out = datetime.combine(self.checkout_date.date().toPyDate(), datetime.min.time())
             
-            price = self.pricing_service.calculate_price(room, check_in, check_out)
+            booking, points = self.core.book(guest_id, room.room_id, check_in, check_out)
             guest = self.guests[guest_id]
-            price = self.pricing_service.apply_loyalty_discount(price, guest.loyalty_tier.value)
-            
-            booking = self.booking_service.create_booking(guest_id, room.room_id, check_in, check_out, price)
-            
-            points = int(price)
-            guest.add_loyalty_points(points)
-            guest.booking_history.append(booking.booking_id)
+            price = booking.total_price
             
-            self.save_data()
             self.update_available_rooms()
-            self.update_bookings_table()
+            self.update_stat_cards()
             
-            bookings = self.booking_service.get_all_bookings()
-            active = sum(1 for b in bookings if b.status.value == "Confirmed")
-            revenue = sum(b.total_price for b in bookings if b.status.value != "Cancelled")
-            self.stat_bookings.update_value(active)
-            self.stat_revenue.update_value(f"${revenue:.0f}")
-            
-            if self.game_timer.isActive():
+            if self.game_timer is not None and self.game_timer.isActive():
                 self.game_score += 1
                 self.update_score()
             
@@ -1280,39 +1426,32 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
     
-    def update_bookings_table(self):
-        bookings = self.booking_service.get_all_bookings()
-        self.bookings_table.setRowCount(len(bookings))
-        
-        for i, booking in enumerate(bookings):
-            guest = self.guests.get(booking.guest_id)
-            guest_name = guest.name if guest else "Unknown"
-            
-            room = next((r for r in self.rooms if r.room_id == booking.room_id), None)
-            room_num = room.room_number if room else "Unknown"
-            
-            self.bookings_table.setItem(i, 0, QTableWidgetItem(booking.booking_id))
-            self.bookings_table.setItem(i, 1, QTableWidgetItem(guest_name))
-            self.bookings_table.setItem(i, 2, QTableWidgetItem(str(room_num)))
-            self.bookings_table.setItem(i, 3, QTableWidgetItem(booking.check_in.strftime("%Y-%m-%d")))
-            self.bookings_table.setItem(i, 4, QTableWidgetItem(booking.check_out.strftime("%Y-%m-%d")))
-            self.bookings_table.setItem(i, 5, QTableWidgetItem(f"${booking.total_price:.2f}"))
-            self.bookings_table.setItem(i, 6, QTableWidgetItem(booking.status.value))
+    def join_waitlist(self):
+        try:
+            guest_id = self.guest_combo.currentData()
+            if not guest_id:
+                QMessageBox.warning(self, "Oops!", "Please select a guest first!")
+                return
             
-            btn_widget = QWidget()
-            btn_widget.setStyleSheet("background: transparent;")
-            btn_layout = QHBoxLayout()
-            btn_widget.setLayout(btn_layout)
-            btn_layout.setContentsMargins(2, 2, 2, 2)
+            room_type = RoomType(self.room_type_combo.currentText())
+            check_in = datetime.combine(self.checkin_date.date().toPyDate(), datetime.min.time())
+            check_out = datetime.combine(self.checkout_date.date().toPyDate(), datetime.min.time())
             
-            if booking.status.value == "Confirmed":
-                cancel_btn = ModernButton("Cancel", "#f5576c")
-                cancel_btn.clicked.connect(lambda checked, bid=booking.booking_id: self.cancel_booking(bid))
-                btn_layout.addWidget(cancel_btn)
+            request_id, position = self.core.join_waitlist(guest_id, room_type, check_in, check_out)
             
-            self.bookings_table.setCellWidget(i, 7, btn_widget)
+            QMessageBox.information(self, "⏳ Waitlisted",
+                f"Request #{request_id} added to the {room_type.value} waitlist.\n\n"
+                f"Requests in queue: {position}")
         
-        self.bookings_table.resizeColumnsToContents()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+    
+    def update_bookings_table(self):
+        # Adds, cancellations and moves already reach the model row by row;
+        # this re-reads everything (guest names, bulk imports)
+        if self.bookings_table is None:
+            return
+        self.bookings_model.refresh()
     
     def cancel_booking(self, booking_id):
         reply = QMessageBox.question(self, "Confirm Cancellation", 
@@ -1321,20 +1460,28 @@ class MainWindow(QMainWindow):
         
         if reply == QMessageBox.Yes:
             try:
-                self.booking_service.cancel_booking(booking_id)
-                self.save_data()
-                self.update_bookings_table()
-                self.update_available_rooms()
+                _, promoted = self.core.cancel(booking_id)
                 
-                bookings = self.booking_service.get_all_bookings()
-                active = sum(1 for b in bookings if b.status.value == "Confirmed")
-                self.stat_bookings.update_value(active)
+                self.update_available_rooms()
+                self.update_stat_cards()
                 
-                QMessageBox.information(self, "Cancelled", "Booking cancelled successfully!")
+                message = "Booking cancelled successfully!"
+                for request, booking in promoted:
+                    message += f"\n\n⏳ Waitlist request #{request['request_id']} promoted to booking #{booking.booking_id}"
+                QMessageBox.information(self, "Cancelled", message)
             except Exception as e:
                 QMessageBox.critical(self, "Error", str(e))
     
+    def run_loyalty_job(self):
+        result = self.core.run_loyalty_job()
+        if result['changed']:
+            self.update_guests_table()
+        return result
+    
     def update_guests_table(self):
+        if self.guests_table is None:
+            return
+        
         self.guests_table.setRowCount(len(self.guests))
         
         for i, guest in enumerate(self.guests.values()):
@@ -1348,6 +1495,9 @@ class MainWindow(QMainWindow):
         self.guests_table.resizeColumnsToContents()
     
     def update_rooms_table(self):
+        if self.rooms_table is None:
+            return
+        
         self.rooms_table.setRowCount(len(self.rooms))
         
         for i, room in enumerate(self.rooms):